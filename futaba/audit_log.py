@@ -0,0 +1,129 @@
+#
+# audit_log.py
+#
+# futaba - A Discord Mod bot for the Programming server
+# Copyright (c) 2017-2020 Jake Richardson, Emmie Smith, jackylam5
+#
+# futaba is available free of charge under the terms of the MIT
+# License. You are free to redistribute and/or modify it under those
+# terms. It is distributed in the hopes that it will be useful, but
+# WITHOUT ANY WARRANTY. See the LICENSE file for more details.
+#
+
+"""
+Keeps the most recent audit log entries of each guild in memory.
+
+Lookups name the time of the event they are about, and wait until the
+audit log has been fetched at least a short while after it, to give the
+entry time to appear. Lookups waiting on the same fetch share it, and
+each fetch only pages through entries newer than the ones already known.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["AuditLogTail", "AuditLogCache"]
+
+# How long after an event its audit log entry is expected to be there
+SETTLE_DELAY = timedelta(seconds=2)
+
+# Number of recent entries kept per guild
+RING_SIZE = 100
+
+
+class AuditLogTail:
+    __slots__ = ("guild", "entries", "fetched_at", "pending", "pending_target")
+
+    def __init__(self, guild):
+        self.guild = guild
+        self.entries = deque(maxlen=RING_SIZE)
+        self.fetched_at = None
+        self.pending = None
+        self.pending_target = None
+
+    async def _fetch(self, target):
+        delay = (target - datetime.now(timezone.utc)).total_seconds()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        started_at = datetime.now(timezone.utc)
+        newest_id = self.entries[0].id if self.entries else 0
+        new_entries = []
+
+        try:
+            async for entry in self.guild.audit_logs(limit=RING_SIZE):
+                if entry.id <= newest_id:
+                    break
+                new_entries.append(entry)
+        except discord.HTTPException as error:
+            logger.warning(
+                "Unable to fetch audit log for guild '%s' (%d)",
+                self.guild.name,
+                self.guild.id,
+                exc_info=error,
+            )
+
+        logger.debug(
+            "Got %d new audit log entries for guild '%s' (%d)",
+            len(new_entries),
+            self.guild.name,
+            self.guild.id,
+        )
+
+        # Entries are kept newest first
+        self.entries.extendleft(reversed(new_entries))
+        self.fetched_at = started_at
+
+    async def sync(self, timestamp):
+        """Waits until the audit log has been fetched after the given event time."""
+
+        target = timestamp + SETTLE_DELAY
+        while self.fetched_at is None or self.fetched_at < target:
+            if self.pending is None:
+                self.pending_target = target
+                self.pending = asyncio.ensure_future(self._fetch(target))
+                self.pending.add_done_callback(self._fetch_done)
+            elif self.pending_target < target:
+                # Wait for the current fetch, then start one late enough
+                await asyncio.shield(self.pending)
+                continue
+
+            await asyncio.shield(self.pending)
+
+    def _fetch_done(self, future):
+        if self.pending is future:
+            self.pending = None
+            self.pending_target = None
+
+
+class AuditLogCache:
+    __slots__ = ("tails",)
+
+    def __init__(self):
+        self.tails = {}
+
+    async def get_entries(self, guild, timestamp, action=None):
+        """
+        Returns the guild's recent audit log entries, newest first, once
+        the audit log has had a chance to catch up to the given event time.
+        """
+
+        tail = self.tails.get(guild.id)
+        if tail is None:
+            tail = self.tails[guild.id] = AuditLogTail(guild)
+
+        await tail.sync(timestamp)
+
+        if action is None:
+            return list(tail.entries)
+
+        return [entry for entry in tail.entries if entry.action == action]
+
+    def remove_guild(self, guild):
+        self.tails.pop(guild.id, None)
@@ -0,0 +1,191 @@
+#
+# bulk.py
+#
+# futaba - A Discord Mod bot for the Programming server
+# Copyright (c) 2017-2020 Jake Richardson, Emmie Smith, jackylam5
+#
+# futaba is available free of charge under the terms of the MIT
+# License. You are free to redistribute and/or modify it under those
+# terms. It is distributed in the hopes that it will be useful, but
+# WITHOUT ANY WARRANTY. See the LICENSE file for more details.
+#
+
+"""
+Runs operations over many members of a guild, such as pruning.
+
+Each operation is worked through by a few concurrent workers, so that it
+finishes about as fast as Discord's rate limits allow. Having only a few
+requests in flight lets discord.py learn each rate limit bucket and wait
+for it, rather than sending a burst of requests that all get a 429.
+
+Operations can be cancelled, and a cancelled or interrupted operation can
+be resumed, picking up with the members it hadn't gotten to yet.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from itertools import count
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["BulkOperation", "BulkExecutor"]
+
+# Number of members worked on at once in each operation
+CONCURRENCY = 4
+
+# How often progress is logged, in members
+PROGRESS_INTERVAL = 100
+
+
+class BulkOperation:
+    """
+    An operation over a set of members. The action is awaited for each
+    member, and returns whether anything was done to them.
+    """
+
+    __slots__ = (
+        "id",
+        "guild",
+        "name",
+        "action",
+        "total",
+        "pending",
+        "done",
+        "changed",
+        "failed",
+        "task",
+    )
+
+    def __init__(self, id, guild, name, members, action):
+        self.id = id
+        self.guild = guild
+        self.name = name
+        self.action = action
+        self.pending = deque(members)
+        self.total = len(self.pending)
+        self.done = 0
+        self.changed = 0
+        self.failed = 0
+        self.task = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    @property
+    def finished(self):
+        return not self.pending and not self.running
+
+    @property
+    def stopped_message(self):
+        return (
+            f"Stopped with {len(self.pending)} members left, "
+            f"this can be continued with `bulk resume {self.id}`."
+        )
+
+    async def wait(self):
+        """Waits until the operation finishes or is stopped."""
+
+        try:
+            await asyncio.shield(self.task)
+        except asyncio.CancelledError:
+            if not self.task.cancelled():
+                raise
+
+    async def _worker(self):
+        while self.pending:
+            member = self.pending.popleft()
+
+            try:
+                if await self.action(member):
+                    self.changed += 1
+            except discord.HTTPException as error:
+                logger.info(
+                    "Bulk operation #%d failed on member '%s' (%d)",
+                    self.id,
+                    member.name,
+                    member.id,
+                    exc_info=error,
+                )
+                self.failed += 1
+            except Exception as error:
+                # One bad member shouldn't stop the whole operation
+                logger.error(
+                    "Error in bulk operation #%d on member '%s' (%d)",
+                    self.id,
+                    member.name,
+                    member.id,
+                    exc_info=error,
+                )
+                self.failed += 1
+            except asyncio.CancelledError:
+                # Stopped partway through, try it again if resumed
+                self.pending.appendleft(member)
+                raise
+
+            self.done += 1
+            if self.done % PROGRESS_INTERVAL == 0:
+                logger.info("Bulk operation progress: %s", self)
+
+    async def _run(self):
+        logger.info("Running bulk operation: %s", self)
+        workers = [asyncio.ensure_future(self._worker()) for _ in range(CONCURRENCY)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # Stop the other workers if one of them didn't finish,
+            # letting them put back the members they were working on
+            for worker in workers:
+                worker.cancel()
+            await asyncio.wait(workers)
+
+        logger.info("Finished bulk operation: %s", self)
+
+    def __str__(self):
+        return (
+            f"#{self.id} {self.name}: {self.done}/{self.total} done, "
+            f"{self.changed} changed, {self.failed} failed"
+        )
+
+
+class BulkExecutor:
+    __slots__ = ("operations", "counter")
+
+    def __init__(self):
+        self.operations = {}
+        self.counter = count(1)
+
+    def start(self, guild, name, members, action):
+        """Starts a new operation on the given members, and returns it."""
+
+        operation = BulkOperation(next(self.counter), guild, name, members, action)
+        self.operations[operation.id] = operation
+        self.resume(operation)
+        return operation
+
+    def resume(self, operation):
+        if operation.running:
+            return
+
+        operation.task = asyncio.ensure_future(operation._run())
+        operation.task.add_done_callback(lambda _: self._cleanup(operation))
+
+    def cancel(self, operation):
+        if operation.running:
+            logger.info("Cancelling bulk operation: %s", operation)
+            operation.task.cancel()
+
+    def _cleanup(self, operation):
+        # Stopped operations are kept around so they can be resumed
+        if operation.finished:
+            self.operations.pop(operation.id, None)
+
+    def get_operations(self, guild):
+        return [
+            operation
+            for operation in self.operations.values()
+            if operation.guild == guild
+        ]
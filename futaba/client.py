@@ -27,12 +27,15 @@ import aiohttp
 import discord
 from discord.ext import commands
 
+from .audit_log import AuditLogCache
+from .bulk import BulkExecutor
 from .cogs.journal import Journal
 from .cogs.navi import Navi
 from .cogs.reloader import Reloader
 from .config import Configuration
 from .converters.annotations import ANNOTATIONS
 from .delayed import DelayedQueue
+from .download import Downloader
 from .enums import Reactions
 from .exceptions import (
     CommandFailed,
@@ -43,10 +46,12 @@ from .exceptions import (
 from .help import HelpCommand
 from .journal import Broadcaster, LoggingOutputListener
 from .lru import LruCache
+from .navi import NaviScheduler
 from .punishment import PunishmentHandler
 from .sql import SqlHandler
 from .str_builder import StringBuilder
 from .unicode import unicode_repr
+from .user_index import UserIndex
 from .utils import plural, user_discrim
 
 logger = logging.getLogger(__name__)
@@ -70,6 +75,11 @@ class Bot(commands.AutoShardedBot):
         "journal_cog",
         "reloader_cog",
         "sql",
+        "downloader",
+        "audit_log",
+        "scheduler",
+        "user_index",
+        "bulk",
         "punish",
         "error_channel",
         "message_locks",
@@ -83,6 +93,11 @@ class Bot(commands.AutoShardedBot):
         self.journal_cog = None
         self.reloader_cog = None
         self.sql = SqlHandler(config.database_url)
+        self.downloader = Downloader()
+        self.audit_log = AuditLogCache()
+        self.scheduler = NaviScheduler(self)
+        self.user_index = UserIndex()
+        self.bulk = BulkExecutor()
         self.punish = PunishmentHandler(self)
         self.error_channel = None
         self.message_locks = LruCache(20)
@@ -143,6 +158,9 @@ class Bot(commands.AutoShardedBot):
             if isinstance(channel, discord.TextChannel):
                 self.error_channel = channel
 
+        # Index users for fuzzy searches
+        self.user_index.build(self.guilds)
+
         # Setup mandatory cogs
         await self.add_cog(Journal(self))
         logger.info("Loaded mandatory cog: Journal")
@@ -183,7 +201,11 @@ class Bot(commands.AutoShardedBot):
         self.journal_cog.router.register(listener)
 
         # Performing migrations
-        self.sql.guilds.migrate(self)
+        await self.sql.run(self.sql.guilds.migrate, self)
+
+        # Load model caches in bulk, before the cogs read from them
+        async with self.sql.transaction():
+            await self.sql.run(self.sql.prime_caches, self)
 
         # Initialize cog databases
         for cog in self.get_cogs():
@@ -204,6 +226,10 @@ class Bot(commands.AutoShardedBot):
         logger.info("------")
         logger.info("Ready!")
 
+    async def close(self):
+        await self.downloader.close()
+        await super().close()
+
     def get_broadcaster(self, root):
         """
         A utility method for instantiating a bound Broadcaster on the given path.
@@ -211,13 +237,13 @@ class Bot(commands.AutoShardedBot):
 
         return Broadcaster(self.journal_cog.router, root)
 
-    def add_tasks(self, *tasks):
+    async def add_tasks(self, *tasks):
         logger.info("Adding tasks to database and to asyncio event loop")
         assert tasks
 
-        with self.sql.transaction():
+        async with self.sql.transaction():
             for task in tasks:
-                self.sql.navi.add_task(task)
+                await self.sql.run(self.sql.navi.add_task, task)
 
         # Put on event loop only after the database has successfully committed
         for task in tasks:
@@ -233,8 +259,9 @@ class Bot(commands.AutoShardedBot):
         """
 
         logger.info("Guild join event for '%s' (%d)", guild.name, guild.id)
-        with self.sql.transaction():
-            self.sql.guilds.activate_guild(guild)
+        self.user_index.add_guild(guild)
+        async with self.sql.transaction():
+            await self.sql.run(self.sql.guilds.activate_guild, guild)
 
     async def on_guild_remove(self, guild):
         """
@@ -243,8 +270,22 @@ class Bot(commands.AutoShardedBot):
         """
 
         logger.info("Guild leave event for '%s' (%d)", guild.name, guild.id)
-        with self.sql.transaction():
-            self.sql.guilds.deactivate_guild(guild)
+        self.user_index.remove_guild(guild)
+        self.audit_log.remove_guild(guild)
+        async with self.sql.transaction():
+            await self.sql.run(self.sql.guilds.deactivate_guild, guild)
+
+    async def on_member_join(self, member):
+        self.user_index.add_member(member)
+
+    async def on_member_remove(self, member):
+        self.user_index.remove_member(member)
+
+    async def on_member_update(self, before, after):
+        self.user_index.update_member(before, after)
+
+    async def on_user_update(self, before, after):
+        self.user_index.update_user(before, after)
 
     def message_lock(self, message):
         return self.message_locks.get_or_put(message, asyncio.Lock)
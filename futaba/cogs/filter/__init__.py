@@ -29,6 +29,7 @@ async def setup_filtering(bot: Bot):
     bot.add_listener(cog.check_message_edit, "on_message_edit")
     bot.add_listener(cog.check_member_join, "on_member_join")
     bot.add_listener(cog.check_member_update, "on_member_update")
+    bot.add_listener(cog.check_user_update, "on_user_update")
     await bot.add_cog(cog)
 
 
@@ -0,0 +1,216 @@
+#
+# cogs/filter/cache.py
+#
+# futaba - A Discord Mod bot for the Programming server
+# Copyright (c) 2017-2020 Jake Richardson, Emmie Smith, jackylam5
+#
+# futaba is available free of charge under the terms of the MIT
+# License. You are free to redistribute and/or modify it under those
+# terms. It is distributed in the hopes that it will be useful, but
+# WITHOUT ANY WARRANTY. See the LICENSE file for more details.
+#
+
+"""
+Keeps the expensive parts of compiling filters on disk between restarts:
+the homoglyph skeleton table, the homoglyphs accepted for each filter
+character, and the characters added to each character set in regular
+expression filters.
+
+Both only depend on the confusables data, Unicode version and regular
+expression parser, so the cache is thrown away if any of those change.
+A cache file which doesn't have the expected structure is ignored too.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import unicodedata
+from importlib.metadata import PackageNotFoundError, version
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["FilterCache", "filter_cache"]
+
+# Bump when the format or contents of the cache change
+CACHE_FORMAT = 2
+
+# How long to wait before saving after a change, in seconds,
+# so filters compiled close together are written out once
+SAVE_DELAY = 30
+
+
+def _cache_version():
+    try:
+        confusables_version = version("confusable-homoglyphs")
+    except PackageNotFoundError:
+        confusables_version = None
+
+    return [
+        CACHE_FORMAT,
+        confusables_version,
+        unicodedata.unidata_version,
+        list(sys.version_info[:2]),
+    ]
+
+
+def _parse(data):
+    table = {int(code): char for code, char in data["table"].items()}
+    if not all(isinstance(char, str) for char in table.values()):
+        raise TypeError("Table entries must be strings")
+
+    options = data["options"]
+    if not all(
+        isinstance(values, list) and all(isinstance(value, str) for value in values)
+        for values in options.values()
+    ):
+        raise TypeError("Options must be lists of strings")
+
+    sets = data["sets"]
+    if not all(
+        isinstance(codes, list) and all(isinstance(code, int) for code in codes)
+        for codes in sets.values()
+    ):
+        raise TypeError("Sets must be lists of code points")
+
+    return table, options, sets
+
+
+class FilterCache:
+    __slots__ = (
+        "path",
+        "table",
+        "options",
+        "sets",
+        "dirty",
+        "pending_save",
+        "write_lock",
+    )
+
+    def __init__(self):
+        self.path = None
+        self.table = None
+        self.options = {}
+        self.sets = {}
+        self.dirty = False
+        self.pending_save = None
+        self.write_lock = threading.Lock()
+
+    def open(self, path):
+        """
+        Sets where the cache is kept, and loads anything not already
+        in memory from it. A path of None keeps it in memory only.
+        """
+
+        self.path = path
+        if path is None:
+            return
+
+        try:
+            with open(path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            logger.info("No compiled filter cache at '%s', starting fresh", path)
+            return
+        except (OSError, ValueError) as error:
+            logger.warning("Unable to read compiled filter cache", exc_info=error)
+            return
+
+        if not isinstance(data, dict) or data.get("version") != _cache_version():
+            logger.info("Compiled filter cache is out of date, discarding it")
+            self.dirty = True
+            return
+
+        try:
+            table, options, sets = _parse(data)
+        except (AttributeError, KeyError, TypeError, ValueError) as error:
+            logger.warning(
+                "Compiled filter cache is malformed, discarding it: %s", error
+            )
+            self.dirty = True
+            return
+
+        logger.info("Loaded compiled filter cache from '%s'", path)
+        if self.table is None:
+            self.table = table
+
+        for char, values in options.items():
+            self.options.setdefault(char, values)
+
+        for key, codes in sets.items():
+            self.sets.setdefault(key, codes)
+
+    def set_table(self, table):
+        self.table = table
+        self.dirty = True
+
+    def add_options(self, char, options):
+        self.options[char] = options
+        self.dirty = True
+
+    def add_set(self, key, codes):
+        self.sets[key] = codes
+        self.dirty = True
+
+    def _take_snapshot(self):
+        if self.path is None or not self.dirty or self.table is None:
+            return None
+
+        # Entries are never changed once added, so shallow copies are enough
+        self.dirty = False
+        return {
+            "version": _cache_version(),
+            "table": self.table,
+            "options": dict(self.options),
+            "sets": dict(self.sets),
+        }
+
+    def _write(self, data):
+        logger.debug("Saving compiled filter cache to '%s'", self.path)
+        temp_path = f"{self.path}.tmp"
+
+        try:
+            # The final save on unload may overlap one still running in the executor
+            with self.write_lock:
+                with open(temp_path, "w", encoding="utf-8") as fh:
+                    json.dump(data, fh)
+                os.replace(temp_path, self.path)
+        except OSError as error:
+            logger.warning("Unable to write compiled filter cache", exc_info=error)
+            self.dirty = True
+
+    def save_later(self):
+        """
+        Saves the cache in a little while, on the default executor
+        so the event loop isn't held up. Changes made before then
+        are saved along with it.
+        """
+
+        if self.path is None or self.pending_save is not None:
+            return
+
+        loop = asyncio.get_running_loop()
+        self.pending_save = loop.call_later(SAVE_DELAY, self._save_in_executor, loop)
+
+    def _save_in_executor(self, loop):
+        self.pending_save = None
+        data = self._take_snapshot()
+        if data is not None:
+            loop.run_in_executor(None, self._write, data)
+
+    def save(self):
+        """Saves the cache right away, replacing any pending save."""
+
+        if self.pending_save is not None:
+            self.pending_save.cancel()
+            self.pending_save = None
+
+        data = self._take_snapshot()
+        if data is not None:
+            self._write(data)
+
+
+# Shared by every filter, as the skeleton table is
+filter_cache = FilterCache()
@@ -32,11 +32,12 @@ __all__ = [
     "check_message",
     "check_message_edit",
     "check_member_update",
+    "check_user_update",
     "check_all_members_on_filter",
 ]
 
 
-def filter_immune(bot, guild, member, channel=None):
+async def filter_immune(bot, guild, member, channel=None):
     """
     Checks for certain people who are not subject to the filter's effects.
     """
@@ -49,7 +50,7 @@ def filter_immune(bot, guild, member, channel=None):
         return True
 
     # Check if bots have filter immunity
-    filter_settings = bot.sql.filter.get_settings(guild)
+    filter_settings = await bot.sql.run(bot.sql.filter.get_settings, guild)
     if filter_settings.bot_immune:
         if member.bot:
             return True
@@ -59,7 +60,7 @@ def filter_immune(bot, guild, member, channel=None):
         return True
 
     # Check manually-added users
-    if bot.sql.filter.user_is_filter_immune(guild, member):
+    if await bot.sql.run(bot.sql.filter.user_is_filter_immune, guild, member):
         return True
 
     # In the case where the author isn't a Member yet
@@ -107,7 +108,7 @@ async def check_message(cog, message):
         return
 
     # Check filter immunity
-    if filter_immune(cog.bot, message.guild, message.author, message.channel):
+    if await filter_immune(cog.bot, message.guild, message.author, message.channel):
         logger.debug("This user is immune to the filter")
         return
 
@@ -148,14 +149,13 @@ async def check_all_members_on_filter(cog, guild, filter):
         )
         return
 
-    # Run filter checks on members, with delays
-    for member in guild.members:
+    async def check_member(member):
         logger.debug(
             "Checking member '%s' (%d) against new filter", member.name, member.id
         )
 
-        if filter_immune(cog.bot, guild, member):
-            continue
+        if await filter_immune(cog.bot, guild, member):
+            return False
 
         # We're using the existing functions to avoid duplicating functionality
         await check_name_filter(
@@ -166,7 +166,13 @@ async def check_all_members_on_filter(cog, guild, filter):
                 cog, member.nick, NameType.NICK, member, only_filter=filter
             )
 
-        await asyncio.sleep(0.01)
+        return True
+
+    # Run filter checks on members, a few at a time
+    operation = cog.bot.bulk.start(
+        guild, "new filter check", guild.members, check_member
+    )
+    await operation.wait()
 
 
 async def check_member_join(cog, member):
@@ -188,7 +194,7 @@ async def check_member_join(cog, member):
         return
 
     # Check filter immunity
-    if filter_immune(cog.bot, guild, member):
+    if await filter_immune(cog.bot, guild, member):
         return
 
     # Cannot be parallelized because we can only renick if the username is ok
@@ -200,8 +206,8 @@ async def check_member_join(cog, member):
 async def check_member_update(cog, before, after):
     """
     Checks the member update against all text filters to ensure
-    they didn't change their username or nickname to something
-    inappropriate.
+    they didn't change their nickname to something inappropriate.
+    Username changes are handled once per user in check_user_update().
     """
 
     # Check that we actually have permissions to manage roles
@@ -215,16 +221,42 @@ async def check_member_update(cog, before, after):
         return
 
     # Check filter immunity
-    if filter_immune(cog.bot, guild, after):
+    if await filter_immune(cog.bot, guild, after):
         return
 
-    # Cannot be parallelized because we can only renick if the username is ok
-    if before.name != after.name:
-        await check_name_filter(cog, after.name, NameType.USER, after)
-
     if before.nick != after.nick and after.nick is not None:
         if after.nick == MASK_NICK:
             logger.debug("User has masked nickname, ignoring")
             return
 
         await check_name_filter(cog, after.nick, NameType.NICK, after)
+
+
+async def check_user_update(cog, before, after):
+    """
+    Checks a username change against the text filters of every guild
+    the user is in. The change is only reported once for all of them.
+    """
+
+    if before.name == after.name:
+        return
+
+    for guild in after.mutual_guilds:
+        member = guild.get_member(after.id)
+        if member is None:
+            continue
+
+        # Check that we actually have permissions to manage roles
+        if not guild.me.guild_permissions.manage_roles:
+            logger.debug(
+                "Lacks permissions to manage roles in guild '%s' (%d)",
+                guild.name,
+                guild.id,
+            )
+            continue
+
+        # Check filter immunity
+        if await filter_immune(cog.bot, guild, member):
+            continue
+
+        await check_name_filter(cog, after.name, NameType.USER, member)
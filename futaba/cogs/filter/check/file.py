@@ -14,12 +14,10 @@ import asyncio
 import logging
 import os
 from collections import namedtuple
-from hashlib import sha1
 from urllib.parse import urlparse
 
 import discord
 
-from futaba.download import download_links
 from futaba.enums import FilterType
 from futaba.str_builder import StringBuilder
 from futaba.utils import URL_REGEX
@@ -32,7 +30,7 @@ __all__ = ["FoundFileViolation", "check_file_filter"]
 
 FoundFileViolation = namedtuple(
     "FoundFileViolation",
-    ("bot", "journal", "message", "filter_type", "url", "binio", "hashsum"),
+    ("bot", "journal", "message", "filter_type", "url", "download", "hashsum"),
 )
 
 
@@ -43,36 +41,41 @@ async def check_file_filter(cog, message):
     if not file_urls:
         return
 
-    triggered = None
-    buffers = await download_links(file_urls)
-    hashsums = {}
-
-    for binio, url in zip(buffers, file_urls):
-        if binio is not None:
-            digest = sha1(binio.getbuffer()).digest()
-            hashsums[digest] = (binio, url)
-
-    for hashsum, (filter_type, _) in cog.content_filters[message.guild].items():
-        try:
-            binio, url = hashsums[hashsum]
-        except KeyError:
-            # Hash sum not found, not a match
-            continue
-
-        if triggered is None or filter_type.value > triggered.filter_type.value:
-            triggered = FoundFileViolation(
-                bot=cog.bot,
-                journal=cog.journal,
-                message=message,
-                filter_type=filter_type,
-                url=url,
-                binio=binio,
-                hashsum=hashsum,
-            )
+    # File contents are only needed if they might be reuploaded
+    settings = await cog.bot.sql.run(cog.bot.sql.filter.get_settings, message.guild)
+    downloads = await cog.bot.downloader.download_links(
+        file_urls, keep=settings.reupload, priority=True
+    )
+    hashsums = {
+        download.hashsum: download for download in downloads if download is not None
+    }
+
+    try:
+        triggered = None
+        for hashsum, (filter_type, _) in cog.content_filters[message.guild].items():
+            try:
+                download = hashsums[hashsum]
+            except KeyError:
+                # Hash sum not found, not a match
+                continue
+
+            if triggered is None or filter_type.level > triggered.filter_type.level:
+                triggered = FoundFileViolation(
+                    bot=cog.bot,
+                    journal=cog.journal,
+                    message=message,
+                    filter_type=filter_type,
+                    url=download.url,
+                    download=download,
+                    hashsum=hashsum,
+                )
 
-    if triggered is not None:
-        settings = cog.bot.sql.filter.get_settings(message.guild)
-        await found_file_violation(triggered, settings.reupload)
+        if triggered is not None:
+            await found_file_violation(triggered, settings.reupload)
+    finally:
+        for download in downloads:
+            if download is not None:
+                download.close()
 
 
 async def found_file_violation(triggered, reupload):
@@ -86,7 +89,7 @@ async def found_file_violation(triggered, reupload):
     message = triggered.message
     filter_type = triggered.filter_type
     url = triggered.url
-    binio = triggered.binio
+    download = triggered.download
     hashsum = triggered.hashsum
     hexsum = triggered.hashsum.hex()
 
@@ -98,7 +101,7 @@ async def found_file_violation(triggered, reupload):
         message.author.id,
     )
 
-    roles = bot.sql.get_special_roles(message.guild)
+    roles = await bot.sql.run(bot.sql.settings.get_special_roles, message.guild)
     severity = filter_type.level
 
     async def message_violator():
@@ -128,7 +131,7 @@ async def found_file_violation(triggered, reupload):
                 "In case the link is broken, the file has been attached below:"
             )
             filename = os.path.basename(urlparse(url).path)
-            kwargs["file"] = discord.File(binio.getbuffer(), filename=filename)
+            kwargs["file"] = discord.File(download.open(), filename=filename)
 
         kwargs["content"] = str(response)
         await message.author.send(**kwargs)
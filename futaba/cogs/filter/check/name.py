@@ -35,17 +35,19 @@ async def check_name_filter(cog, name, name_type, member, only_filter=None):
 
     if only_filter is None:
         # Check all the filters
-        triggered = None
-        for filter_text, (filter, filter_type) in cog.filters[member.guild].items():
-            if filter.matches(name):
-                if triggered is None or filter_type.value > triggered.filter_type.value:
-                    triggered = FoundNameViolation(
-                        filter_type=filter_type, filter_text=filter_text
-                    )
+        found = await cog.get_matcher(member.guild).search(name, cog.sandbox)
+        if found is None:
+            triggered = None
+        else:
+            filter_text, filter_type = found
+            triggered = FoundNameViolation(
+                filter_type=filter_type, filter_text=filter_text
+            )
     else:
         # Only check this filter
         filter_type = cog.filters[member.guild][only_filter.text][1]
-        if only_filter.matches(name):
+        quarantined = only_filter.text in cog.quarantined.get(member.guild, ())
+        if not quarantined and await cog.sandbox.matches(only_filter, name) is True:
             triggered = FoundNameViolation(
                 filter_type=filter_type, filter_text=only_filter.text
             )
@@ -69,7 +71,7 @@ async def check_name_filter(cog, name, name_type, member, only_filter=None):
         member.id,
     )
 
-    roles = cog.bot.sql.settings.get_special_roles(member.guild)
+    roles = await cog.bot.sql.run(cog.bot.sql.settings.get_special_roles, member.guild)
 
     async def message_violator(jailed):
         response = StringBuilder(
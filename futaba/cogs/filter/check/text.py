@@ -55,29 +55,34 @@ async def check_text_filter(cog, message):
     to_check = str(content)
     logger.debug("Content to check: %r", to_check)
 
-    # Iterate through all guild filters
+    # Check the guild and channel filters
     triggered = None
-    filter_groups = (
-        (LocationType.GUILD, cog.filters[message.guild]),
-        (LocationType.CHANNEL, cog.filters[message.channel]),
+    locations = (
+        (LocationType.GUILD, message.guild),
+        (LocationType.CHANNEL, message.channel),
     )
 
-    for location_type, all_filters in filter_groups:
-        for filter_text, (filter, filter_type) in all_filters.items():
-            if filter.matches(to_check):
-                if triggered is None or filter_type.value > triggered.filter_type.value:
-                    triggered = FoundTextViolation(
-                        bot=cog.bot,
-                        journal=cog.journal,
-                        message=message,
-                        content=to_check,
-                        location_type=location_type,
-                        filter_type=filter_type,
-                        filter_text=filter_text,
-                    )
+    for location_type, location in locations:
+        found = await cog.get_matcher(location).search(to_check, cog.sandbox)
+        if found is None:
+            continue
+
+        filter_text, filter_type = found
+        if triggered is None or filter_type.level > triggered.filter_type.level:
+            triggered = FoundTextViolation(
+                bot=cog.bot,
+                journal=cog.journal,
+                message=message,
+                content=to_check,
+                location_type=location_type,
+                filter_type=filter_type,
+                filter_text=filter_text,
+            )
 
     if triggered is not None:
-        roles = cog.bot.sql.settings.get_special_roles(message.guild)
+        roles = await cog.bot.sql.run(
+            cog.bot.sql.settings.get_special_roles, message.guild
+        )
         await found_text_violation(triggered, roles)
 
 
@@ -17,6 +17,7 @@ similar unicode characters, and stripping unicode whitespace.
 
 import logging
 from collections import defaultdict
+from weakref import WeakValueDictionary
 
 import discord
 from discord.ext import commands
@@ -31,8 +32,12 @@ from .check import (
     check_message_edit,
     check_member_join,
     check_member_update,
+    check_user_update,
 )
-from .filter import Filter
+from .cache import filter_cache
+from .filter import get_filter
+from .matcher import FilterMatcher
+from .sandbox import RegexSandbox
 from .manage import add_filter, delete_filter, show_filter
 from .manage import (
     check_hashsums,
@@ -51,39 +56,54 @@ class Filtering(AbstractCog):
     __slots__ = (
         "journal",
         "filters",
+        "quarantined",
+        "matchers",
+        "shared_matchers",
+        "sandbox",
         "content_filters",
         "check_message",
         "check_message_edit",
         "check_member_join",
         "check_member_update",
+        "check_user_update",
     )
 
     def __init__(self, bot):
         super().__init__(bot)
         self.journal = bot.get_broadcaster("/filter")
         self.filters = defaultdict(dict)
+        self.quarantined = defaultdict(set)
+        self.matchers = {}
+        self.shared_matchers = WeakValueDictionary()
         self.content_filters = defaultdict(dict)
         self.check_message = async_partial(check_message, self)
         self.check_message_edit = async_partial(check_message_edit, self)
         self.check_member_join = async_partial(check_member_join, self)
         self.check_member_update = async_partial(check_member_update, self)
+        self.check_user_update = async_partial(check_user_update, self)
+        filter_cache.open(bot.config.filter_cache_path)
+        self.sandbox = RegexSandbox(
+            bot.config.filter_cache_path, self.report_quarantine
+        )
 
     def setup(self):
+        # Filter settings and immune users were loaded with the other model caches
         logger.info("Fetching previously stored filters")
         sql = self.bot.sql.filter
         for guild in self.bot.guilds:
-            # Get filter settings
-            sql.fetch_settings(guild)
-
-            # Guild text filters
+            # Guild text filters, which are compiled when first checked
             for text, filter_type in sql.get_filters(guild).items():
-                self.filters[guild][text] = (Filter(text), filter_type)
+                self.filters[guild][text] = (get_filter(text), filter_type)
+            self.quarantined[guild].update(sql.get_quarantined_filters(guild))
 
             # Channel text filters
             for channel in guild.channels:
                 if isinstance(channel, discord.TextChannel):
                     for text, filter_type in sql.get_filters(channel).items():
-                        self.filters[channel][text] = (Filter(text), filter_type)
+                        self.filters[channel][text] = (get_filter(text), filter_type)
+                    self.quarantined[channel].update(
+                        sql.get_quarantined_filters(channel)
+                    )
 
             # Guild content filters
             for hashsum, (filter_type, description) in sql.get_content_filters(
@@ -91,8 +111,37 @@ class Filtering(AbstractCog):
             ).items():
                 self.content_filters[guild][hashsum] = (filter_type, description)
 
-            # Guild filter-immune users
-            sql.fetch_filter_immune_users(guild)
+        # Matchers built before the filters were loaded are stale
+        self.matchers.clear()
+
+    def get_matcher(self, location):
+        """
+        Gets the combined matcher for all of the text filters in this location,
+        except quarantined ones. It is rebuilt lazily after the location's filters
+        change, and shared with any other locations that have exactly the same filters.
+        """
+
+        matcher = self.matchers.get(location)
+        if matcher is None:
+            quarantined = self.quarantined.get(location, ())
+            filters = {
+                text: entry
+                for text, entry in self.filters[location].items()
+                if text not in quarantined
+            }
+            key = frozenset(
+                (text, filter_type) for text, (_, filter_type) in filters.items()
+            )
+
+            matcher = self.shared_matchers.get(key)
+            if matcher is None:
+                logger.debug("Building filter matcher for location %d", location.id)
+                matcher = FilterMatcher(filters)
+                self.shared_matchers[key] = matcher
+                filter_cache.save_later()
+
+            self.matchers[location] = matcher
+        return matcher
 
     def cog_unload(self):
         """
@@ -101,6 +150,58 @@ class Filtering(AbstractCog):
 
         self.bot.remove_listener(self.check_message, "on_message")
         self.bot.remove_listener(self.check_message_edit, "on_message_edit")
+        self.sandbox.close()
+        filter_cache.save()
+
+    def forget_verdicts(self, text):
+        """
+        Clears the remembered verdicts of every matcher with this filter,
+        which may be stale after it was quarantined.
+        """
+
+        for key, matcher in self.shared_matchers.items():
+            if any(filter_text == text for filter_text, _ in key):
+                matcher.verdicts.clear()
+
+    def report_quarantine(self, filter):
+        """
+        Quarantines a filter the regular expression sandbox gave up on, in every
+        location using it, and lets each guild using the filter know.
+        """
+
+        locations = [
+            location
+            for location, filters in self.filters.items()
+            if filter.text in filters and filter.text not in self.quarantined[location]
+        ]
+        for location in locations:
+            self.quarantined[location].add(filter.text)
+            self.matchers.pop(location, None)
+
+        if not locations:
+            return
+
+        self.bot.loop.create_task(self.store_quarantine(filter.text, locations))
+        guilds = {getattr(location, "guild", location) for location in locations}
+
+        content = (
+            f"Filter `{escape_backticks(filter.text)}` took too long to check, "
+            "it is disabled until it is added again"
+        )
+        for guild in guilds:
+            self.journal.send(
+                "quarantine", guild, content, icon="warning", text=filter.text
+            )
+
+    async def store_quarantine(self, text, locations):
+        try:
+            async with self.bot.sql.transaction():
+                for location in locations:
+                    await self.bot.sql.run(
+                        self.bot.sql.filter.add_quarantined_filter, location, text
+                    )
+        except Exception as error:
+            logger.error("Unable to store quarantined filter", exc_info=error)
 
     @commands.group(name="filter")
     @commands.guild_only()
@@ -257,14 +358,16 @@ class Filtering(AbstractCog):
             member_names,
         )
 
-        with self.bot.sql.transaction():
+        async with self.bot.sql.transaction():
             for member in members:
                 logger.debug(
                     "Adding member to filter immune: %s (%d)",
                     member.display_name,
                     member.id,
                 )
-                self.bot.sql.filter.add_filter_immune_user(ctx.guild, member)
+                await self.bot.sql.run(
+                    self.bot.sql.filter.add_filter_immune_user, ctx.guild, member
+                )
 
         for member in members:
             content = (
@@ -300,14 +403,16 @@ class Filtering(AbstractCog):
             member_names,
         )
 
-        with self.bot.sql.transaction():
+        async with self.bot.sql.transaction():
             for member in members:
                 logger.debug(
                     "Removing member to filter immune: %s (%d)",
                     member.display_name,
                     member.id,
                 )
-                self.bot.sql.filter.remove_filter_immune_user(ctx.guild, member)
+                await self.bot.sql.run(
+                    self.bot.sql.filter.remove_filter_immune_user, ctx.guild, member
+                )
 
         for member in members:
             content = f"Removed {member.name}#{member.discriminator} from filter immunity list"
@@ -356,9 +461,11 @@ class Filtering(AbstractCog):
             embed.description = "You do not have permission to enable or disable manage messages filter immunity"
             raise ManualCheckFailure(embed=embed)
         else:
-            with self.bot.sql.transaction():
-                self.bot.sql.filter.set_bot_filter_immunity(
-                    ctx.guild, manage_messages_immune=value
+            async with self.bot.sql.transaction():
+                await self.bot.sql.run(
+                    self.bot.sql.filter.set_bot_filter_immunity,
+                    ctx.guild,
+                    manage_messages_immune=value,
                 )
 
             embed = discord.Embed(colour=discord.Colour.teal())
@@ -399,6 +506,8 @@ class Filtering(AbstractCog):
         a single word to add to the filter.
         """
 
+        await add_filter(self, self.filters, ctx.guild, FilterType.FLAG, text)
+
         content = f"Added guild flag filter for `{escape_backticks(text)}`"
         self.journal.send(
             "guild/new/flag",
@@ -408,7 +517,6 @@ class Filtering(AbstractCog):
             text=text,
             cause=ctx.author,
         )
-        await add_filter(self, self.filters, ctx.guild, FilterType.FLAG, text)
 
     @filter_guild.command(name="block", aliases=["deny", "autoremove", "add"])
     @commands.guild_only()
@@ -422,9 +530,10 @@ class Filtering(AbstractCog):
         a single word to add to the filter.
         """
 
+        await add_filter(self, self.filters, ctx.guild, FilterType.BLOCK, text)
+
         content = f"Added guild block filter for `{escape_backticks(text)}`"
         self.journal.send("guild/new/block", ctx.guild, content, icon="filter")
-        await add_filter(self, self.filters, ctx.guild, FilterType.BLOCK, text)
 
     @filter_guild.command(name="jail", aliases=["dunce", "punish", "mute"])
     @commands.guild_only()
@@ -438,9 +547,10 @@ class Filtering(AbstractCog):
         a single word to add to the filter.
         """
 
+        await add_filter(self, self.filters, ctx.guild, FilterType.JAIL, text)
+
         content = f"Added guild jail filter for `{escape_backticks(text)}`"
         self.journal.send("guild/new/jail", ctx.guild, content, icon="filter")
-        await add_filter(self, self.filters, ctx.guild, FilterType.JAIL, text)
 
     @filter_guild.command(name="remove", aliases=["rm", "delete", "del"])
     @commands.guild_only()
@@ -460,7 +570,7 @@ class Filtering(AbstractCog):
             text=text,
             cause=ctx.author,
         )
-        await delete_filter(self.bot, self.filters, ctx.guild, text)
+        await delete_filter(self, self.filters, ctx.guild, text)
 
     @filter.group(name="channel", aliases=["chan", "ch", "c"])
     @commands.guild_only()
@@ -495,6 +605,8 @@ class Filtering(AbstractCog):
         a single word to add to the filter.
         """
 
+        await add_filter(self, self.filters, channel, FilterType.FLAG, text)
+
         content = f"Added channel flag filter in {channel.mention} for `{escape_backticks(text)}`"
         self.journal.send(
             "channel/new/flag",
@@ -505,7 +617,6 @@ class Filtering(AbstractCog):
             channel=channel,
             cause=ctx.author,
         )
-        await add_filter(self, self.filters, channel, FilterType.FLAG, text)
 
     @filter_channel.command(name="block", aliases=["deny", "autoremove", "add"])
     @commands.guild_only()
@@ -521,6 +632,8 @@ class Filtering(AbstractCog):
         a single word to add to the filter.
         """
 
+        await add_filter(self, self.filters, channel, FilterType.BLOCK, text)
+
         content = f"Added channel block filter in {channel.mention} for `{escape_backticks(text)}`"
         self.journal.send(
             "channel/new/block",
@@ -531,7 +644,6 @@ class Filtering(AbstractCog):
             channel=channel,
             cause=ctx.author,
         )
-        await add_filter(self, self.filters, channel, FilterType.BLOCK, text)
 
     @filter_channel.command(name="jail", aliases=["dunce", "punish", "mute"])
     @commands.guild_only()
@@ -547,6 +659,8 @@ class Filtering(AbstractCog):
         a single word to add to the filter.
         """
 
+        await add_filter(self, self.filters, channel, FilterType.JAIL, text)
+
         content = f"Added channel jail filter in {channel.mention} for `{escape_backticks(text)}`"
         self.journal.send(
             "channel/new/jail",
@@ -557,7 +671,6 @@ class Filtering(AbstractCog):
             channel=channel,
             cause=ctx.author,
         )
-        await add_filter(self, self.filters, channel, FilterType.JAIL, text)
 
     @filter_channel.command(name="remove", aliases=["rm", "delete", "del"])
     @commands.guild_only()
@@ -580,4 +693,4 @@ class Filtering(AbstractCog):
             channel=channel,
             cause=ctx.author,
         )
-        await delete_filter(self.bot, self.filters, channel, text)
+        await delete_filter(self, self.filters, channel, text)
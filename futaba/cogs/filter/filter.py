@@ -17,14 +17,15 @@ import sre_parse
 import sre_compile
 
 from collections.abc import Iterable
+from itertools import product
+from weakref import WeakValueDictionary
 
-from confusable_homoglyphs import confusables
-
-from futaba.str_builder import StringBuilder
+from .cache import filter_cache
+from .skeleton import homoglyph_options, homoglyph_table, skeleton
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["UNICODE_SPACES_REGEX", "Filter"]
+__all__ = ["UNICODE_SPACES_REGEX", "Filter", "get_filter"]
 
 UNICODE_SPACES_REGEX = re.compile(
     "".join(
@@ -43,6 +44,57 @@ UNICODE_SPACES_REGEX = re.compile(
 )
 
 
+# Most spellings of a plain filter that are placed in a matcher
+MAX_SPELLINGS = 64
+
+# Most unbounded repeats a regular expression may have and still run inline
+MAX_INLINE_REPEATS = 2
+
+_REPEATS = tuple(
+    getattr(sre_parse, name)
+    for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_parse, name)
+)
+
+
+def _backtracking_risk(regex_ast, in_repeat, repeats):
+    """
+    Checks for constructs which can make matching take exponential time:
+    repeats or alternations inside of a repeat, and group references.
+    Unbounded repeats are added to the repeats list along the way.
+    """
+
+    for op, av in regex_ast:
+        if op in _REPEATS:
+            _, max_count, item = av
+            repeated = max_count > 1
+            if repeated and in_repeat:
+                return True
+            if max_count == sre_parse.MAXREPEAT:
+                repeats.append(item)
+            if _backtracking_risk(item, in_repeat or repeated, repeats):
+                return True
+        elif op is sre_parse.GROUPREF or op is sre_parse.GROUPREF_EXISTS:
+            return True
+        elif op is sre_parse.BRANCH:
+            if in_repeat:
+                return True
+            for branch in av[1]:
+                if _backtracking_risk(branch, in_repeat, repeats):
+                    return True
+        elif op is sre_parse.SUBPATTERN:
+            if _backtracking_risk(av[-1], in_repeat, repeats):
+                return True
+        elif op is sre_parse.ASSERT or op is sre_parse.ASSERT_NOT:
+            if _backtracking_risk(av[1], in_repeat, repeats):
+                return True
+        elif op is getattr(sre_parse, "ATOMIC_GROUP", None):
+            if _backtracking_risk(av, in_repeat, repeats):
+                return True
+
+    return False
+
+
 class SyntheticPattern:
     __slots__ = ("compiled", "pattern")
 
@@ -55,53 +107,176 @@ class SyntheticPattern:
 
 
 class Filter:
-    __slots__ = ("text", "regex")
+    """
+    A text filter. Its regular expression is only compiled when it is
+    first needed, so loading many filters at startup is cheap.
+    """
+
+    __slots__ = ("text", "source", "_regex", "_options", "_isolated", "__weakref__")
 
     def __init__(self, text):
-        logger.info("Creating filter regular expression from %r", text)
         if text.startswith("regex:") and len(text) > 6:
-            # Build a general regular expression, de-confusifying LITERALs
-            pattern = text[6:].encode()
-            regex_ast = sre_parse.parse(pattern)
+            source = text[6:]
+        elif text.startswith("raw-regex:") and len(text) > 10:
+            source = text[10:]
+        else:
+            source = None
+
+        self.text = text
+        self.source = source
+        self._regex = None
+        self._options = None
+        self._isolated = None
+
+    @property
+    def options(self):
+        """
+        For plain filters, the skeletons accepted in place of each character
+        of the text. None for regular expressions.
+        """
+
+        if self._options is None and not self.is_regex:
+            self._options = [homoglyph_options(char) for char in self.text]
+        return self._options
+
+    @property
+    def spellings(self):
+        """
+        Every skeleton a plain filter matches, or None if there are
+        more than MAX_SPELLINGS of them.
+        """
+
+        count = 1
+        for options in self.options:
+            count *= len(options)
+            if count > MAX_SPELLINGS:
+                return None
+
+        return ["".join(parts) for parts in product(*self.options)]
+
+    @property
+    def regex(self):
+        return self.compile()
+
+    def compile(self):
+        """Compiles the filter's regular expression, if it hasn't been already."""
+
+        if self._regex is not None:
+            return self._regex
+
+        logger.info("Creating filter regular expression from %r", self.text)
+        if self.is_raw_regex:
+            compiled = re.compile(self.source, re.IGNORECASE)
+        elif self.is_regex:
+            # Build a general regular expression, matching against skeletons
+            regex_ast = sre_parse.parse(self.source)
             regex_ast = Filter.convert_raw_regex_ast(regex_ast)
             compiled = sre_compile.compile(regex_ast, re.IGNORECASE)
             compiled = SyntheticPattern(compiled, "<synthetic regular expression>")
-        elif text.startswith("raw-regex:") and len(text) > 10:
-            pattern = text[10:].encode()
-            compiled = re.compile(pattern, re.IGNORECASE)
         else:
-            groups = confusables.is_confusable(text, greedy=True)
-            if groups:
-                pattern = Filter.build_regex(text, groups)
-            else:
-                pattern = re.escape(text)
-            compiled = re.compile(pattern, re.IGNORECASE)
+            pattern = "".join(map(Filter._alternatives, self.options))
+            compiled = re.compile(pattern)
 
         logger.debug("Generated pattern: %r", compiled.pattern)
+        self._regex = compiled
+        return compiled
 
-        self.text = text
-        self.regex = compiled
+    @property
+    def is_regex(self):
+        return self.source is not None
+
+    @property
+    def is_raw_regex(self):
+        return self.is_regex and self.text.startswith("raw-regex:")
+
+    @property
+    def is_isolated(self):
+        """
+        Whether the filter is a regular expression that could take too long
+        to run on the event loop, and needs to be run in a worker instead.
+        """
+
+        if self._isolated is None:
+            self._isolated = False
+            if self.is_regex:
+                try:
+                    regex_ast = sre_parse.parse(self.source)
+                except re.error:
+                    # Fails when compiled instead
+                    return False
+
+                repeats = []
+                self._isolated = (
+                    _backtracking_risk(regex_ast, False, repeats)
+                    or len(repeats) > MAX_INLINE_REPEATS
+                )
+
+        return self._isolated
 
     @staticmethod
-    def build_regex(text, groups):
-        # Build similar character tree
-        chars = {}
-        pattern = StringBuilder()
-        for group in groups:
-            pattern.write("[")
-            char = group["character"]
-            pattern.write(re.escape(char))
-            for homoglyph in group["homoglyphs"]:
-                pattern.write(re.escape(homoglyph["c"]))
-            pattern.write("]")
-            chars[char] = str(pattern)
-            pattern.clear()
-
-        # Create pattern
-        for char in text:
-            pattern.write(chars.get(char, char))
-
-        return str(pattern)
+    def _alternatives(options):
+        if len(options) == 1:
+            return re.escape(options[0])
+
+        return f"(?:{'|'.join(map(re.escape, options))})"
+
+    @staticmethod
+    def _skeleton_char(code):
+        char = skeleton(chr(code))
+        return ord(char) if len(char) == 1 else code
+
+    @staticmethod
+    def _convert_literal(code):
+        # Accept the same homoglyphs as a plain filter would
+        codes = [ord(char) for char in homoglyph_options(chr(code)) if len(char) == 1]
+        if not codes:
+            return (sre_parse.LITERAL, code)
+        if len(codes) == 1:
+            return (sre_parse.LITERAL, codes[0])
+
+        return (sre_parse.IN, [(sre_parse.LITERAL, code) for code in codes])
+
+    @staticmethod
+    def _convert_set(items):
+        """
+        Adds the skeletons of the characters a set accepts to it, since
+        content is folded before matching. Negated sets are extended before
+        they are negated, so they still reject the homoglyphs of what they
+        list. Only characters which fold to a different one need checking,
+        but there are a few thousand, so the result is kept in the compiled
+        filter cache.
+        """
+
+        negated = items[0][0] is sre_parse.NEGATE
+        positive = items[1:] if negated else items
+
+        # Classes like \d and \w are kept as they are, since the homoglyphs
+        # of a digit or word character are not necessarily one themselves
+        listed = [item for item in positive if item[0] is not sre_parse.CATEGORY]
+
+        key = repr(positive)
+        codes = filter_cache.sets.get(key)
+        if codes is None:
+            targets = set()
+            if listed:
+                state = sre_parse.State()
+                listed_regex = sre_compile.compile(
+                    sre_parse.SubPattern(state, [(sre_parse.IN, listed)]),
+                    re.IGNORECASE,
+                )
+                set_regex = sre_compile.compile(
+                    sre_parse.SubPattern(state, [(sre_parse.IN, positive)]),
+                    re.IGNORECASE,
+                )
+
+                for code, target in homoglyph_table().items():
+                    if listed_regex.match(chr(code)) and not set_regex.match(target):
+                        targets.add(ord(target))
+
+            codes = sorted(targets)
+            filter_cache.add_set(key, codes)
+
+        return items + [(sre_parse.LITERAL, code) for code in codes]
 
     @staticmethod
     def convert_raw_regex_ast(regex_ast: Iterable):
@@ -109,34 +284,31 @@ class Filter:
             # Parse lexemes for LITERALs
             if isinstance(value, tuple):
                 lexeme_tuple = value
-                if lexeme_tuple[0] == sre_parse.LITERAL:
-                    # LITERAL found, check if it's a confusable homoglyph...
-                    groups = confusables.is_confusable(
-                        chr(lexeme_tuple[1]), greedy=True
+                if lexeme_tuple[0] is sre_parse.LITERAL:
+                    regex_ast[index] = Filter._convert_literal(lexeme_tuple[1])
+                elif lexeme_tuple[0] is sre_parse.NOT_LITERAL:
+                    # Match the character's skeleton instead
+                    code = Filter._skeleton_char(lexeme_tuple[1])
+                    regex_ast[index] = (sre_parse.NOT_LITERAL, code)
+                elif lexeme_tuple[0] is sre_parse.IN:
+                    # Character sets can't nest
+                    regex_ast[index] = (
+                        sre_parse.IN,
+                        Filter._convert_set(lexeme_tuple[1]),
                     )
-                    if not groups:
-                        continue
-                    # Convert group into list of confusable LITERALs
-                    group = groups[0]  # one char, so only one group
-                    confusable_literals = [lexeme_tuple]
-                    for homoglyph in group["homoglyphs"]:
-                        confusable_literals += [
-                            (sre_parse.LITERAL, ord(char)) for char in homoglyph["c"]
-                        ]
-                    in_lexeme_tuple = (sre_parse.IN, confusable_literals)
-
-                    # Overwrite this lexeme
-                    regex_ast[index] = in_lexeme_tuple
                 else:
                     # More possible lexemes, recurse and overwrite...
                     regex_ast[index] = tuple(Filter.convert_raw_regex_ast(list(value)))
-            elif isinstance(value, sre_parse.SubPattern):
+            elif isinstance(value, (list, sre_parse.SubPattern)):
+                # Subpatterns, or the list of alternatives in a BRANCH
                 regex_ast[index] = Filter.convert_raw_regex_ast(value)
 
         return regex_ast
 
     def matches(self, content):
         contents = (content, UNICODE_SPACES_REGEX.sub("", content))
+        if not self.is_raw_regex:
+            contents = map(skeleton, contents)
 
         return bool(any(map(self.regex.search, contents)))
 
@@ -149,3 +321,21 @@ class Filter:
             and isinstance(other, Filter)
             and self.text == other.text
         )
+
+
+# Filters currently in use anywhere, by text
+_filters = WeakValueDictionary()
+
+
+def get_filter(text):
+    """
+    Gets the filter for this text. The same filter is often added in many
+    guilds and channels, and they all share one object, so it is only
+    compiled once.
+    """
+
+    filter = _filters.get(text)
+    if filter is None:
+        filter = Filter(text)
+        _filters[text] = filter
+    return filter
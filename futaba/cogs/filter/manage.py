@@ -20,8 +20,9 @@ from futaba.enums import FilterType
 from futaba.exceptions import CommandFailed
 from futaba.str_builder import StringBuilder
 from futaba.unicode import READABLE_CHAR_SET, unicode_repr
+from futaba.utils import escape_backticks
 from .check import check_all_members_on_filter
-from .filter import Filter
+from .filter import get_filter
 
 HEXADECIMAL_REGEX = re.compile(r"[A-Fa-f0-9]+")
 
@@ -51,33 +52,57 @@ async def add_filter(cog, filters, location, level, text):
         location.id,
     )
 
+    # Compiled now instead of on first use, so a bad pattern isn't stored
+    filter = get_filter(text)
     try:
-        with cog.bot.sql.transaction():
+        filter.compile()
+    except (re.error, RecursionError, OverflowError) as error:
+        logger.info("Invalid filter pattern %r", text, exc_info=error)
+        embed = discord.Embed(colour=discord.Colour.red())
+        embed.set_author(name="Invalid filter pattern")
+        embed.description = f"`{escape_backticks(text)}`: {error}"
+        raise CommandFailed(embed=embed)
+
+    try:
+        async with cog.bot.sql.transaction():
             if text in filters[location]:
-                cog.bot.sql.filter.update_filter(location, level, text)
+                update = cog.bot.sql.filter.update_filter
             else:
-                cog.bot.sql.filter.add_filter(location, level, text)
+                update = cog.bot.sql.filter.add_filter
+
+            await cog.bot.sql.run(update, location, level, text)
+
+            # Adding a filter again releases it, but only in this location
+            if text in cog.quarantined.get(location, ()):
+                await cog.bot.sql.run(
+                    cog.bot.sql.filter.remove_quarantined_filter, location, text
+                )
     except Exception as error:
         logger.error("Error adding filter", exc_info=error)
         raise CommandFailed()
     else:
-        filter = Filter(text)
         filters[location][text] = (filter, level)
+        cog.matchers.pop(location, None)
+        if text in cog.quarantined.get(location, ()):
+            cog.quarantined[location].discard(text)
+            cog.forget_verdicts(text)
 
     if isinstance(location, discord.Guild):
         logger.debug("Checking all members against new guild text filter")
         cog.bot.loop.create_task(check_all_members_on_filter(cog, location, filter))
 
 
-async def delete_filter(bot, filters, location, text):
+async def delete_filter(cog, filters, location, text):
     logger.info(
         "Removing %r from server filter for '%s' (%d)", text, location.name, location.id
     )
 
     try:
-        with bot.sql.transaction():
-            if bot.sql.filter.delete_filter(location, text):
+        async with cog.bot.sql.transaction():
+            if await cog.bot.sql.run(cog.bot.sql.filter.delete_filter, location, text):
                 filters[location].pop(text, None)
+                cog.quarantined[location].discard(text)
+                cog.matchers.pop(location, None)
                 logger.debug("Succesfully removed filter")
             else:
                 logger.debug("Filter was not present, deletion failed")
@@ -144,13 +169,15 @@ async def add_content_filter(bot, guild, filters, level, hexsum, description):
 
     try:
         hashsum = bytes.fromhex(hexsum)
-        with bot.sql.transaction():
+        async with bot.sql.transaction():
             if hashsum in filters[guild]:
                 logger.debug("Updating existing content filter")
-                bot.sql.filter.update_content_filter(guild, level, hashsum, description)
+                update = bot.sql.filter.update_content_filter
             else:
                 logger.debug("Adding new content filter")
-                bot.sql.filter.add_content_filter(guild, level, hashsum, description)
+                update = bot.sql.filter.add_content_filter
+
+            await bot.sql.run(update, guild, level, hashsum, description)
 
         filters[guild][hashsum] = (level, description)
     except Exception as error:
@@ -163,10 +190,10 @@ async def delete_content_filter(bot, guild, filters, hexsums):
 
     try:
         hashsums = [bytes.fromhex(hexsum) for hexsum in hexsums]
-        with bot.sql.transaction():
+        async with bot.sql.transaction():
             for hashsum in hashsums:
                 if hashsum in filters[guild]:
-                    bot.sql.filter.delete_filter(guild, hashsum)
+                    await bot.sql.run(bot.sql.filter.delete_filter, guild, hashsum)
                     filters[guild].pop(hashsum, None)
                     logger.debug("Succesfully removed hashsum from filter")
                 else:
@@ -0,0 +1,280 @@
+#
+# cogs/filter/matcher.py
+#
+# futaba - A Discord Mod bot for the Programming server
+# Copyright (c) 2017-2020 Jake Richardson, Emmie Smith, jackylam5
+#
+# futaba is available free of charge under the terms of the MIT
+# License. You are free to redistribute and/or modify it under those
+# terms. It is distributed in the hopes that it will be useful, but
+# WITHOUT ANY WARRANTY. See the LICENSE file for more details.
+#
+
+"""
+Combines all of the text filters for a location into one matcher, so that
+content is scanned once instead of once per filter.
+
+Literal filters are placed in an Aho-Corasick automaton, which is run over
+the skeleton of the content, so most homoglyphs are already folded together
+and only one state needs following. The few ASCII characters that stand in
+for others (such as "1" for "l") are handled by adding each spelling of
+the filter to the automaton. Regular expression
+filters are merged into a single alternation of lookaheads, ordered by
+severity, so the first alternative matching at any position is the most
+severe one that can match there. Regular expressions which could take too
+long to run inline are checked one at a time through the RegexSandbox,
+only when they are more severe than anything already found.
+
+Each matcher also remembers its verdicts for recently searched content,
+since spam and names are often checked many times over. A matcher is
+replaced whenever its location's filters change, so they never go stale.
+"""
+
+# pylint: disable=no-member
+import hashlib
+import logging
+import re
+import sre_compile
+import sre_parse
+
+from .filter import UNICODE_SPACES_REGEX, Filter
+from futaba.lru import LruCache
+from .sandbox import UNKNOWN
+from .skeleton import skeleton
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["FilterMatcher"]
+
+# Number of search results each matcher remembers
+MAX_VERDICTS = 1000
+
+_MISSING = object()
+
+
+def _has_backreferences(regex_ast):
+    for value in regex_ast:
+        if isinstance(value, tuple):
+            if value and value[0] in (sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS):
+                return True
+            if _has_backreferences(value):
+                return True
+        elif isinstance(value, (list, sre_parse.SubPattern)):
+            if _has_backreferences(value):
+                return True
+    return False
+
+
+def _can_merge(source):
+    """
+    Checks if the regular expression can be placed in a larger alternation.
+    Group references, named groups and global flags all depend on the
+    pattern being on its own.
+    """
+
+    try:
+        regex_ast = sre_parse.parse(source)
+    except re.error:
+        return None
+
+    if regex_ast.state.groupdict or regex_ast.state.flags & ~re.UNICODE:
+        return None
+
+    if _has_backreferences(regex_ast):
+        return None
+
+    # Number of capturing groups in the pattern
+    return regex_ast.state.groups - 1
+
+
+class FilterMatcher:
+    __slots__ = (
+        "goto",
+        "fail",
+        "output",
+        "alternations",
+        "fallback",
+        "isolated",
+        "verdicts",
+        "__weakref__",
+    )
+
+    def __init__(self, filters):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        self.alternations = []
+        self.fallback = []
+        self.isolated = []
+        self.verdicts = LruCache(MAX_VERDICTS)
+
+        regexes = []
+        raw_regexes = []
+        for filter_text, (filter, filter_type) in filters.items():
+            if not filter.is_regex:
+                spellings = filter.spellings
+                if spellings is None:
+                    logger.debug("Filter %r has too many spellings", filter_text)
+                    self.fallback.append((filter, filter_type))
+                    continue
+
+                for spelling in spellings:
+                    self._add_literal(filter, filter_type, spelling)
+                continue
+
+            if filter.is_isolated:
+                self.isolated.append((filter, filter_type))
+                continue
+
+            groups = _can_merge(filter.source)
+            if groups is None:
+                logger.debug("Filter %r cannot be merged, checking alone", filter_text)
+                self.fallback.append((filter, filter_type))
+            elif filter.is_raw_regex:
+                raw_regexes.append((filter, filter_type, groups))
+            else:
+                regexes.append((filter, filter_type, groups))
+
+        self.isolated.sort(key=lambda item: item[1].level, reverse=True)
+        self._build_automaton()
+        self._add_alternation(regexes, convert=True)
+        self._add_alternation(raw_regexes, convert=False)
+
+    def _add_literal(self, filter, filter_type, spelling):
+        # Walk the trie, adding nodes as necessary
+        state = 0
+        for char in spelling:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = next_state
+            state = next_state
+
+        self.output[state].append((filter.text, filter_type))
+
+    def _build_automaton(self):
+        # Breadth-first, so failure links always point to finished nodes
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+
+                fail = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = fail
+                self.output[next_state].extend(self.output[fail])
+
+    def _add_alternation(self, regexes, convert):
+        if not regexes:
+            return
+
+        # Most severe first, see the module docstring
+        regexes.sort(key=lambda item: item[1].level, reverse=True)
+
+        branches = []
+        indexes = {}
+        index = 1
+        for filter, filter_type, groups in regexes:
+            branches.append(f"(?=({filter.source}))")
+            indexes[index] = (filter.text, filter_type)
+            index += groups + 1
+
+        try:
+            regex_ast = sre_parse.parse("|".join(branches))
+            if convert:
+                regex_ast = Filter.convert_raw_regex_ast(regex_ast)
+            compiled = sre_compile.compile(regex_ast, re.IGNORECASE)
+        except (re.error, RecursionError, OverflowError) as error:
+            logger.warning("Unable to merge regular expressions", exc_info=error)
+            self.fallback.extend(item[:2] for item in regexes)
+            return
+
+        self.alternations.append((compiled, indexes, convert))
+
+    def _scan(self, content, found):
+        if len(self.goto) == 1:
+            return
+
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        state = 0
+
+        for char in content:
+            while state and char not in goto[state]:
+                state = fail[state]
+
+            state = goto[state].get(char, 0)
+            for filter_text, filter_type in output[state]:
+                found.setdefault(filter_text, filter_type)
+
+    def findall(self, content):
+        """
+        Returns a dictionary of filter text to filter type for filters which
+        match the content, besides isolated ones. For regular expressions, only
+        the most severe filter matching at each position is reported, so the
+        most severe match overall is always included.
+        """
+
+        found = {}
+        contents = [content]
+        stripped = UNICODE_SPACES_REGEX.sub("", content)
+        if stripped != content:
+            contents.append(stripped)
+
+        for to_check in contents:
+            to_check_skeleton = skeleton(to_check)
+            self._scan(to_check_skeleton, found)
+
+            for regex, indexes, folded in self.alternations:
+                for match in regex.finditer(to_check_skeleton if folded else to_check):
+                    found.setdefault(*indexes[match.lastindex])
+
+        for filter, filter_type in self.fallback:
+            if filter.text not in found and filter.matches(content):
+                found[filter.text] = filter_type
+
+        return found
+
+    async def search(self, content, sandbox):
+        """
+        Returns the filter text and type of the most severe filter
+        that matches the content, or None if there are no matches.
+        """
+
+        # Keyed on the exact content, since raw-regex: filters see it unfolded
+        key = hashlib.blake2b(
+            content.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+        verdict = self.verdicts.get(key, _MISSING)
+        if verdict is _MISSING:
+            verdict, complete = await self._search(content, sandbox)
+            if complete:
+                self.verdicts[key] = verdict
+            else:
+                logger.info("Not remembering verdict, some filters were not checked")
+        return verdict
+
+    async def _search(self, content, sandbox):
+        found = self.findall(content)
+        result = max(found.items(), key=lambda item: item[1].level, default=None)
+        complete = True
+
+        # Most severe first, so the first match is the only one needed
+        for filter, filter_type in self.isolated:
+            if result is not None and filter_type.level <= result[1].level:
+                break
+
+            matched = await sandbox.matches(filter, content)
+            if matched is UNKNOWN:
+                complete = False
+            elif matched:
+                return (filter.text, filter_type), complete
+
+        return result, complete
@@ -0,0 +1,209 @@
+#
+# cogs/filter/sandbox.py
+#
+# futaba - A Discord Mod bot for the Programming server
+# Copyright (c) 2017-2020 Jake Richardson, Emmie Smith, jackylam5
+#
+# futaba is available free of charge under the terms of the MIT
+# License. You are free to redistribute and/or modify it under those
+# terms. It is distributed in the hopes that it will be useful, but
+# WITHOUT ANY WARRANTY. See the LICENSE file for more details.
+#
+
+"""
+Runs regular expression filters which could backtrack catastrophically in
+worker processes, so that one bad pattern can't freeze the bot.
+
+Each check has a time budget. A worker that runs over it is killed and
+replaced, and the filter is handed to on_quarantine, which stops it being
+checked until it is added again. Filters which are not at risk still run
+inline, see Filter.is_isolated.
+
+Each worker compiles a filter the first time it is asked to check it, under
+a separate, longer timeout, so only matching counts against the budget.
+If a filter couldn't be checked, the result is UNKNOWN rather than no match.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+
+from .cache import filter_cache
+from .filter import Filter
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["UNKNOWN", "RegexSandbox"]
+
+# Longest a filter may take to check some content, in seconds
+TIME_BUDGET = 0.5
+
+# How long a new worker may take to start, in seconds
+STARTUP_TIMEOUT = 60
+
+# How long a worker may take to compile a filter, in seconds
+COMPILE_TIMEOUT = 10
+
+# Result of a check which could not be carried out
+UNKNOWN = object()
+
+# Number of worker processes
+WORKERS = 2
+
+
+def _run_worker(conn, cache_path):
+    # Reuses the skeleton table instead of building it in each worker
+    filter_cache.open(cache_path)
+    filters = {}
+
+    # Signal that the worker is ready
+    conn.send(None)
+
+    while True:
+        try:
+            text, content = conn.recv()
+        except EOFError:
+            return
+
+        # Anything a filter raises must not take the worker down with it
+        try:
+            filter = filters.get(text)
+            if filter is None:
+                filter = filters[text] = Filter(text)
+
+            if content is None:
+                filter.compile()
+                result = True
+            else:
+                result = filter.matches(content)
+        except Exception:
+            result = False
+
+        conn.send(result)
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "compiled")
+
+    def __init__(self, context, cache_path):
+        self.compiled = set()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_run_worker, args=(child_conn, cache_path), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    async def receive(self, timeout):
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, self.conn.poll, timeout):
+            raise asyncio.TimeoutError
+
+        return self.conn.recv()
+
+    def stop(self):
+        self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+
+class RegexSandbox:
+    __slots__ = (
+        "context",
+        "cache_path",
+        "on_quarantine",
+        "slots",
+        "workers",
+        "idle",
+    )
+
+    def __init__(self, cache_path, on_quarantine):
+        self.context = multiprocessing.get_context("spawn")
+        self.cache_path = cache_path
+        self.on_quarantine = on_quarantine
+        self.slots = asyncio.Semaphore(WORKERS)
+        self.workers = set()
+        self.idle = []
+
+    async def _start_worker(self):
+        logger.info("Starting regular expression worker")
+        worker = _Worker(self.context, self.cache_path)
+        self.workers.add(worker)
+
+        try:
+            await worker.receive(STARTUP_TIMEOUT)
+        except BaseException:
+            self._discard(worker)
+            raise
+
+        return worker
+
+    def _discard(self, worker):
+        self.workers.discard(worker)
+        worker.stop()
+
+    def quarantine(self, filter):
+        logger.warning("Quarantining slow filter %r", filter.text)
+        self.on_quarantine(filter)
+
+    async def matches(self, filter, content):
+        """
+        Checks if the filter matches the content, in a worker if it needs one.
+        Returns UNKNOWN if the check couldn't be carried out.
+        """
+
+        if not filter.is_isolated:
+            return filter.matches(content)
+
+        async with self.slots:
+            return await self._check(filter, content)
+
+    async def _check(self, filter, content):
+        try:
+            worker = self.idle.pop() if self.idle else await self._start_worker()
+        except (asyncio.TimeoutError, EOFError, OSError) as error:
+            logger.error("Unable to start regular expression worker", exc_info=error)
+            return UNKNOWN
+
+        try:
+            if filter.text not in worker.compiled:
+                worker.conn.send((filter.text, None))
+                await worker.receive(COMPILE_TIMEOUT)
+                worker.compiled.add(filter.text)
+        except asyncio.TimeoutError:
+            logger.error("Compiling filter %r in worker took too long", filter.text)
+            self._discard(worker)
+            return UNKNOWN
+        except (EOFError, OSError) as error:
+            logger.error("Regular expression worker failed", exc_info=error)
+            self._discard(worker)
+            return UNKNOWN
+        except BaseException:
+            self._discard(worker)
+            raise
+
+        try:
+            worker.conn.send((filter.text, content))
+            result = await worker.receive(TIME_BUDGET)
+        except asyncio.TimeoutError:
+            self._discard(worker)
+            self.quarantine(filter)
+            return UNKNOWN
+        except (EOFError, OSError) as error:
+            logger.error("Regular expression worker failed", exc_info=error)
+            self._discard(worker)
+            return UNKNOWN
+        except BaseException:
+            # Interrupted, the worker may still be busy
+            self._discard(worker)
+            raise
+
+        self.idle.append(worker)
+        return result
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+
+        self.workers.clear()
+        self.idle.clear()
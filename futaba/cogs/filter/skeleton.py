@@ -0,0 +1,172 @@
+#
+# cogs/filter/skeleton.py
+#
+# futaba - A Discord Mod bot for the Programming server
+# Copyright (c) 2017-2020 Jake Richardson, Emmie Smith, jackylam5
+#
+# futaba is available free of charge under the terms of the MIT
+# License. You are free to redistribute and/or modify it under those
+# terms. It is distributed in the hopes that it will be useful, but
+# WITHOUT ANY WARRANTY. See the LICENSE file for more details.
+#
+
+"""
+Folds text into a "skeleton", where characters that look alike are
+replaced by the same one. Filters and message content are both folded,
+so matching them against each other doesn't need to consider most homoglyphs.
+
+Characters that look like an ASCII character become that character, and
+remaining look-alikes are grouped among themselves. ASCII characters are
+never folded, since patterns rely on them staying distinct (digits,
+word characters, punctuation). The few ASCII characters that filters also
+accept in place of each other, such as "l" and "1", are given per filter
+character by homoglyph_options() instead.
+"""
+
+import logging
+import string
+from functools import lru_cache
+
+from .cache import filter_cache
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "build_homoglyph_table",
+    "homoglyph_options",
+    "homoglyph_table",
+    "skeleton",
+]
+
+ASCII_CHAR_SET = frozenset(string.printable) - frozenset(string.whitespace)
+
+
+class _Groups:
+    """Union-find over characters, where each group is led by its lowest one."""
+
+    __slots__ = ("parent",)
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, char):
+        parent = self.parent
+        root = parent.setdefault(char, char)
+        while parent[root] != root:
+            root = parent[root]
+
+        # Point everything on the way straight at the root
+        while parent[char] != root:
+            parent[char], char = root, parent[char]
+
+        return root
+
+    def union(self, first, second):
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            self.parent[max(first, second)] = min(first, second)
+
+
+def _ascii_target(chars):
+    # Prefer letters, so words stay words in skeletons, then digits
+    return min(chars, key=lambda char: (not char.isalpha(), not char.isalnum(), char))
+
+
+def build_homoglyph_table():
+    """
+    Builds the translation table from lowercase characters to their
+    skeleton characters. Characters that are their own skeleton are left out.
+    """
+
+    # Only needed when the table isn't cached, and slow to import
+    from confusable_homoglyphs.confusables import confusables_data
+
+    logger.info("Building homoglyph skeleton table")
+
+    # Lowercase character -> lowercase single-character homoglyphs
+    homoglyphs = {}
+    for char, entries in confusables_data.items():
+        if len(char) != 1 or len(char.lower()) != 1:
+            continue
+
+        lower = char.lower()
+        found = homoglyphs.setdefault(lower, set())
+        for entry in entries:
+            if len(entry["c"]) == 1 and len(entry["c"].lower()) == 1:
+                found.add(entry["c"].lower())
+
+    # Non-ASCII characters fold into an ASCII character they look like, if
+    # any, otherwise they are grouped with the other characters they look like
+    table = {}
+    other_groups = _Groups()
+    for char, found in homoglyphs.items():
+        if char in ASCII_CHAR_SET:
+            continue
+
+        targets = found & ASCII_CHAR_SET
+        if targets:
+            table[ord(char)] = _ascii_target(targets)
+        else:
+            other_groups.union(char, char)
+
+    for char in tuple(other_groups.parent):
+        for homoglyph in homoglyphs[char]:
+            if homoglyph in other_groups.parent:
+                other_groups.union(char, homoglyph)
+
+    for char in tuple(other_groups.parent):
+        leader = other_groups.find(char)
+        if leader != char:
+            table[ord(char)] = leader
+
+    logger.debug("Homoglyph skeleton table has %d entries", len(table))
+    return table
+
+
+@lru_cache(maxsize=None)
+def homoglyph_table():
+    """
+    Gets the skeleton translation table, from the compiled filter cache
+    if it has one. Otherwise it is built and added to the cache.
+    """
+
+    if filter_cache.table is None:
+        filter_cache.set_table(build_homoglyph_table())
+
+    return filter_cache.table
+
+
+def skeleton(text):
+    """Gets the skeleton of the text, which is also lowercase."""
+
+    return text.lower().translate(homoglyph_table())
+
+
+def homoglyph_options(char):
+    """
+    Gets the skeletons which a filter should accept in place of this
+    character, itself first. These are the confusable homoglyphs filters
+    have always accepted, except that for ASCII characters only other
+    ASCII characters are needed, since content is folded.
+    """
+
+    options = filter_cache.options.get(char)
+    if options is None:
+        # Only needed when the options aren't cached, and slow to import
+        from confusable_homoglyphs import confusables
+
+        options = [skeleton(char)]
+        for group in confusables.is_confusable(char, greedy=True) or ():
+            for homoglyph in group["homoglyphs"]:
+                # Sequences count as their characters, like they always have
+                for other in homoglyph["c"]:
+                    if char.isascii() and not other.isascii():
+                        continue
+
+                    other = skeleton(other)
+                    if other not in options:
+                        options.append(other)
+
+        filter_cache.add_options(char, options)
+
+    return options
@@ -30,6 +30,7 @@ async def setup_info(bot: Bot):
 async def setup_alias(bot: Bot):
     cog = Alias(bot)
     bot.add_listener(cog.member_update, "on_member_update")
+    bot.add_listener(cog.user_update, "on_user_update")
     await bot.add_cog(cog)
 
 
@@ -15,9 +15,7 @@ Tracking for aliases of members, storing previous usernames, nicknames, and avat
 """
 
 import logging
-import re
 from datetime import datetime
-from io import BytesIO
 
 import discord
 from discord.ext import commands
@@ -29,13 +27,12 @@ from futaba.exceptions import CommandFailed, SendHelp
 from futaba.str_builder import StringBuilder
 from futaba.utils import fancy_timedelta, user_discrim
 from ..abc import AbstractCog
+from .avatars import AvatarCapture
 
 logger = logging.getLogger(__name__)
 
 __all__ = ["Alias"]
 
-EXTENSION_REGEX = re.compile(r"/\w+\.(\w+)(?:\?.+)?$")
-
 
 class MemberChanges:
     __slots__ = ("avatar_url", "username", "nickname")
@@ -57,87 +54,115 @@ class Alias(AbstractCog):
     Cog for member alias information.
     """
 
-    __slots__ = ("journal",)
+    __slots__ = ("journal", "avatars")
 
     def __init__(self, bot):
         super().__init__(bot)
         self.journal = bot.get_broadcaster("/alias")
+        self.avatars = AvatarCapture(bot)
 
     def setup(self):
         pass
 
+    def cog_unload(self):
+        """
+        Stop capturing avatars when unloading the cog.
+        """
+
+        self.avatars.close()
+
     async def member_update(self, before, after: Member):
         """Handles update of member information."""
 
+        # Usernames and avatars belong to the user, see user_update()
+        if before.nick == after.nick or after.nick is None:
+            return
+
+        logger.info(
+            "Member '%s' (%d) has changed nick to '%s'",
+            before.display_name,
+            before.id,
+            after.nick,
+        )
+        changes = MemberChanges()
+        changes.nickname = after.nick
+
+        sql = self.bot.sql
+        async with sql.transaction():
+            await sql.run(sql.alias.add_nickname, before, datetime.now(), after.nick)
+
+        content = f"{user_discrim(before)} updated nick: {changes.nickname}"
+        self.journal.send(
+            "member/update",
+            before.guild,
+            content,
+            icon="person",
+            before=before,
+            after=after,
+            changes=changes,
+        )
+
+    async def user_update(self, before, after):
+        """
+        Handles update of user information. This is only reported once
+        for all guilds, so each change is stored once.
+        """
+
         changes = MemberChanges()
         timestamp = datetime.now()
 
         if before.avatar != after.avatar:
             logger.info(
-                "Member '%s' (%d) has changed their profile picture (%s)",
+                "User '%s' (%d) has changed their profile picture (%s)",
                 before.name,
                 before.id,
                 after.avatar,
             )
-            changes.avatar_url = after.avatar.url
+            changes.avatar_url = after.display_avatar.url
 
         if before.name != after.name:
             logger.info(
-                "Member '%s' (%d) has changed name to '%s'",
+                "User '%s' (%d) has changed name to '%s'",
                 before.name,
                 before.id,
                 after.name,
             )
             changes.username = after.name
 
-        if before.nick != after.nick and after.nick is not None:
-            logger.info(
-                "Member '%s' (%d) has changed nick to '%s'",
-                before.display_name,
-                before.id,
-                after.nick,
-            )
-            changes.nickname = after.nick
-
         # Check if there were any changes
         if not changes:
             return
 
         attrs = StringBuilder(sep=", ")
-        with self.bot.sql.transaction():
-            if changes.avatar_url is not None:
-                avatar, avatar_ext = await self._download_avatar(changes.avatar_url)
-                self.bot.sql.alias.add_avatar(before, timestamp, avatar, avatar_ext)
-                attrs.write(f"avatar: {changes.avatar_url}")
-            if changes.username is not None:
-                self.bot.sql.alias.add_username(before, timestamp, changes.username)
-                attrs.write(f"name: {changes.username}")
-            if changes.nickname is not None:
-                self.bot.sql.alias.add_nickname(before, timestamp, changes.nickname)
-                attrs.write(f"nick: {changes.nickname}")
+        if changes.avatar_url is not None:
+            # Fetched and stored in the background, outside any transaction
+            if after.avatar is not None:
+                self.avatars.add(before, timestamp, after.avatar)
+            attrs.write(f"avatar: {changes.avatar_url}")
+
+        if changes.username is not None:
+            sql = self.bot.sql
+            async with sql.transaction():
+                await sql.run(
+                    sql.alias.add_username, before, timestamp, changes.username
+                )
+            attrs.write(f"name: {changes.username}")
 
         content = f"{user_discrim(before)} updated {attrs}"
-        self.journal.send(
-            "member/update",
-            before.guild,
-            content,
-            icon="person",
-            before=before,
-            after=after,
-            changes=changes,
-        )
-
-    async def _download_avatar(self, asset):
-        avatar = BytesIO()
-        avatar_url = str(asset)
-        await asset.save(avatar)
-
-        match = EXTENSION_REGEX.findall(avatar_url)
-        if not match:
-            raise ValueError(f"Avatar URL does not match extension regex: {avatar_url}")
-
-        avatar_ext = match[0]
-        return avatar, avatar_ext
+        for guild in after.mutual_guilds:
+            member = guild.get_member(after.id)
+            if member is None:
+                continue
+
+            self.journal.send(
+                "member/update",
+                guild,
+                content,
+                icon="person",
+                before=before,
+                after=member,
+                changes=changes,
+            )
 
     @commands.command(name="aliases")
     async def aliases(self, ctx, *, user: UserConv):
@@ -233,8 +258,10 @@ class Alias(AbstractCog):
             embed.description = "Both users are the same person!"
             raise CommandFailed(embed=embed)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.alias.add_possible_alt(ctx.guild, first_user, second_user)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.alias.add_possible_alt, ctx.guild, first_user, second_user
+            )
 
         content = f"Added {first_user.mention} and {second_user.mention} as possible alt accounts."
         self.journal.send(
@@ -251,8 +278,10 @@ class Alias(AbstractCog):
     async def del_alt_chain(self, ctx, user: UserConv):
         """Removes all suspected alternate accounts for a user."""
 
-        with self.bot.sql.transaction():
-            self.bot.sql.alias.all_delete_possible_alts(ctx.guild, user)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.alias.all_delete_possible_alts, ctx.guild, user
+            )
 
         content = f"Removed all alt accounts in {user.mention}'s chain"
         self.journal.send("alt/clear", ctx.guild, content, icon="item_clear", user=user)
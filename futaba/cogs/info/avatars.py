@@ -0,0 +1,120 @@
+#
+# cogs/info/avatars.py
+#
+# futaba - A Discord Mod bot for the Programming server
+# Copyright (c) 2017-2020 Jake Richardson, Emmie Smith, jackylam5
+#
+# futaba is available free of charge under the terms of the MIT
+# License. You are free to redistribute and/or modify it under those
+# terms. It is distributed in the hopes that it will be useful, but
+# WITHOUT ANY WARRANTY. See the LICENSE file for more details.
+#
+
+"""
+Background capture of avatar changes for the alias history.
+
+Changes are queued up and deduplicated by avatar, since the same change
+is reported once for every guild the user is in. The images are fetched
+a few at a time, and only once a batch of them has been downloaded is a
+short transaction opened to store them.
+"""
+
+import asyncio
+import logging
+import re
+
+import aiohttp
+import discord
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["AvatarCapture"]
+
+EXTENSION_REGEX = re.compile(r"/\w+\.(\w+)(?:\?.+)?$")
+
+# Maximum number of avatars waiting to be fetched
+MAX_PENDING = 500
+
+# Maximum number of avatars being fetched at once
+MAX_FETCHES = 4
+
+# Number of fetched avatars stored per transaction
+BATCH_SIZE = 20
+
+
+class AvatarCapture:
+    __slots__ = ("bot", "pending", "fetches", "runner")
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.pending = {}
+        self.fetches = asyncio.Semaphore(MAX_FETCHES)
+        self.runner = None
+
+    def add(self, user, timestamp, asset):
+        """Queues the user's new avatar to be stored, unless it already is."""
+
+        key = (user.id, asset.key)
+        if key in self.pending:
+            return
+
+        if len(self.pending) >= MAX_PENDING:
+            logger.warning(
+                "Too many avatars waiting to be stored, dropping one for '%s' (%d)",
+                user.name,
+                user.id,
+            )
+            return
+
+        self.pending[key] = (timestamp, asset)
+        if self.runner is None or self.runner.done():
+            self.runner = self.bot.loop.create_task(self.run())
+
+    def close(self):
+        """Stops storing queued avatars, if any are being stored."""
+
+        if self.runner is not None:
+            self.runner.cancel()
+
+    async def run(self):
+        while self.pending:
+            keys = list(self.pending)[:BATCH_SIZE]
+            try:
+                avatars = await asyncio.gather(
+                    *[self.fetch(key, *self.pending[key]) for key in keys]
+                )
+            finally:
+                # Even if fetching failed, so the same batch isn't retried forever
+                for key in keys:
+                    del self.pending[key]
+
+            avatars = [avatar for avatar in avatars if avatar is not None]
+            if not avatars:
+                continue
+
+            try:
+                async with self.bot.sql.transaction():
+                    await self.bot.sql.run(self.bot.sql.alias.add_avatars, avatars)
+            except Exception as error:
+                logger.error("Unable to store %d avatars", len(avatars), exc_info=error)
+
+    async def fetch(self, key, timestamp, asset):
+        user_id, _ = key
+        avatar_url = str(asset.url)
+        match = EXTENSION_REGEX.findall(avatar_url)
+        if not match:
+            logger.warning("Avatar URL does not match extension regex: %s", avatar_url)
+            return None
+
+        async with self.fetches:
+            try:
+                data = await asset.read()
+            except (
+                discord.DiscordException,
+                aiohttp.ClientError,
+                asyncio.TimeoutError,
+            ) as error:
+                logger.info("Unable to fetch avatar %s", avatar_url, exc_info=error)
+                return None
+
+        return user_id, timestamp, data, match[0]
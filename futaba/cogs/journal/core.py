@@ -48,29 +48,29 @@ class Journal(AbstractCog):
         self.journal = bot.get_broadcaster("/journal")
 
     def setup(self):
-        logger.info("Loading journal output channels from the database")
-        with self.bot.sql.transaction():
-            for guild in self.bot.guilds:
-                for output in self.bot.sql.journal.fetch_journal_channels(guild):
-                    logger.info(
-                        "Registering journal channel #%s (%d) for path '%s'",
-                        output.sink.name,
-                        output.sink.id,
-                        output.path,
-                    )
-                    self.router.register(
-                        ChannelOutputListener(self.router, output.path, output.sink)
-                    )
-                for output in self.bot.sql.journal.fetch_journal_users(self.bot, guild):
-                    logger.info(
-                        "Registering journal DM on user '%s' (%d) for path '%s'",
-                        output.sink.name,
-                        output.sink.id,
-                        output.path,
-                    )
-                    self.router.register(
-                        DirectMessageListener(self.router, output.path, output.sink)
-                    )
+        # Journal outputs were loaded with the other model caches
+        logger.info("Registering journal outputs")
+        for output in self.bot.sql.journal.get_all_journals():
+            if isinstance(output.sink, discord.abc.User):
+                logger.info(
+                    "Registering journal DM on user '%s' (%d) for path '%s'",
+                    output.sink.name,
+                    output.sink.id,
+                    output.path,
+                )
+                self.router.register(
+                    DirectMessageListener(self.router, output.path, output.sink)
+                )
+            else:
+                logger.info(
+                    "Registering journal channel #%s (%d) for path '%s'",
+                    output.sink.name,
+                    output.sink.id,
+                    output.path,
+                )
+                self.router.register(
+                    ChannelOutputListener(self.router, output.path, output.sink)
+                )
         self.router.start(self.bot.loop)
 
     @commands.group(name="journal", aliases=["log"])
@@ -165,12 +165,14 @@ class Journal(AbstractCog):
         self.router.register(ChannelOutputListener(self.router, path, channel))
 
         logger.debug("Updating database for channel output")
-        with self.bot.sql.transaction():
+        async with self.bot.sql.transaction():
             journal_sql = self.bot.sql.journal
-            if journal_sql.has_journal_channel(channel, path):
-                journal_sql.update_journal_output(ctx.guild, channel, path, recursive)
+            if await self.bot.sql.run(journal_sql.has_journal_channel, channel, path):
+                update = journal_sql.update_journal_output
             else:
-                journal_sql.add_journal_output(ctx.guild, channel, path, recursive)
+                update = journal_sql.add_journal_output
+
+            await self.bot.sql.run(update, ctx.guild, channel, path, recursive)
 
         await channel.send(content=self.log_updated_message(channel))
         content = f"Added journal logger to {channel.mention} for `{path}`"
@@ -208,8 +210,10 @@ class Journal(AbstractCog):
 
         self.router.unregister(listener)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.journal.delete_journal_output(ctx.guild, channel, path)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.journal.delete_journal_output, ctx.guild, channel, path
+            )
 
         await channel.send(content=self.log_updated_message(channel))
         content = f"Removed journal logger to {channel.mention} for `{path}`"
@@ -257,13 +261,22 @@ class Journal(AbstractCog):
                 content=f"No output on `{path}` found for {old_channel.mention}"
             )
 
+        # Re-register, since the router caches listeners by guild
+        self.router.unregister(listener)
         listener.channel = new_channel
+        self.router.register(listener)
 
         logger.debug("Updating database for moved channel output")
-        with self.bot.sql.transaction():
-            self.bot.sql.journal.delete_journal_output(ctx.guild, old_channel, path)
-            self.bot.sql.journal.add_journal_output(
-                ctx.guild, new_channel, path, recursive
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.journal.delete_journal_output, ctx.guild, old_channel, path
+            )
+            await self.bot.sql.run(
+                self.bot.sql.journal.add_journal_output,
+                ctx.guild,
+                new_channel,
+                path,
+                recursive,
             )
 
         await asyncio.gather(
@@ -382,12 +395,14 @@ class Journal(AbstractCog):
 
         logger.debug("Updating database for user output")
         user = self.bot.get_user(ctx.author.id)
-        with self.bot.sql.transaction():
+        async with self.bot.sql.transaction():
             journal_sql = self.bot.sql.journal
-            if journal_sql.has_journal_user(user, path):
-                journal_sql.update_journal_output(ctx.guild, user, path, recursive)
+            if await self.bot.sql.run(journal_sql.has_journal_user, user, path):
+                update = journal_sql.update_journal_output
             else:
-                journal_sql.add_journal_output(ctx.guild, user, path, recursive)
+                update = journal_sql.add_journal_output
+
+            await self.bot.sql.run(update, ctx.guild, user, path, recursive)
 
         await ctx.send(content=self.log_updated_message(user))
         content = f"Added journal logger to {user_discrim(ctx.author)} for `{path}`"
@@ -426,8 +441,10 @@ class Journal(AbstractCog):
 
         self.router.unregister(listener)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.journal.delete_journal_output(ctx.guild, user, path)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.journal.delete_journal_output, ctx.guild, user, path
+            )
 
         await ctx.send(content=self.log_updated_message(user))
         content = f"Removed journal logger to {user_discrim(ctx.author)} for `{path}`"
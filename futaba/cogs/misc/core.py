@@ -17,12 +17,10 @@ Cog for miscellaneous commands that don't really belong anywhere else.
 import logging
 import random
 from datetime import datetime
-from hashlib import sha1
 
 import discord
 from discord.ext import commands
 
-from futaba.download import download_links
 from futaba.exceptions import CommandFailed
 from futaba.str_builder import StringBuilder
 from futaba.unicode import unicode_repr
@@ -114,17 +112,17 @@ class Miscellaneous(AbstractCog):
         # Download and check files
         contents = []
         content = StringBuilder("Hashes:\n```")
-        buffers = await download_links(links)
-        for i, binio in enumerate(buffers):
-            if binio is None:
+        downloads = await self.bot.downloader.download_links(links)
+        for i, download in enumerate(downloads):
+            if download is None:
                 hashsum = SHA1_ERROR_MESSAGE
             else:
-                hashsum = sha1(binio.getbuffer()).hexdigest()
+                hashsum = download.hashsum.hex()
 
             content.writeln(f"{hashsum} {names[i]}")
             if len(content) > 1920:
                 contents.append(content)
-                if i < len(buffers) - 1:
+                if i < len(downloads) - 1:
                     content.clear()
                     content.writeln("```")
 
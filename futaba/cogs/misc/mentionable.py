@@ -14,7 +14,6 @@
 Cog for automatically checking and enforcing un-mentionable names.
 """
 
-import asyncio
 import logging
 import random
 import string
@@ -133,12 +132,18 @@ class Mentionable(AbstractCog):
         Requires a true argument to run in enforce mode.
         """
 
+        stopped_message = None
         if enforce:
-            count = 0
-            for member in ctx.guild.members:
-                did_enforce = await self.enforce_mentionable_name(member)
-                count += int(did_enforce)
-                await asyncio.sleep(0.01)
+            operation = self.bot.bulk.start(
+                ctx.guild,
+                "ensure mentionable",
+                ctx.guild.members,
+                self.enforce_mentionable_name,
+            )
+            await operation.wait()
+            count = operation.changed
+            if not operation.finished:
+                stopped_message = operation.stopped_message
         else:
             count = sum(
                 1 for member in ctx.guild.members if self.check_mentionable_name(member)
@@ -151,4 +156,6 @@ class Mentionable(AbstractCog):
         )
         verb = "were" if enforce else "would be"
         embed.description = f"`{count}` members {verb} given mentionable nicknames"
+        if stopped_message is not None:
+            embed.description += f"\n{stopped_message}"
         await ctx.send(embed=embed)
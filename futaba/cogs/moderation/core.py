@@ -24,7 +24,7 @@ from discord.ext import commands
 from futaba import permissions
 from futaba.converters import MemberConv, UserConv
 from futaba.enums import PunishAction
-from futaba.exceptions import CommandFailed, ManualCheckFailure
+from futaba.exceptions import CommandFailed, ManualCheckFailure, SendHelp
 from futaba.navi import PunishTask
 from futaba.str_builder import StringBuilder
 from futaba.utils import escape_backticks, plural, user_discrim
@@ -78,7 +78,7 @@ class Moderation(AbstractCog):
             action=action,
             reason=reason,
         )
-        self.bot.add_tasks(task)
+        await self.bot.add_tasks(task)
 
     @commands.command(name="nick", aliases=["nickname", "renick"])
     @commands.guild_only()
@@ -501,3 +501,80 @@ class Moderation(AbstractCog):
             raise ManualCheckFailure(
                 content="I don't have permission to unban this user"
             )
+
+    def get_bulk_operation(self, ctx, id):
+        operation = self.bot.bulk.operations.get(id)
+        if operation is None or operation.guild != ctx.guild:
+            embed = discord.Embed(colour=discord.Colour.red())
+            embed.description = f"No such bulk operation: `{id}`"
+            raise CommandFailed(embed=embed)
+
+        return operation
+
+    @commands.group(name="bulk", aliases=["bulkops"])
+    @commands.guild_only()
+    @permissions.check_mod()
+    async def bulk(self, ctx):
+        """Manages operations running over many members, such as prunes."""
+
+        if ctx.invoked_subcommand is None:
+            raise SendHelp()
+
+    @bulk.command(name="list", aliases=["show", "status"])
+    @commands.guild_only()
+    @permissions.check_mod()
+    async def bulk_list(self, ctx):
+        """Shows the progress of all bulk operations in this guild."""
+
+        operations = self.bot.bulk.get_operations(ctx.guild)
+        embed = discord.Embed()
+        embed.set_author(name="Bulk operations")
+
+        if operations:
+            descr = StringBuilder()
+            for operation in operations:
+                state = "running" if operation.running else "stopped"
+                descr.writeln(f"`{operation}` ({state})")
+
+            embed.colour = discord.Colour.dark_teal()
+            embed.description = str(descr)
+        else:
+            embed.colour = discord.Colour.dark_purple()
+            embed.description = "No bulk operations in this guild"
+
+        await ctx.send(embed=embed)
+
+    @bulk.command(name="cancel", aliases=["stop"])
+    @commands.guild_only()
+    @permissions.check_mod()
+    async def bulk_cancel(self, ctx, id: int):
+        """Stops a running bulk operation. It can be resumed later."""
+
+        operation = self.get_bulk_operation(ctx, id)
+        if not operation.running:
+            embed = discord.Embed(colour=discord.Colour.red())
+            embed.description = f"Bulk operation `#{operation.id}` is not running"
+            raise CommandFailed(embed=embed)
+
+        self.bot.bulk.cancel(operation)
+        await operation.wait()
+
+        embed = discord.Embed(colour=discord.Colour.dark_teal())
+        embed.description = f"Cancelled `{operation}`\n{operation.stopped_message}"
+        await ctx.send(embed=embed)
+
+    @bulk.command(name="resume", aliases=["continue"])
+    @commands.guild_only()
+    @permissions.check_mod()
+    async def bulk_resume(self, ctx, id: int):
+        """Continues a stopped bulk operation where it left off."""
+
+        operation = self.get_bulk_operation(ctx, id)
+        self.bot.bulk.resume(operation)
+        await operation.wait()
+
+        embed = discord.Embed(colour=discord.Colour.dark_teal())
+        embed.description = f"`{operation}`"
+        if not operation.finished:
+            embed.description += f"\n{operation.stopped_message}"
+        await ctx.send(embed=embed)
@@ -104,11 +104,13 @@ class ManualModActionWarn(AbstractCog):
 
         roles = set(roles)
         updated_roles = []
-        utc_now = datetime.utcnow()
+        utc_now = datetime.now(timezone.utc)
 
-        async for entry in member.guild.audit_logs(
-            limit=20, action=AuditLogAction.member_role_update
-        ):
+        entries = await self.bot.audit_log.get_entries(
+            member.guild, utc_now, action=AuditLogAction.member_role_update
+        )
+
+        for entry in entries:
             if entry.target != member:
                 continue
 
@@ -173,7 +175,9 @@ class ManualModActionWarn(AbstractCog):
         if not self.bot.sql.settings.get_warn_manual_mod_action(member.guild):
             return
 
-        leave_reason = await get_removal_cause(member, datetime.now(timezone.utc))
+        leave_reason = await get_removal_cause(
+            self.bot.audit_log, member, datetime.now(timezone.utc)
+        )
 
         if leave_reason.type not in (MemberLeaveType.KICKED, MemberLeaveType.BANNED):
             return
@@ -23,7 +23,7 @@ import discord
 from discord.ext import commands
 
 from futaba.exceptions import CommandFailed
-from futaba.navi import SendMessageTask, build_navi_task
+from futaba.navi import SendMessageTask
 from futaba.str_builder import StringBuilder
 from futaba.utils import escape_backticks, fancy_timedelta
 from ..abc import AbstractCog
@@ -41,15 +41,8 @@ class Navi(AbstractCog):
         self.journal = bot.get_broadcaster("/navi")
 
     def setup(self):
-        raw_tasks = self.bot.sql.navi.get_tasks()
-        for raw_task in raw_tasks.values():
-            try:
-                task = build_navi_task(self.bot, raw_task)
-                task.execute_later()
-            except ValueError as error:
-                logger.warning(
-                    "Error while loading or running task from database", exc_info=error
-                )
+        # Tasks are loaded from the database by the scheduler itself
+        self.bot.scheduler.start()
 
     @commands.command(name="remind", aliases=["reminder", "remindme", "alarm"])
     async def remind_me(self, ctx, when: str, *, message: str):
@@ -97,7 +90,7 @@ class Navi(AbstractCog):
         embed.set_author(name=f"Reminder made {time_since} ago")
         embed.description = f"You asked to be reminded of:\n\n{message}"
         embed.timestamp = now
-        self.bot.add_tasks(
+        await self.bot.add_tasks(
             SendMessageTask(
                 self.bot,
                 None,
@@ -304,10 +304,12 @@ class SelfAssignableRoles(AbstractCog):
         assignable_roles = self.bot.sql.roles.get_assignable_roles(ctx.guild)
 
         # Add roles to database
-        with self.bot.sql.transaction():
+        async with self.bot.sql.transaction():
             for role in roles:
                 if role not in assignable_roles:
-                    self.bot.sql.roles.add_assignable_role(ctx.guild, role)
+                    await self.bot.sql.run(
+                        self.bot.sql.roles.add_assignable_role, ctx.guild, role
+                    )
 
         # Send response
         embed = discord.Embed(colour=discord.Colour.dark_teal())
@@ -341,9 +343,11 @@ class SelfAssignableRoles(AbstractCog):
             raise CommandFailed()
 
         # Remove roles from database
-        with self.bot.sql.transaction():
+        async with self.bot.sql.transaction():
             for role in roles:
-                self.bot.sql.roles.remove_assignable_role(ctx.guild, role)
+                await self.bot.sql.run(
+                    self.bot.sql.roles.remove_assignable_role, ctx.guild, role
+                )
 
         # Send response
         embed = discord.Embed(colour=discord.Colour.dark_teal())
@@ -390,11 +394,15 @@ class SelfAssignableRoles(AbstractCog):
         # will be informed.
         exempt_channels = []
 
-        with self.bot.sql.transaction():
+        async with self.bot.sql.transaction():
             for channel in channels:
                 if channel not in pingable_channels:
-                    self.bot.sql.roles.add_pingable_role_channel(
-                        ctx.guild, channel, role, original
+                    await self.bot.sql.run(
+                        self.bot.sql.roles.add_pingable_role_channel,
+                        ctx.guild,
+                        channel,
+                        role,
+                        original,
                     )
                 else:
                     exempt_channels.append(channel)
@@ -444,11 +452,14 @@ class SelfAssignableRoles(AbstractCog):
 
         exempt_channels = []
 
-        with self.bot.sql.transaction():
+        async with self.bot.sql.transaction():
             for channel in channels:
                 if channel in pingable_channels:
-                    self.bot.sql.roles.remove_pingable_role_channel(
-                        ctx.guild, channel, role
+                    await self.bot.sql.run(
+                        self.bot.sql.roles.remove_pingable_role_channel,
+                        ctx.guild,
+                        channel,
+                        role,
                     )
                 else:
                     exempt_channels.append(channel)
@@ -500,9 +511,11 @@ class SelfAssignableRoles(AbstractCog):
             raise CommandFailed()
 
         # Add channels to database
-        with self.bot.sql.transaction():
+        async with self.bot.sql.transaction():
             for channel in channels:
-                self.bot.sql.roles.add_role_command_channel(ctx.guild, channel)
+                await self.bot.sql.run(
+                    self.bot.sql.roles.add_role_command_channel, ctx.guild, channel
+                )
 
         # Send response
         embed = discord.Embed(colour=discord.Colour.dark_teal())
@@ -534,10 +547,14 @@ class SelfAssignableRoles(AbstractCog):
             raise CommandFailed()
 
         # Write new channel list to database
-        with self.bot.sql.transaction():
-            self.bot.sql.roles.remove_all_role_command_channels(ctx.guild)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.roles.remove_all_role_command_channels, ctx.guild
+            )
             for channel in channels:
-                self.bot.sql.roles.add_role_command_channel(ctx.guild, channel)
+                await self.bot.sql.run(
+                    self.bot.sql.roles.add_role_command_channel, ctx.guild, channel
+                )
 
         # Send response
         embed = discord.Embed(colour=discord.Colour.dark_teal())
@@ -577,9 +594,11 @@ class SelfAssignableRoles(AbstractCog):
             raise CommandFailed()
 
         # Remove channels from database
-        with self.bot.sql.transaction():
+        async with self.bot.sql.transaction():
             for channel in channels:
-                self.bot.sql.roles.remove_role_command_channel(ctx.guild, channel)
+                await self.bot.sql.run(
+                    self.bot.sql.roles.remove_role_command_channel, ctx.guild, channel
+                )
 
         # Send response
         embed = discord.Embed(colour=discord.Colour.dark_teal())
@@ -616,8 +635,10 @@ class SelfAssignableRoles(AbstractCog):
         )
 
         # Remove channels from database
-        with self.bot.sql.transaction():
-            self.bot.sql.roles.remove_all_role_command_channels(ctx.guild)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.roles.remove_all_role_command_channels, ctx.guild
+            )
 
         # Send response
         embed = discord.Embed(colour=discord.Colour.dark_teal())
@@ -77,9 +77,12 @@ class Settings(AbstractCog):
             raise ManualCheckFailure(embed=embed)
         elif prefix == "_":
             # Unset prefix
-            with self.bot.sql.transaction():
-                self.bot.sql.settings.set_prefix(ctx.guild, None)
-                bot_prefix = self.bot.prefix(ctx.guild)
+            async with self.bot.sql.transaction():
+                await self.bot.sql.run(
+                    self.bot.sql.settings.set_prefix, ctx.guild, None
+                )
+
+            bot_prefix = self.bot.prefix(ctx.guild)
 
             embed = discord.Embed(colour=discord.Colour.dark_teal())
             embed.description = (
@@ -96,8 +99,10 @@ class Settings(AbstractCog):
         else:
             # Set prefix
             bot_prefix = re.sub(r"_$", " ", prefix)
-            with self.bot.sql.transaction():
-                self.bot.sql.settings.set_prefix(ctx.guild, bot_prefix)
+            async with self.bot.sql.transaction():
+                await self.bot.sql.run(
+                    self.bot.sql.settings.set_prefix, ctx.guild, bot_prefix
+                )
 
             embed = discord.Embed(colour=discord.Colour.dark_teal())
             embed.description = f"Set prefix for {ctx.guild.name} to `{bot_prefix}`"
@@ -148,8 +153,10 @@ class Settings(AbstractCog):
             raise CommandFailed(embed=embed)
         else:
             # Set max delete messages
-            with self.bot.sql.transaction():
-                self.bot.sql.settings.set_max_delete_messages(ctx.guild, count)
+            async with self.bot.sql.transaction():
+                await self.bot.sql.run(
+                    self.bot.sql.settings.set_max_delete_messages, ctx.guild, count
+                )
 
             embed = discord.Embed(colour=discord.Colour.dark_teal())
             embed.description = f"Set maximum deletable messages to `{count}`"
@@ -177,8 +184,10 @@ class Settings(AbstractCog):
             embed.description = "You do not have permission to enable or disable manual mod action warning"
             raise ManualCheckFailure(embed=embed)
         else:
-            with self.bot.sql.transaction():
-                self.bot.sql.settings.set_warn_manual_mod_action(ctx.guild, value)
+            async with self.bot.sql.transaction():
+                await self.bot.sql.run(
+                    self.bot.sql.settings.set_warn_manual_mod_action, ctx.guild, value
+                )
 
             embed = discord.Embed(colour=discord.Colour.teal())
             embed.description = f"Set warning moderators about performing mod actions manually to `{value}`"
@@ -206,8 +215,10 @@ class Settings(AbstractCog):
             embed.description = "You do not have permissions to change the removal of non-punishment roles"
             raise ManualCheckFailure(embed=embed)
         else:
-            with self.bot.sql.transaction():
-                self.bot.sql.settings.set_remove_other_roles(ctx.guild, value)
+            async with self.bot.sql.transaction():
+                await self.bot.sql.run(
+                    self.bot.sql.settings.set_remove_other_roles, ctx.guild, value
+                )
 
             embed = discord.Embed(colour=discord.Colour.teal())
             embed.description = (
@@ -274,8 +285,10 @@ class Settings(AbstractCog):
         if role is not None:
             await self.check_role(ctx, role)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.settings.set_special_roles(ctx.guild, member=role)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.settings.set_special_roles, ctx.guild, member=role
+            )
 
         embed = discord.Embed(colour=discord.Colour.green())
         if role:
@@ -306,8 +319,10 @@ class Settings(AbstractCog):
         if role is not None:
             await self.check_role(ctx, role)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.settings.set_special_roles(ctx.guild, guest=role)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.settings.set_special_roles, ctx.guild, guest=role
+            )
 
         embed = discord.Embed(colour=discord.Colour.green())
         if role:
@@ -336,8 +351,10 @@ class Settings(AbstractCog):
         if role is not None:
             await self.check_role(ctx, role)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.settings.set_special_roles(ctx.guild, mute=role)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.settings.set_special_roles, ctx.guild, mute=role
+            )
 
         embed = discord.Embed(colour=discord.Colour.green())
         if role:
@@ -366,8 +383,10 @@ class Settings(AbstractCog):
         if role is not None:
             await self.check_role(ctx, role)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.settings.set_special_roles(ctx.guild, jail=role)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.settings.set_special_roles, ctx.guild, jail=role
+            )
 
         embed = discord.Embed(colour=discord.Colour.green())
         if role:
@@ -396,8 +415,10 @@ class Settings(AbstractCog):
         if role is not None:
             await self.check_role(ctx, role)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.settings.set_special_roles(ctx.guild, focus=role)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.settings.set_special_roles, ctx.guild, focus=role
+            )
 
         embed = discord.Embed(colour=discord.Colour.green())
         if role:
@@ -426,8 +447,10 @@ class Settings(AbstractCog):
         if role is not None:
             await self.check_role(ctx, role)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.settings.set_special_roles(ctx.guild, nonpurge=role)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.settings.set_special_roles, ctx.guild, nonpurge=role
+            )
 
         embed = discord.Embed(colour=discord.Colour.green())
         if role:
@@ -509,8 +532,10 @@ class Settings(AbstractCog):
             ", ".join(role.name for role in roles),
         )
 
-        with self.bot.sql.transaction():
-            self.bot.sql.settings.update_reapply_roles(ctx.guild, roles, True)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.settings.update_reapply_roles, ctx.guild, roles, True
+            )
 
     @reapply.command(
         name="remove", aliases=["rm", "delete", "del", "unregister", "unset"]
@@ -528,8 +553,10 @@ class Settings(AbstractCog):
             ", ".join(role.name for role in roles),
         )
 
-        with self.bot.sql.transaction():
-            self.bot.sql.settings.update_reapply_roles(ctx.guild, set(roles), False)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.settings.update_reapply_roles, ctx.guild, set(roles), False
+            )
 
     @reapply.command(name="show", aliases=["display", "list", "ls"])
     @commands.guild_only()
@@ -613,8 +640,10 @@ class Settings(AbstractCog):
             raise ManualCheckFailure(embed=embed)
         else:
             # Set role reapplication
-            with self.bot.sql.transaction():
-                self.bot.sql.settings.set_auto_reapply(ctx.guild, value)
+            async with self.bot.sql.transaction():
+                await self.bot.sql.run(
+                    self.bot.sql.settings.set_auto_reapply, ctx.guild, value
+                )
 
             embed = discord.Embed(colour=discord.Colour.dark_teal())
             embed.description = (
@@ -655,8 +684,10 @@ class Settings(AbstractCog):
                 embed.description = "Prefix lengths must be between `0` and `32`."
                 raise CommandFailed(embed=embed)
 
-            with self.bot.sql.transaction():
-                self.bot.sql.settings.set_mentionable_name_prefix(ctx.guild, value)
+            async with self.bot.sql.transaction():
+                await self.bot.sql.run(
+                    self.bot.sql.settings.set_mentionable_name_prefix, ctx.guild, value
+                )
 
             embed = discord.Embed(colour=discord.Colour.dark_teal())
             embed.description = (
@@ -692,8 +723,12 @@ class Settings(AbstractCog):
             ctx.guild.id,
         )
 
-        with self.bot.sql.transaction():
-            self.bot.sql.settings.add_to_tracking_blacklist(ctx.guild, user_or_channel)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.settings.add_to_tracking_blacklist,
+                ctx.guild,
+                user_or_channel,
+            )
 
         embed = discord.Embed(colour=discord.Colour.dark_teal())
         embed.description = f"Added {user_or_channel.mention} to the tracking blacklist"
@@ -717,9 +752,11 @@ class Settings(AbstractCog):
             ctx.guild.id,
         )
 
-        with self.bot.sql.transaction():
-            self.bot.sql.settings.remove_from_tracking_blacklist(
-                ctx.guild, user_or_channel
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.settings.remove_from_tracking_blacklist,
+                ctx.guild,
+                user_or_channel,
             )
 
         embed = discord.Embed(colour=discord.Colour.dark_teal())
@@ -56,8 +56,8 @@ LISTENERS = (
 )
 
 
-async def get_removal_cause(member: discord.Member, timestamp: datetime):
-    async for entry in member.guild.audit_logs(limit=20):
+async def get_removal_cause(audit_log, member: discord.Member, timestamp: datetime):
+    for entry in await audit_log.get_entries(member.guild, timestamp):
         if abs(timestamp - entry.created_at) < timedelta(seconds=3):
             if entry.action == AuditLogAction.kick:
                 if entry.target == member:
@@ -137,6 +137,16 @@ class Tracker(AbstractCog):
         for listener in LISTENERS:
             self.bot.remove_listener(getattr(self, listener), listener)
 
+        self.bot.loop.create_task(self.flush_message_locations())
+
+    async def flush_message_locations(self):
+        locations = self.bot.sql.messages.take_pending_locations()
+        if not locations:
+            return
+
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(self.bot.sql.messages.add_locations, locations)
+
     @staticmethod
     def build_embed(message: Message):
         embed = discord.Embed(description=message.content)
@@ -162,10 +172,19 @@ class Tracker(AbstractCog):
         else:
             self.new_messages.append(message)
 
-        if message.guild is None or message.author == self.bot.user:
+        if message.guild is None:
+            return
+
+        # Remember where the message is, so it can be found by ID later
+        if self.bot.sql.messages.remember_location(message):
+            self.bot.loop.create_task(self.flush_message_locations())
+
+        if message.author == self.bot.user:
             return
 
-        blacklist = self.bot.sql.settings.get_tracking_blacklist(message.guild)
+        blacklist = await self.bot.sql.run(
+            self.bot.sql.settings.get_tracking_blacklist, message.guild
+        )
         if blacklist.is_blocked(message.channel) or blacklist.is_blocked(
             message.author
         ):
@@ -208,7 +227,9 @@ class Tracker(AbstractCog):
         if after.guild is None or after.author == self.bot.user:
             return
 
-        blacklist = self.bot.sql.settings.get_tracking_blacklist(after.guild)
+        blacklist = await self.bot.sql.run(
+            self.bot.sql.settings.get_tracking_blacklist, after.guild
+        )
         if blacklist.is_blocked(after.channel) or blacklist.is_blocked(after.author):
             return
 
@@ -249,10 +270,16 @@ class Tracker(AbstractCog):
         )
 
     async def get_deletion_reason(self, message, timestamp):
-        async for entry in message.guild.audit_logs(
-            limit=20, action=AuditLogAction.message_delete
-        ):
-            if entry.after.id == message.id:
+        entries = await self.bot.audit_log.get_entries(
+            message.guild, timestamp, action=AuditLogAction.message_delete
+        )
+
+        for entry in entries:
+            # These entries don't say which message, only whose and where
+            if (
+                entry.target.id == message.author.id
+                and entry.extra.channel.id == message.channel.id
+            ):
                 if abs(timestamp - entry.created_at) < timedelta(seconds=3):
                     return MessageDeletionReason(
                         message=message,
@@ -282,7 +309,9 @@ class Tracker(AbstractCog):
         if message.guild is None:
             return
 
-        blacklist = self.bot.sql.settings.get_tracking_blacklist(message.guild)
+        blacklist = await self.bot.sql.run(
+            self.bot.sql.settings.get_tracking_blacklist, message.guild
+        )
         if blacklist.is_blocked(message.channel) or blacklist.is_blocked(
             message.author
         ):
@@ -295,10 +324,8 @@ class Tracker(AbstractCog):
             message.author.id,
         )
 
-        # Wait for a bit so we can catch the audit log entry
         timestamp = datetime.now(timezone.utc)
-        await asyncio.sleep(1)
-        cause = await get_removal_cause(message, timestamp)
+        cause = await self.get_deletion_reason(message, timestamp)
 
         content = f"Message {message.id} by {user_discrim(message.author)} was deleted"
         self.journal.send(
@@ -363,7 +390,9 @@ class Tracker(AbstractCog):
         if message.guild is None or user == self.bot.user:
             return
 
-        blacklist = self.bot.sql.settings.get_tracking_blacklist(message.guild)
+        blacklist = await self.bot.sql.run(
+            self.bot.sql.settings.get_tracking_blacklist, message.guild
+        )
         if blacklist.is_blocked(message.channel) or blacklist.is_blocked(user):
             logger.debug(
                 "Ignoring reaction %s added to message %d by %s (%d) due to "
@@ -410,7 +439,9 @@ class Tracker(AbstractCog):
         if message.guild is None or user == self.bot.user:
             return
 
-        blacklist = self.bot.sql.settings.get_tracking_blacklist(message.guild)
+        blacklist = await self.bot.sql.run(
+            self.bot.sql.settings.get_tracking_blacklist, message.guild
+        )
         if blacklist.is_blocked(message.channel) or blacklist.is_blocked(user):
             logger.debug(
                 "Ignoring reaction %s removed from message %d by %s (%d) due to "
@@ -450,7 +481,9 @@ class Tracker(AbstractCog):
         if message.guild is None:
             return
 
-        blacklist = self.bot.sql.settings.get_tracking_blacklist(message.guild)
+        blacklist = await self.bot.sql.run(
+            self.bot.sql.settings.get_tracking_blacklist, message.guild
+        )
         if blacklist.is_blocked(message.channel):
             logger.debug(
                 "Ignoring all reactions from message %d being removed due to the channel being blacklisted",
@@ -496,7 +529,9 @@ class Tracker(AbstractCog):
         else:
             self.members_joined.append(member)
 
-        blacklist = self.bot.sql.settings.get_tracking_blacklist(member.guild)
+        blacklist = await self.bot.sql.run(
+            self.bot.sql.settings.get_tracking_blacklist, member.guild
+        )
         if blacklist.is_blocked(member):
             logger.debug(
                 "Ignoring member %s (%d) joining guild '%s' (%d) due to the user being blacklisted",
@@ -529,7 +564,9 @@ class Tracker(AbstractCog):
         else:
             self.members_left.append(member)
 
-        blacklist = self.bot.sql.settings.get_tracking_blacklist(member.guild)
+        blacklist = await self.bot.sql.run(
+            self.bot.sql.settings.get_tracking_blacklist, member.guild
+        )
         if blacklist.is_blocked(member):
             logger.debug(
                 "Ignoring member %s (%d) leaving guild '%s' (%d) due to the user being blacklisted",
@@ -548,10 +585,8 @@ class Tracker(AbstractCog):
             member.guild.id,
         )
 
-        # Wait for a bit so we can catch the audit log entry
         timestamp = datetime.now(timezone.utc)
-        await asyncio.sleep(2)
-        cause = await get_removal_cause(member, timestamp)
+        cause = await get_removal_cause(self.bot.audit_log, member, timestamp)
 
         content = f"Member {member.mention} ({user_discrim(member)}) left"
         self.journal.send(
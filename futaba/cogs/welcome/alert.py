@@ -13,9 +13,15 @@
 """
 Cog for checking new members and seeing if they match a join alert
 configured by staff. If so, a notification is sent to /welcome/alert.
+
+Each guild's alerts are indexed by attribute and relationship, so a join
+is checked with a few lookups rather than by trying every alert.
 """
 
 import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
 from itertools import islice
 
 import discord
@@ -30,11 +36,34 @@ from ..abc import AbstractCog
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["JoinAlert", "Alert"]
+__all__ = ["JoinAlert", "JoinAlertIndex", "Alert"]
+
+ORDERING_RELATIONSHIPS = (
+    ValueRelationship.LESS_THAN,
+    ValueRelationship.LESS_OR_EQUAL,
+    ValueRelationship.GREATER_THAN,
+    ValueRelationship.GREATER_OR_EQUAL,
+)
+
+
+def alert_value(key, value):
+    """Gets the form of a value that alerts for the given key compare against."""
+
+    if isinstance(value, str):
+        return normalize_caseless(value)
+
+    # Creation times are timezone-aware, naive ones are taken as local time
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.astimezone()
+
+    if key == JoinAlertKey.AVATAR and value is not None:
+        return normalize_caseless(value.key)
+
+    return value
 
 
 class JoinAlert:
-    __slots__ = ("guild", "id", "key", "op", "value")
+    __slots__ = ("guild", "id", "key", "op", "value", "match_value")
 
     def __init__(self, guild, id, key, op, value):
         self.guild = guild
@@ -42,17 +71,20 @@ class JoinAlert:
         self.key = key
         self.op = op
         self.value = value
+        self.match_value = alert_value(key, value)
 
     def setup(self):
         pass
 
+    def member_value(self, member):
+        return alert_value(self.key, getattr(member, self.attr))
+
     def matches(self, member):
-        value = self.value
-        member_value = getattr(member, self.attr)
-        if isinstance(self.value, str) and isinstance(member_value, str):
-            value = normalize_caseless(value)
-            member_value = normalize_caseless(member_value)
-        return self.op.comparator(member_value, value)
+        try:
+            return self.op.comparator(self.member_value(member), self.match_value)
+        except TypeError:
+            # Values that can't be compared, like a missing avatar
+            return False
 
     @property
     def attr(self):
@@ -62,33 +94,137 @@ class JoinAlert:
         return f"{self.key.display_name} {self.op.symbol} {self.value}"
 
 
+class JoinAlertIndex:
+    """
+    The join alerts of one guild, grouped so that the ones a member
+    matches can be found without checking each of them:
+
+    * Equality alerts are looked up by value
+    * Inequality alerts match all but the ones looked up by value
+    * Ordering alerts are kept sorted by value, and found by bisection
+    * Containment alerts are grouped by value, so each one is checked once
+    """
+
+    __slots__ = ("keys", "equal", "not_equal", "ordered", "contains")
+
+    def __init__(self, alerts):
+        # JoinAlertKey -> value -> [alert]
+        self.equal = defaultdict(lambda: defaultdict(list))
+        self.not_equal = defaultdict(lambda: defaultdict(list))
+        self.contains = defaultdict(lambda: defaultdict(list))
+
+        # (JoinAlertKey, ValueRelationship) -> ([value], [alert]), sorted by value
+        self.ordered = {}
+
+        ordered = defaultdict(list)
+        for alert in alerts:
+            if alert.op == ValueRelationship.EQUAL_TO:
+                self.equal[alert.key][alert.match_value].append(alert)
+            elif alert.op == ValueRelationship.NOT_EQUAL:
+                self.not_equal[alert.key][alert.match_value].append(alert)
+            elif alert.op == ValueRelationship.CONTAINS:
+                self.contains[alert.key][alert.match_value].append(alert)
+            else:
+                ordered[alert.key, alert.op].append(alert)
+
+        for key_op, key_alerts in ordered.items():
+            try:
+                key_alerts.sort(key=lambda alert: alert.match_value)
+            except TypeError:
+                logger.warning("Join alerts have values of mixed types: %s", key_op)
+                continue
+
+            values = [alert.match_value for alert in key_alerts]
+            self.ordered[key_op] = (values, key_alerts)
+
+        self.keys = {alert.key for alert in alerts}
+
+    def matches(self, member):
+        """Returns the alerts the member matches, in no particular order."""
+
+        found = []
+        for key in self.keys:
+            value = alert_value(key, getattr(member, key.value))
+
+            try:
+                found.extend(self.equal[key].get(value, ()))
+            except TypeError:
+                # Unhashable value, can't be equal to any stored one
+                pass
+
+            for other, alerts in self.not_equal[key].items():
+                if other != value:
+                    found.extend(alerts)
+
+            if value is None:
+                continue
+
+            if isinstance(value, str):
+                for needle, alerts in self.contains[key].items():
+                    if needle in value:
+                        found.extend(alerts)
+
+            for op in ORDERING_RELATIONSHIPS:
+                try:
+                    values, alerts = self.ordered[key, op]
+                except KeyError:
+                    continue
+
+                # Alerts are sorted by value, so the matching ones are a slice
+                try:
+                    if op == ValueRelationship.LESS_THAN:
+                        found.extend(alerts[bisect_right(values, value) :])
+                    elif op == ValueRelationship.LESS_OR_EQUAL:
+                        found.extend(alerts[bisect_left(values, value) :])
+                    elif op == ValueRelationship.GREATER_THAN:
+                        found.extend(alerts[: bisect_left(values, value)])
+                    elif op == ValueRelationship.GREATER_OR_EQUAL:
+                        found.extend(alerts[: bisect_right(values, value)])
+                except TypeError:
+                    # Member value can't be compared with these alerts
+                    pass
+
+        return found
+
+
 class Alert(AbstractCog):
-    __slots__ = ("journal", "alerts")
+    __slots__ = ("journal", "alerts", "indexes")
 
     def __init__(self, bot):
         super().__init__(bot)
         self.journal = bot.get_broadcaster("/welcome/alert")
         self.alerts = {}
+        self.indexes = {}
 
-        for guild in bot.guilds:
-            alert_parts = bot.sql.welcome.get_all_alerts(guild)
+        alerts = bot.sql.welcome.get_alerts_by_guild(bot.guilds)
+        for guild, alert_parts in alerts.items():
             for id, key, op, value in alert_parts:
                 alert = JoinAlert(guild, id, key, op, value)
                 self.alerts[id] = alert
 
+            self.reindex(guild)
+
     def setup(self):
         pass
 
+    def guild_alerts(self, guild):
+        return [alert for alert in self.alerts.values() if alert.guild == guild]
+
+    def reindex(self, guild):
+        # Alerts are rarely changed, so the guild's index is just rebuilt
+        self.indexes[guild.id] = JoinAlertIndex(self.guild_alerts(guild))
+
     async def member_join(self, member):
         logger.info("Member '%s' (%d) joined, checking alerts.", member.name, member.id)
-        for alert in self.alerts.values():
-            if alert.guild == member.guild:
-                if alert.matches(member):
-                    logger.info("Matches alert: %s!", alert)
-                    content = (
-                        f"Member {member.mention} triggerred join alert: `{alert}`"
-                    )
-                    self.journal.send("", member.guild, content, icon="found")
+        index = self.indexes.get(member.guild.id)
+        if index is None:
+            return
+
+        # Report them in the order they were added
+        for alert in sorted(index.matches(member), key=lambda alert: alert.id):
+            logger.info("Matches alert: %s!", alert)
+            content = f"Member {member.mention} triggerred join alert: `{alert}`"
+            self.journal.send("", member.guild, content, icon="found")
 
     @commands.group(name="joinalert", aliases=["jalert"])
     @commands.guild_only()
@@ -113,11 +249,12 @@ class Alert(AbstractCog):
         descr = StringBuilder()
         descr.writeln("__Alert ID__ | __Condition__")
 
-        for alert in self.alerts.values():
+        alerts = self.guild_alerts(ctx.guild)
+        for alert in alerts:
             assert alert.id is not None, "Alert was not given an ID"
             descr.writeln(f"#**`{alert.id:05}`** | `{alert}`")
 
-        if self.alerts:
+        if alerts:
             embed.colour = discord.Colour.dark_teal()
             embed.description = str(descr)
         else:
@@ -140,9 +277,8 @@ class Alert(AbstractCog):
             ctx.guild.id,
         )
 
-        try:
-            alert = self.alerts[id]
-        except KeyError:
+        alert = self.alerts.get(id)
+        if alert is None or alert.guild != ctx.guild:
             embed = discord.Embed(colour=discord.Colour.red())
             embed.set_author(name="Alert check failed")
             embed.description = f"No such join alert id: `{id}`"
@@ -206,10 +342,11 @@ class Alert(AbstractCog):
         alert = JoinAlert(ctx.guild, None, key, op, value)
         logging.info("Adding join alert: %s", alert)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.welcome.add_alert(ctx.guild, alert)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(self.bot.sql.welcome.add_alert, ctx.guild, alert)
 
         self.alerts[alert.id] = alert
+        self.reindex(ctx.guild)
 
         # Notify the user
         embed = discord.Embed(colour=discord.Colour.dark_teal())
@@ -235,9 +372,9 @@ class Alert(AbstractCog):
         )
 
         logging.info("Removing join alert for id: %d", id)
-        with self.bot.sql.transaction():
+        async with self.bot.sql.transaction():
             try:
-                self.bot.sql.welcome.remove_alert(ctx.guild, id)
+                await self.bot.sql.run(self.bot.sql.welcome.remove_alert, ctx.guild, id)
             except ValueError:
                 embed = discord.Embed(colour=discord.Colour.red())
                 embed.set_author(name="Deletion failed")
@@ -245,3 +382,4 @@ class Alert(AbstractCog):
                 raise CommandFailed(embed=embed)
 
         del self.alerts[id]
+        self.reindex(ctx.guild)
@@ -19,6 +19,7 @@ import logging
 import re
 from collections import deque, namedtuple
 from datetime import datetime, timedelta
+from pathlib import PurePath
 
 import discord
 from discord.ext import commands
@@ -105,7 +106,7 @@ class Welcome(AbstractCog):
     def add_listener(self):
         # Check if a moderation listener is already in place
         router = self.journal.router
-        for listener in router.paths["/member/leave"]:
+        for listener in router.paths[PurePath("/member/leave")]:
             if isinstance(listener, ModerationListener):
                 return
 
@@ -118,8 +119,7 @@ class Welcome(AbstractCog):
     ):
         ctx = FakeContext(author=member, channel=channel, guild=member.guild)
         content = format_message(fmt_message, ctx)
-        coro = channel.send(content=content)
-        bot.queue.push(coro)
+        bot.queue.push_send(channel, content=content)
 
     @staticmethod
     async def check_welcome_message(ctx, fmt_message):
@@ -152,8 +152,10 @@ class Welcome(AbstractCog):
             # let them handle all the roles and stuff.
             return
 
-        welcome = self.bot.sql.welcome.get_welcome(member.guild)
-        roles = self.bot.sql.settings.get_special_roles(member.guild)
+        welcome = await self.bot.sql.run(self.bot.sql.welcome.get_welcome, member.guild)
+        roles = await self.bot.sql.run(
+            self.bot.sql.settings.get_special_roles, member.guild
+        )
 
         # Delay to let Discord API catch up
         # Without this, some users won't receive the guest role
@@ -188,7 +190,7 @@ class Welcome(AbstractCog):
             member.guild.id,
         )
 
-        welcome = self.bot.sql.welcome.get_welcome(member.guild)
+        welcome = await self.bot.sql.run(self.bot.sql.welcome.get_welcome, member.guild)
 
         if welcome.goodbye_message and welcome.channel:
             self.send_welcome_message(
@@ -334,8 +336,10 @@ class Welcome(AbstractCog):
             ctx.guild.id,
         )
 
-        with self.bot.sql.transaction():
-            self.bot.sql.welcome.set_welcome_channel(ctx.guild, channel)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.welcome.set_welcome_channel, ctx.guild, channel
+            )
 
         content = (
             f"{user_discrim(ctx.author)} set the welcome channel to {channel.mention}"
@@ -361,8 +365,10 @@ class Welcome(AbstractCog):
             ctx.guild.id,
         )
 
-        with self.bot.sql.transaction():
-            self.bot.sql.welcome.set_welcome_channel(ctx.guild, None)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.welcome.set_welcome_channel, ctx.guild, None
+            )
 
         content = f"{user_discrim(ctx.author)} unset the welcome channel"
         self.journal.send(
@@ -434,8 +440,12 @@ class Welcome(AbstractCog):
         if welcome_message is not None:
             await self.check_welcome_message(ctx, welcome_message)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.welcome.set_welcome_message(ctx.guild, welcome_message or None)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.welcome.set_welcome_message,
+                ctx.guild,
+                welcome_message or None,
+            )
 
         content = (
             f'{"Set" if welcome_message else "Unset"} new welcome message for the guild'
@@ -466,8 +476,12 @@ class Welcome(AbstractCog):
         if goodbye_message is not None:
             await self.check_welcome_message(ctx, goodbye_message)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.welcome.set_goodbye_message(ctx.guild, goodbye_message or None)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.welcome.set_goodbye_message,
+                ctx.guild,
+                goodbye_message or None,
+            )
 
         content = (
             f'{"Set" if goodbye_message else "Unset"} new goodbye message for the guild'
@@ -498,8 +512,10 @@ class Welcome(AbstractCog):
         if agreed_message is not None:
             await self.check_welcome_message(ctx, agreed_message)
 
-        with self.bot.sql.transaction():
-            self.bot.sql.welcome.set_agreed_message(ctx.guild, agreed_message)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(
+                self.bot.sql.welcome.set_agreed_message, ctx.guild, agreed_message
+            )
 
         content = (
             f'{"Set" if agreed_message else "Unset"} new agree message for the guild'
@@ -526,19 +542,26 @@ class Welcome(AbstractCog):
             )
             raise CommandFailed(embed=embed)
 
-        tasks = []
-        for member in ctx.guild.members:
-            if member.top_role == ctx.guild.default_role:
-                tasks.append(
-                    member.add_roles(
-                        roles.guest, reason="Manually assigning guest role", atomic=True
-                    )
-                )
-        await asyncio.gather(*tasks)
+        async def add_guest(member):
+            await member.add_roles(
+                roles.guest, reason="Manually assigning guest role", atomic=True
+            )
+            return True
+
+        members = [
+            member
+            for member in ctx.guild.members
+            if member.top_role == ctx.guild.default_role
+        ]
+        operation = self.bot.bulk.start(ctx.guild, "guestify", members, add_guest)
+        await operation.wait()
 
         embed = discord.Embed(colour=discord.Colour.dark_teal())
-        if tasks:
-            embed.description = f"Added the {roles.guest.mention} role to `{len(tasks)}` member{plural(len(tasks))}."
+        if members:
+            count = operation.changed
+            embed.description = f"Added the {roles.guest.mention} role to `{count}` member{plural(count)}."
+            if not operation.finished:
+                embed.description += f"\n{operation.stopped_message}"
         else:
             embed.description = "No roleless members found."
         await ctx.send(embed=embed)
@@ -14,7 +14,6 @@
 Functions to prune a user either manually or automatically
 """
 
-import asyncio
 import logging
 from datetime import datetime, timedelta
 
@@ -116,16 +115,20 @@ class Prune(AbstractCog):
                 ctx.guild.members,
             )
 
-        count = 0
-        for member in to_be_pruned:
-            if ctx.me.top_role > member.top_role:
-                await ctx.guild.kick(
-                    member, reason=f"Pruning guests older than {days} days"
-                )
-                count += 1
-                await asyncio.sleep(0.01)
+        async def kick(member):
+            if ctx.me.top_role <= member.top_role:
+                return False
 
-        return count
+            await ctx.guild.kick(
+                member, reason=f"Pruning guests older than {days} days"
+            )
+            return True
+
+        operation = self.bot.bulk.start(
+            ctx.guild, f"prune ({days} days)", list(to_be_pruned), kick
+        )
+        await operation.wait()
+        return operation
 
     @commands.command(name="prune", aliases=["purge"])
     @commands.guild_only()
@@ -136,11 +139,11 @@ class Prune(AbstractCog):
         Defaults to seven days.
         """
 
-        pruned_members = await self.prune_member(ctx, days)
+        operation = await self.prune_member(ctx, days)
 
-        # Check if prune_members is None as if it is there is not member role set
+        # Check if the operation is None as if it is there is not member role set
         # If there is no member role set pruning members makes no sense
-        if pruned_members is None:
+        if operation is None:
             error_message = (
                 "The server has no member role set, so pruning will have no effect"
             )
@@ -149,8 +152,11 @@ class Prune(AbstractCog):
             )
             raise CommandFailed(embed=embed)
 
+        pruned_members = operation.changed
         content = f"Pruned {pruned_members} members"
         embed = discord.Embed(description=content, colour=discord.Colour.dark_teal())
+        if not operation.finished:
+            embed.description += f"\n{operation.stopped_message}"
         await ctx.send(embed=embed)
 
         self.journal.send(
@@ -44,19 +44,24 @@ class RoleReapplication(AbstractCog):
         """
         Update all of the member's saved roles.
 
-        Since this task can be very slow with several thousand members,
-        the task is run in the background delays itself to avoid clogging
-        the bot. However, this will degrade reapply-role performance until
+        Each guild's saved roles are compared against its current members
+        in bulk, and only those that changed are written. This is run in
+        the background, and reapply-role performance is degraded until
         it's finished.
         """
 
         async with self.lock:
-            with self.bot.sql.transaction():
-                for i, member in enumerate(self.bot.get_all_members()):
-                    self.bot.sql.roles.update_saved_roles(member)
-
-                    if i % 20 == 0:
-                        await asyncio.sleep(0.2)
+            for guild in self.bot.guilds:
+                # Take a snapshot here, the member cache can't be read from another thread
+                member_roles = {
+                    member.id: [role.id for role in member.roles]
+                    for member in guild.members
+                }
+
+                async with self.bot.sql.transaction():
+                    await self.bot.sql.run(
+                        self.bot.sql.roles.sync_saved_roles, guild, member_roles
+                    )
 
     def setup(self):
         logger.info("Running member role update in background")
@@ -99,13 +104,13 @@ class RoleReapplication(AbstractCog):
 
         return can_reapply
 
-    def get_roles_to_reapply(self, member):
-        roles = self.bot.sql.roles.get_saved_roles(member)
+    async def get_roles_to_reapply(self, member):
+        roles = await self.bot.sql.run(self.bot.sql.roles.get_saved_roles, member)
         if not roles:
             logger.debug("No roles to reapply, user is new")
             return None
 
-        can_reapply = self.get_reapply_roles(member.guild)
+        can_reapply = await self.bot.sql.run(self.get_reapply_roles, member.guild)
         return list(filter(lambda r: r in can_reapply, roles))
 
     @commands.guild_only()
@@ -120,7 +125,7 @@ class RoleReapplication(AbstractCog):
             member = FakeMember(id=user.id, name=user.name, guild=ctx.guild)
             mention = user.mention
 
-        roles = self.get_roles_to_reapply(member)
+        roles = await self.get_roles_to_reapply(member)
         if roles:
             roles.sort(key=lambda r: r.position, reverse=True)
             role_list = " ".join(role.mention for role in roles)
@@ -135,7 +140,7 @@ class RoleReapplication(AbstractCog):
         await ctx.send(embed=embed)
 
     async def reapply_roles(self, member):
-        roles = self.get_roles_to_reapply(member)
+        roles = await self.get_roles_to_reapply(member)
         if roles is None:
             return None
 
@@ -169,8 +174,8 @@ class RoleReapplication(AbstractCog):
         )
 
         async with self.lock:
-            with self.bot.sql.transaction():
-                self.bot.sql.roles.update_saved_roles(member)
+            async with self.bot.sql.transaction():
+                await self.bot.sql.run(self.bot.sql.roles.update_saved_roles, member)
 
         content = f"Saved updated roles for {user_discrim(member)}"
         self.journal.send("save", member.guild, content, member=member, icon="save")
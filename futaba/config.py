@@ -17,7 +17,7 @@ Loads configuration files from disk
 from collections import namedtuple
 
 import toml
-from schema import Schema, And, Or
+from schema import Schema, And, Optional, Or
 
 from futaba.converters import ID_REGEX
 
@@ -53,6 +53,7 @@ ConfigurationSchema = Schema(
             "chunk-size": And(str, _check_gtz(int)),
             "sleep": And(str, _check_gtz(float)),
         },
+        Optional("filter"): {"cache-path": str},
         "emojis": {
             "anger": Or(And(str, ID_REGEX.match), "0"),
             "python": Or(And(str, ID_REGEX.match), "0"),
@@ -75,6 +76,7 @@ Configuration = namedtuple(
         "helper_ping_cooldown",
         "delay_chunk_size",
         "delay_sleep",
+        "filter_cache_path",
         "anger_emoji_id",
         "python_emoji_id",
         "discord_py_emoji_id",
@@ -100,6 +102,7 @@ def load_config(path):
         helper_ping_cooldown=int(config["moderation"]["ping-cooldown"]),
         delay_chunk_size=int(config["delay"]["chunk-size"]),
         delay_sleep=float(config["delay"]["sleep"]),
+        filter_cache_path=config.get("filter", {}).get("cache-path") or None,
         anger_emoji_id=int(config["emojis"]["anger"]),
         python_emoji_id=int(config["emojis"]["python"]),
         discord_py_emoji_id=int(config["emojis"]["discordpy"]),
@@ -29,6 +29,33 @@ JUMP_LINK_REGEX = re.compile(
     r"https://discordapp.com/channels/([0-9]+)/([0-9]+)/([0-9]+)", re.IGNORECASE
 )
 
+# Maximum number of channels searched for a message that isn't indexed
+SEARCH_LIMIT = 15
+
+# Number of channels searched at the same time
+SEARCH_BATCH = 5
+
+
+def rank_channels(guild, channels, message_id):
+    """
+    Orders the channels by how likely they are to contain the message.
+    Channels created after the message or which can't be read are dropped,
+    and those that have had activity since the message was sent come first.
+    """
+
+    def can_contain(channel):
+        if channel.id > message_id:
+            return False
+
+        return channel.permissions_for(guild.me).read_message_history
+
+    def activity(channel):
+        last_message_id = channel.last_message_id or 0
+        return last_message_id >= message_id, last_message_id
+
+    channels = sorted(filter(can_contain, channels), key=activity, reverse=True)
+    return channels[:SEARCH_LIMIT]
+
 
 class MessageConv(Converter):
     @staticmethod
@@ -43,7 +70,7 @@ class MessageConv(Converter):
             if channel is None:
                 channel = ctx.guild.get_thread(channel_id)
                 if channel is None:
-                    return BadArgument(
+                    raise BadArgument(
                         f"No channel or thread found in guild with ID {channel_id}"
                     )
 
@@ -52,8 +79,20 @@ class MessageConv(Converter):
         # Checking if it's an id
         match = ID_REGEX.match(argument)
         if match is not None:
-            threads = await ctx.guild.active_threads()
-            return ctx.guild.text_channels + threads, int(match[1])
+            message_id = int(match[1])
+            sql = ctx.bot.sql
+            channel_id = sql.messages.get_cached_location(message_id)
+            if channel_id is None:
+                channel_id = await sql.run(sql.messages.fetch_location, message_id)
+
+            if channel_id is not None:
+                channel = ctx.guild.get_channel_or_thread(channel_id)
+                if channel is not None:
+                    return [channel], message_id
+
+            logger.debug("Message %d is not indexed, searching channels", message_id)
+            channels = ctx.guild.text_channels + list(ctx.guild.threads)
+            return rank_channels(ctx.guild, channels, message_id), message_id
 
         # Checking if it's a jump link
         match = JUMP_LINK_REGEX.match(argument)
@@ -90,12 +129,17 @@ class MessageConv(Converter):
             raise BadArgument("Refusing to find message because we are not in a guild")
 
         channels, id = await self.get_channels_and_id(ctx, argument)
-        results = await asyncio.gather(
-            *[self.find_in_channel(channel, id) for channel in channels]
-        )
-
-        message = first(results)
-        if message is None:
-            raise BadArgument(f"No message found with ID {id}")
-
-        return message
+        for i in range(0, len(channels), SEARCH_BATCH):
+            results = await asyncio.gather(
+                *[
+                    self.find_in_channel(channel, id)
+                    for channel in channels[i : i + SEARCH_BATCH]
+                ]
+            )
+
+            message = first(results)
+            if message is not None:
+                ctx.bot.sql.messages.remember_location(message)
+                return message
+
+        raise BadArgument(f"No message found with ID {id}")
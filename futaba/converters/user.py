@@ -12,7 +12,7 @@
 
 import logging
 import re
-from itertools import chain, islice
+from itertools import chain
 from typing import Iterable
 
 import textdistance
@@ -46,24 +46,27 @@ async def similar_users(bot, argument, max_entries=10) -> Iterable[discord.User]
     They are ranked in order of similarity.
     """
 
+    # Narrow down the search using the bot's user index
+    normalized = normalize_caseless(argument)
+    candidates = []
+    for user_id in bot.user_index.search(normalized):
+        user = bot.get_user(user_id)
+        if user is not None:
+            candidates.append(user)
+
     # Get exact matches, if any
     try:
-        user = await get_user(bot, argument, bot.users)
+        user = await get_user(bot, argument, candidates)
         matching = [user]
     except BadArgument:
         matching = []
 
-    # Search case-insensitively
-    argument = normalize_caseless(argument)
-
-    # Do a fuzzy text search among users
+    # Do a fuzzy text search among the candidates
     users = []
-    for user in bot.users:
-        similar = similar_text(argument, normalize_caseless(user.name))
-        if getattr(user, "nick", None) is not None:
-            similar = max(
-                similar, similar_text(argument, normalize_caseless(user.nick))
-            )
+    for user in candidates:
+        similar = max(
+            similar_text(normalized, name) for name in bot.user_index.get_names(user.id)
+        )
         if user not in matching:
             users.append((user, similar))
 
@@ -72,7 +75,7 @@ async def similar_users(bot, argument, max_entries=10) -> Iterable[discord.User]
     matching.extend(user for user, similar in users if similar > 0.3)
 
     # Done
-    return islice(matching, 0, max_entries)
+    return matching[:max_entries]
 
 
 async def get_user(bot, argument, user_list):
@@ -14,6 +14,10 @@
 An asynchronous queue that takes in lower-priority discord.py API events
 and sends them slowly over time. This prevents the bot from becoming
 slowed down or gridlocked over long-running or mass operations.
+
+Plain text messages to a channel that are still waiting in the queue are
+merged, so a burst of events like a raid is posted in a few messages
+instead of one per event.
 """
 
 import asyncio
@@ -24,15 +28,21 @@ import typing
 
 logger = logging.getLogger(__name__)
 
+# Maximum length of a Discord message
+MESSAGE_LIMIT = 2000
+
 
 class DelayedQueue:
-    __slots__ = ("config", "queue")
+    __slots__ = ("config", "queue", "pending_text")
 
     def __init__(self, config):
         self.config = config
         # queue must be created in the event loop
         self.queue: asyncio.Queue[typing.Coroutine] = None
 
+        # Channel ID -> text contents waiting to be sent there
+        self.pending_text = {}
+
     def start(self, eventloop: asyncio.AbstractEventLoop):
         eventloop.create_task(self.main_loop())
 
@@ -40,6 +50,48 @@ class DelayedQueue:
         assert inspect.iscoroutine(coro)
         self.queue.put_nowait(coro)
 
+    def push_send(self, channel, **kwargs):
+        """
+        Queues a message to be sent to the channel. Plain text messages are
+        merged into any others for the channel still waiting to be sent.
+        """
+
+        if set(kwargs) != {"content"}:
+            # Keep messages in order, later text can't jump ahead of this one
+            self.pending_text.pop(channel.id, None)
+            self.push(channel.send(**kwargs))
+            return
+
+        contents = self.pending_text.get(channel.id)
+        if contents is not None:
+            contents.append(kwargs["content"])
+            return
+
+        contents = self.pending_text[channel.id] = [kwargs["content"]]
+        self.push(self._send_text(channel, contents))
+
+    async def _send_text(self, channel, contents):
+        if self.pending_text.get(channel.id) is contents:
+            del self.pending_text[channel.id]
+
+        if len(contents) > 1:
+            logger.debug(
+                "Sending %d merged messages to #%s (%d)",
+                len(contents),
+                channel.name,
+                channel.id,
+            )
+
+        message = contents[0]
+        for content in contents[1:]:
+            if len(message) + len(content) + 1 > MESSAGE_LIMIT:
+                await channel.send(content=message)
+                message = content
+            else:
+                message = f"{message}\n{content}"
+
+        await channel.send(content=message)
+
     async def main_loop(self):
         self.queue = asyncio.Queue()
 
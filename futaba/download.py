@@ -12,38 +12,187 @@
 
 import asyncio
 import logging
-from io import BytesIO
+from contextlib import asynccontextmanager
+from hashlib import sha1
 from ssl import SSLError
+from tempfile import SpooledTemporaryFile
+from urllib.parse import urlsplit
 
 import aiohttp
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["MAXIMUM_FILE_SIZE", "download_links", "download_link"]
+__all__ = ["MAXIMUM_FILE_SIZE", "DownloadedFile", "Downloader"]
 
 # Maximum size to download from foreign sites
 MAXIMUM_FILE_SIZE = 24 * 1024 * 1024
 
 # How large each read request should be
-CHUNK_SIZE = 4 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Kept file contents larger than this are moved from memory to disk
+SPOOL_SIZE = 1024 * 1024
 
 # Prevent connections from hanging for too long
 TIMEOUT = aiohttp.ClientTimeout(total=45, sock_read=5)
 
+# Limits on simultaneous connections, in total and to any one host
+MAX_CONNECTIONS = 32
+MAX_HOST_CONNECTIONS = 4
+
+# Discord's CDN serves every attachment, so it is allowed more connections
+CDN_HOSTS = frozenset(("cdn.discordapp.com", "media.discordapp.net"))
+MAX_CDN_CONNECTIONS = 16
+
+# How many of the connections are reserved for priority downloads,
+# in total and to any one host
+PRIORITY_CONNECTIONS = 8
+PRIORITY_HOST_CONNECTIONS = 2
+PRIORITY_CDN_CONNECTIONS = 8
+
+# How long resolved hostnames are cached, in seconds
+DNS_CACHE_TTL = 300
+
+
+class DownloadedFile:
+    """
+    The result of downloading a link. The SHA1 hash is computed as the
+    body streams in, and the body itself is only kept if it was asked for.
+    """
+
+    __slots__ = ("url", "hashsum", "size", "fh")
+
+    def __init__(self, url, hashsum, size, fh):
+        self.url = url
+        self.hashsum = hashsum
+        self.size = size
+        self.fh = fh
+
+    def open(self):
+        """Gets the kept file contents, rewound to the start."""
+
+        if self.fh is None:
+            raise ValueError("The contents of this download were not kept")
+
+        self.fh.seek(0)
+        return self.fh
+
+    def close(self):
+        if self.fh is not None:
+            self.fh.close()
+            self.fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+class _Slots:
+    """
+    Limits simultaneous downloads, with some slots reserved for priority ones.
+    Normal downloads need a normal slot as well, so they can't take them all.
+    """
+
+    __slots__ = ("all", "normal", "users")
+
+    def __init__(self, limit, reserved):
+        self.all = asyncio.Semaphore(limit)
+        self.normal = asyncio.Semaphore(limit - reserved)
+        self.users = 0
+
+    @asynccontextmanager
+    async def acquire(self, priority):
+        if priority:
+            async with self.all:
+                yield
+            return
 
-async def download_links(urls):
-    async with aiohttp.ClientSession(timeout=TIMEOUT, trust_env=True) as session:
-        buffers = await asyncio.gather(*[download(session, url) for url in urls])
-    return buffers
+        async with self.normal:
+            async with self.all:
+                yield
 
 
-async def download_link(url):
-    async with aiohttp.ClientSession(timeout=TIMEOUT, trust_env=True) as session:
-        return await download(session, url)
+def _host_slots(host):
+    if host in CDN_HOSTS:
+        return _Slots(MAX_CDN_CONNECTIONS, PRIORITY_CDN_CONNECTIONS)
 
+    return _Slots(MAX_HOST_CONNECTIONS, PRIORITY_HOST_CONNECTIONS)
 
-async def download(session, url):
-    binio = BytesIO()
+
+class Downloader:
+    """
+    The bot's long-lived HTTP client for fetching links.
+
+    Connections are kept alive between downloads and hostname lookups are
+    cached. The number of simultaneous downloads is capped, both overall and
+    per host. Some of the slots can only be used by priority downloads, so
+    filter checks are never stuck waiting behind commands like sha1sum.
+
+    The per-host caps are kept here rather than by the connector, which
+    would queue every download to a host in order regardless of priority.
+    """
+
+    __slots__ = ("session", "slots", "hosts")
+
+    def __init__(self):
+        self.session = None
+        self.slots = None
+        self.hosts = {}
+
+    def get_session(self):
+        # Created lazily, since this needs to happen on the running event loop
+        if self.session is None or self.session.closed:
+            logger.info("Creating shared HTTP client session")
+            connector = aiohttp.TCPConnector(
+                limit=MAX_CONNECTIONS, ttl_dns_cache=DNS_CACHE_TTL
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=TIMEOUT, trust_env=True
+            )
+            self.slots = _Slots(MAX_CONNECTIONS, PRIORITY_CONNECTIONS)
+
+        return self.session
+
+    async def close(self):
+        if self.session is not None:
+            logger.info("Closing shared HTTP client session")
+            await self.session.close()
+            self.session = None
+
+    async def download_links(self, urls, keep=False, priority=False):
+        return await asyncio.gather(
+            *[self.download_link(url, keep, priority) for url in urls]
+        )
+
+    async def download_link(self, url, keep=False, priority=False):
+        session = self.get_session()
+
+        try:
+            host = urlsplit(url).hostname
+        except ValueError:
+            host = None
+
+        # Only kept while some download to the host is running or waiting
+        host_slots = self.hosts.get(host)
+        if host_slots is None:
+            host_slots = self.hosts[host] = _host_slots(host)
+
+        host_slots.users += 1
+        try:
+            async with host_slots.acquire(priority), self.slots.acquire(priority):
+                return await download(session, url, keep)
+        finally:
+            host_slots.users -= 1
+            if not host_slots.users:
+                del self.hosts[host]
+
+
+async def download(session, url, keep=False):
+    hasher = sha1()
+    size = 0
+    fh = SpooledTemporaryFile(max_size=SPOOL_SIZE) if keep else None
     try:
         async with session.get(url) as response:
             if response.content_length is not None:
@@ -55,12 +204,18 @@ async def download(session, url):
                     )
                     return None
 
-            while len(binio.getbuffer()) < MAXIMUM_FILE_SIZE:
+            while size < MAXIMUM_FILE_SIZE:
                 chunk = await response.content.read(CHUNK_SIZE)
-                if chunk:
-                    binio.write(chunk)
-                else:
-                    return binio
+                if not chunk:
+                    result = DownloadedFile(url, hasher.digest(), size, fh)
+                    fh = None
+                    return result
+
+                hasher.update(chunk)
+                size += len(chunk)
+                if fh is not None:
+                    fh.write(chunk)
+
             logger.info(
                 "File was too large, bailing out (max file size: %d bytes)",
                 MAXIMUM_FILE_SIZE,
@@ -72,3 +227,7 @@ async def download(session, url):
     except Exception as error:
         logger.info("Error while downloading %s for hash check", url, exc_info=error)
         return None
+    finally:
+        # Only set if the download did not complete
+        if fh is not None:
+            fh.close()
@@ -29,6 +29,10 @@ class ChannelOutputListener(Listener):
         super().__init__(router, path, recursive)
         self.channel = channel
 
+    @property
+    def guild_id(self):
+        return self.channel.guild.id
+
     def filter(self, path, guild, content, attributes):
         """
         Ensures that this event is actually meant for this channel output logger.
@@ -38,8 +42,8 @@ class ChannelOutputListener(Listener):
         if guild is None:
             return False
 
-        # Wrong guild
-        if self.channel not in guild.channels:
+        # Wrong guild, or the channel was deleted
+        if guild.get_channel(self.channel.id) is None:
             return False
 
         return True
@@ -58,5 +62,4 @@ class ChannelOutputListener(Listener):
         if "files" in attributes:
             kwargs["files"] = list(map(copy_discord_file, attributes["files"]))
 
-        coro = self.channel.send(**kwargs)
-        self.router.bot.queue.push(coro)
+        self.router.bot.queue.push_send(self.channel, **kwargs)
@@ -27,6 +27,15 @@ class Listener:
         self.path = PurePath(path)
         self.recursive = recursive
 
+    @property
+    def guild_id(self):
+        """
+        The ID of the only guild whose events this listener receives.
+        If None, it receives events from all guilds.
+        """
+
+        return None
+
     def check(self, path, guild, content, attributes):
         if not self.filter(path, guild, content, attributes):
             logger.debug("Filter rejected journal entry")
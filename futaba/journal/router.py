@@ -37,11 +37,12 @@ def attrs_match(obj, attrs):
 
 
 class Router:
-    __slots__ = ("bot", "paths", "queue", "history")
+    __slots__ = ("bot", "paths", "resolved", "queue", "history")
 
     def __init__(self, bot: Bot):
         self.bot = bot
         self.paths = defaultdict(list)
+        self.resolved = {}
         self.queue = asyncio.Queue()
         self.history = deque(maxlen=1024)
 
@@ -65,10 +66,43 @@ class Router:
     def register(self, listener):
         logger.info("Registering %r on '%s'", listener, listener.path)
         self.paths[listener.path].append(listener)
+        self.resolved.clear()
 
     def unregister(self, listener):
         logger.info("Unregistering %r from '%s'", listener, listener.path)
         self.paths[listener.path].remove(listener)
+        self.resolved.clear()
+
+    def resolve(self, guild, path):
+        """
+        Gets all the listeners that an event in the given guild and path is
+        delivered to. This walks the path's ancestors and skips listeners for
+        other guilds, so the result is cached until a listener is added or removed.
+        """
+
+        guild_id = getattr(guild, "id", None)
+        key = (guild_id, path)
+
+        try:
+            return self.resolved[key]
+        except KeyError:
+            pass
+
+        logger.debug("Resolving listeners for '%s' in guild %s", path, guild_id)
+        listeners = []
+        for parent in chain((path,), path.parents):
+            for listener in self.paths.get(parent, ()):
+                if listener.guild_id is not None and listener.guild_id != guild_id:
+                    continue
+
+                if not listener.recursive and listener.path != path:
+                    continue
+
+                listeners.append(listener)
+
+        listeners = tuple(listeners)
+        self.resolved[key] = listeners
+        return listeners
 
     async def handle_events(self):
         responses = []
@@ -81,14 +115,13 @@ class Router:
             logger.debug("Journal content after processing: '%s'", event.content)
 
             # Add events for this path
-            for path in chain((event.path,), event.path.parents):
-                for listener in self.paths[path]:
-                    if listener.check(path, event.guild, content, event.attributes):
-                        responses.append(
-                            listener.handle(
-                                event.path, event.guild, content, event.attributes
-                            )
+            for listener in self.resolve(event.guild, event.path):
+                if listener.check(event.path, event.guild, content, event.attributes):
+                    responses.append(
+                        listener.handle(
+                            event.path, event.guild, content, event.attributes
                         )
+                    )
 
             # Run all the event handlers
             try:
@@ -19,4 +19,5 @@ from .abc import TASK_COMPLETE, AbstractNaviTask
 from .change_roles import ChangeRolesTask, build_change_role_task
 from .factory import build_navi_task
 from .punish import PunishTask
+from .scheduler import NaviScheduler
 from .send_message import SendMessageTask, build_send_message_task
@@ -12,7 +12,6 @@
 
 """ Abstract class for Navi tasks. """
 
-import asyncio
 import logging
 from abc import abstractmethod
 from datetime import datetime
@@ -29,7 +28,7 @@ TASK_COMPLETE = datetime(1, 1, 1)
 
 
 class AbstractNaviTask:
-    __slots__ = ("bot", "id", "causer", "timestamp", "recurrence", "async_task")
+    __slots__ = ("bot", "id", "causer", "timestamp", "recurrence")
 
     def __init__(self, bot, id, causer, timestamp, recurrence):
         self.bot = bot
@@ -37,7 +36,6 @@ class AbstractNaviTask:
         self.causer = causer
         self.timestamp = timestamp
         self.recurrence = recurrence
-        self.async_task = None
 
     def due_next(self):
         now = datetime.now()
@@ -54,52 +52,19 @@ class AbstractNaviTask:
 
     def execute_later(self):
         """
-        Puts this task on the asyncio event loop for later execution.
+        Hands this task to the bot's scheduler for later execution.
         Can only be done once.
         """
 
-        if self.async_task is not None:
-            raise ValueError(f"This task is already running: id {self.id}, {self!r}")
+        self.bot.scheduler.schedule(self)
 
-        self.async_task = self.bot.loop.create_task(self.execute_future())
-
-    async def execute_future(self):
-        """
-        The blocking coroutine that will run this task to completion. If it is a recurring
-        task, it will run it in perpetuity.
-        """
-
-        assert self.id is not None, "Task was not assigned a unique ID"
-
-        logger.info("Starting full future execution of task %d", self.id)
-        due_next = self.due_next()
-        if due_next is TASK_COMPLETE:
-            self.remove_self()
-            return
-
-        duration = (due_next - datetime.now()).total_seconds()
-        await asyncio.sleep(duration)
-        await self.execute()
-
-        if self.recurrence is None:
-            self.remove_self()
-            return
-
-        logger.debug(
-            "Ran for the first time, task %d now looping continually...", self.id
-        )
-        duration = self.recurrence.total_seconds()
-        while True:
-            await asyncio.sleep(duration)
-            await self.execute()
-
-    def remove_self(self):
+    async def remove_self(self):
         """This task has been fulfilled, removed it from the database to reduce clutter."""
 
         logger.info("Removing self from navi task database table")
 
-        with self.bot.sql.transaction():
-            self.bot.sql.navi.remove_task(self)
+        async with self.bot.sql.transaction():
+            await self.bot.sql.run(self.bot.sql.navi.remove_task, self)
 
     @property
     def guild(self):
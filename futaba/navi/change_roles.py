@@ -13,8 +13,6 @@
 import asyncio
 import logging
 
-import discord
-
 from futaba.enums import TaskType
 from futaba.utils import class_property
 from .abc import AbstractNaviTask
@@ -75,13 +73,13 @@ def build_change_role_task(bot, causer, guild, storage):
     # - reason: str
 
     member_id = storage.parameters["member_id"]
-    member = discord.utils.get(guild.members, id=member_id)
+    member = guild.get_member(member_id)
     if member is None:
         raise ValueError(f"Unable to find member with ID {member_id}")
 
     to_add = []
     for role_id in storage.parameters["add_role_ids"]:
-        role = discord.utils.get(guild.roles, id=role_id)
+        role = guild.get_role(role_id)
         if role is None:
             logger.info("Couldn't find role to add with ID of %d", role_id)
         else:
@@ -89,7 +87,7 @@ def build_change_role_task(bot, causer, guild, storage):
 
     to_remove = []
     for role_id in storage.parameters["remove_role_ids"]:
-        role = discord.utils.get(guild.roles, id=role_id)
+        role = guild.get_role(role_id)
         if role is None:
             logger.info("Couldn't find role to remove with ID of %d", role_id)
         else:
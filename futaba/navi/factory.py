@@ -18,8 +18,6 @@ the values and attributes retrieved in the database.
 import logging
 from collections import namedtuple
 
-import discord
-
 from futaba.enums import TaskType
 from .change_roles import build_change_role_task
 from .punish import build_punish_task
@@ -40,7 +38,7 @@ TASK_BUILDERS = {
 
 def build_navi_task(bot, storage):
     logger.debug("Creating NaviTask for %r", storage)
-    causer = discord.utils.get(bot.users, id=storage.user_id)
+    causer = bot.get_user(storage.user_id)
     if causer is None:
         logger.debug(
             "Couldn't find causing user %d, returning dummy user", storage.user_id
@@ -49,7 +47,7 @@ def build_navi_task(bot, storage):
             id=storage.user_id, name=int(storage.user_id), discriminator="0000"
         )
 
-    guild = discord.utils.get(bot.guilds, id=storage.guild_id)
+    guild = bot.get_guild(storage.guild_id)
     if guild is None:
         raise ValueError(f"Unable to find guild with ID {storage.guild_id}")
 
@@ -12,8 +12,6 @@
 
 import logging
 
-import discord
-
 from futaba.enums import PunishAction, TaskType
 from futaba.utils import class_property
 from .abc import AbstractNaviTask
@@ -96,7 +94,7 @@ def build_punish_task(bot, causer, guild, storage):
     # - reason: str
 
     member_id = storage.parameters["member_id"]
-    member = discord.utils.get(guild.members, id=member_id)
+    member = guild.get_member(member_id)
     if member is None:
         raise ValueError(f"Unable to find member with ID {member_id}")
 
@@ -0,0 +1,179 @@
+#
+# navi/scheduler.py
+#
+# futaba - A Discord Mod bot for the Programming server
+# Copyright (c) 2017-2020 Jake Richardson, Emmie Smith, jackylam5
+#
+# futaba is available free of charge under the terms of the MIT
+# License. You are free to redistribute and/or modify it under those
+# terms. It is distributed in the hopes that it will be useful, but
+# WITHOUT ANY WARRANTY. See the LICENSE file for more details.
+#
+
+"""
+Runs all pending Navi tasks from a single timer.
+
+Tasks are kept in a heap ordered by when they are next due, and one
+background coroutine sleeps until the earliest of them. Only tasks due
+within a rolling window are loaded from the database, and the window is
+advanced and refilled as time passes.
+"""
+
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+from itertools import count
+
+from .abc import TASK_COMPLETE
+from .factory import build_navi_task
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["NaviScheduler"]
+
+# How far ahead tasks are loaded from the database
+WINDOW = timedelta(hours=1)
+
+# How long before the end of the window the next one is loaded
+REFILL_MARGIN = timedelta(minutes=5)
+
+# How long to wait before trying again after loading tasks failed
+REFILL_RETRY_DELAY = timedelta(seconds=30)
+
+
+class NaviScheduler:
+    __slots__ = ("bot", "heap", "scheduled", "horizon", "counter", "wakeup", "runner")
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.heap = []
+        self.scheduled = set()
+        self.horizon = None
+        self.counter = count()
+        self.wakeup = None
+        self.runner = None
+
+    def start(self):
+        """Loads the first window of tasks and starts the timer. Can only be done once."""
+
+        if self.runner is not None:
+            logger.debug("Navi scheduler is already running")
+            return
+
+        logger.info("Starting navi task scheduler")
+        self.wakeup = asyncio.Event()
+        self.runner = self.bot.loop.create_task(self.run())
+
+    def schedule(self, task):
+        """
+        Adds the task to the scheduler. One-off tasks due after the current window
+        are skipped, they will be loaded from the database once it gets there.
+        """
+
+        assert task.id is not None, "Task was not assigned a unique ID"
+
+        if task.id in self.scheduled:
+            raise ValueError(f"This task is already running: id {task.id}, {task!r}")
+
+        due = task.due_next()
+        if due is TASK_COMPLETE:
+            self.bot.loop.create_task(task.remove_self())
+            return
+
+        # Recurring tasks are only loaded at startup, so they can't be deferred
+        if self.horizon is not None and due >= self.horizon:
+            if task.recurrence is None:
+                logger.debug("Task %d is due after this window, deferring", task.id)
+                return
+
+        self._push(due, task)
+
+    def _push(self, due, task):
+        logger.debug("Scheduling task %d for %s", task.id, due)
+        self.scheduled.add(task.id)
+
+        # Earliest task changed, the timer needs to be reset
+        if not self.heap or due < self.heap[0][0]:
+            if self.wakeup is not None:
+                self.wakeup.set()
+
+        heapq.heappush(self.heap, (due, next(self.counter), task))
+
+    async def refill(self):
+        since = self.horizon
+        self.horizon = datetime.now() + WINDOW
+
+        # Tasks added while this runs are pushed directly, since the horizon
+        # has already moved. Anything already scheduled is skipped below.
+        logger.info("Loading navi tasks due before %s", self.horizon)
+        try:
+            raw_tasks = await self.bot.sql.run(
+                self.bot.sql.navi.get_tasks, self.horizon, since
+            )
+        except BaseException:
+            # Put the horizon back, so the next attempt loads the same tasks
+            self.horizon = since
+            raise
+
+        for raw_task in raw_tasks.values():
+            if raw_task.id in self.scheduled:
+                continue
+
+            try:
+                self.schedule(build_navi_task(self.bot, raw_task))
+            except ValueError as error:
+                logger.warning(
+                    "Error while loading or running task from database", exc_info=error
+                )
+
+    async def run(self):
+        retry_at = None
+        while True:
+            now = datetime.now()
+            if self.horizon is None or now >= self.horizon - REFILL_MARGIN:
+                # Tasks already loaded keep running while the database is unavailable
+                if retry_at is None or now >= retry_at:
+                    try:
+                        await self.refill()
+                    except Exception as error:
+                        retry_at = now + REFILL_RETRY_DELAY
+                        logger.error(
+                            "Unable to load navi tasks, retrying at %s",
+                            retry_at,
+                            exc_info=error,
+                        )
+                    else:
+                        retry_at = None
+
+            while self.heap and self.heap[0][0] <= now:
+                due, _, task = heapq.heappop(self.heap)
+                self.bot.loop.create_task(self.execute(due, task))
+
+            # Sleep until the next task is due, or the window needs refilling
+            if retry_at is not None:
+                wake_at = retry_at
+            else:
+                wake_at = self.horizon - REFILL_MARGIN
+            if self.heap:
+                wake_at = min(wake_at, self.heap[0][0])
+
+            timeout = max((wake_at - datetime.now()).total_seconds(), 0)
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def execute(self, due, task):
+        try:
+            await task.execute()
+        except Exception as error:
+            logger.error("Error while running navi task %d", task.id, exc_info=error)
+
+        self.scheduled.discard(task.id)
+        if task.recurrence is None:
+            await task.remove_self()
+            return
+
+        self._push(due + task.recurrence, task)
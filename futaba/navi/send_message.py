@@ -74,8 +74,8 @@ def build_send_message_task(bot, causer, guild, storage):
     location_id = storage.parameters["location_id"]
     location_type = storage.parameters["location_type"]
     if location_type == LocationType.CHANNEL:
-        output = discord.utils.get(guild.text_channels, id=location_id)
-        if output is None:
+        output = guild.get_channel(location_id)
+        if not isinstance(output, discord.TextChannel):
             raise ValueError(f"Could not find channel with ID {location_id}")
     elif location_type == LocationType.USER:
         output = causer
@@ -14,7 +14,11 @@
 Module for abstractly interfacing with the RDBMS.
 """
 
+import asyncio
+import contextvars
+import functools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from sqlalchemy import create_engine, MetaData
 
@@ -23,13 +27,14 @@ from .models import (
     FilterModel,
     GuildsModel,
     JournalModel,
+    MessagesModel,
     ModerationModel,
     NaviModel,
     RolesModel,
     SettingsModel,
     WelcomeModel,
 )
-from .transaction import Transaction
+from .transaction import Transaction, active_transaction, current_transaction
 
 logger = logging.getLogger(__name__)
 
@@ -39,13 +44,13 @@ __all__ = ["SqlHandler"]
 class SqlHandler:
     __slots__ = (
         "db",
-        "conn",
-        "trans",
+        "executor",
         "max_delete_messages",
         "alias",
         "filter",
         "guilds",
         "journal",
+        "messages",
         "moderation",
         "navi",
         "roles",
@@ -53,11 +58,19 @@ class SqlHandler:
         "welcome",
     )
 
-    def __init__(self, db_path: str, max_delete_messages=500):
+    def __init__(
+        self, db_path: str, max_delete_messages=500, pool_size=8, max_overflow=8
+    ):
         self.max_delete_messages = max_delete_messages
-        self.db = create_engine(db_path)
-        self.conn = self.db.connect()
-        self.trans = None
+        self.db = create_engine(
+            db_path,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=True,
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=pool_size + max_overflow, thread_name_prefix="futaba-sql"
+        )
         logger.info("Connected to database...")
         meta = MetaData(self.db)
 
@@ -65,6 +78,7 @@ class SqlHandler:
         self.filter = FilterModel(self, meta)
         self.guilds = GuildsModel(self, meta)
         self.journal = JournalModel(self, meta)
+        self.messages = MessagesModel(self, meta)
         self.moderation = ModerationModel(self, meta)
         self.navi = NaviModel(self, meta)
         self.roles = RolesModel(self, meta)
@@ -74,14 +88,48 @@ class SqlHandler:
         meta.create_all(self.db)
         logger.info("Created all tables.")
 
+        self.alias.migrate_avatars()
+        self.navi.migrate_indexes()
+
     def __del__(self):
-        self.conn.close()
+        self.executor.shutdown(wait=False)
+
+    def prime_caches(self, bot):
+        """
+        Fills the models' per-guild and per-channel caches for every guild
+        the bot is in, reading each table once.
+        """
+
+        self.filter.prime_caches(bot)
+        self.journal.prime_caches(bot)
+        self.roles.prime_caches(bot)
+        self.settings.prime_caches(bot)
+        self.welcome.prime_caches(bot)
 
     def execute(self, *args, **kwargs):
-        return self.conn.execute(*args, **kwargs)
+        """
+        Executes a statement in the current task's transaction, if there is one.
+        Otherwise a pooled connection is checked out for just this statement.
+        """
+
+        trans = active_transaction()
+        if trans is not None:
+            return trans.execute(*args, **kwargs)
+
+        return self.db.execute(*args, **kwargs)
 
     def transaction(self, trans_logger=logger):
-        if self.trans is None:
-            self.trans = Transaction(self, self.conn, trans_logger)
+        return Transaction(self, trans_logger)
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Awaits a blocking model call by running it on the database thread pool.
+        The caller's context is copied over, so an open transaction is kept.
+        A transaction inherited from another task is not passed on.
+        """
 
-        return self.trans
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        context.run(current_transaction.set, active_transaction())
+        call = functools.partial(context.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self.executor, call)
@@ -12,6 +12,7 @@
 
 """
 Hooks that trigger on certain events to ensure database consistency.
+Each hook is passed a list of all the guilds the event applies to.
 """
 
 import logging
@@ -32,11 +33,11 @@ def register_hook(name, hook):
     hooks[name].append(hook)
 
 
-def run_hooks(name, *args, **kwargs):
-    logger.info("Running hooks for '%s'...", name)
+def run_hooks(name, guilds):
+    logger.info("Running hooks for '%s' on %d guild(s)...", name, len(guilds))
     for hook in hooks[name]:
         try:
-            hook(*args, **kwargs)
+            hook(guilds)
         except Exception as error:
             logger.error("Error running hook %r!", hook, exc_info=error)
     logger.debug("Finished '%s' hooks.", name)
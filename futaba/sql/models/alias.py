@@ -12,18 +12,22 @@
 
 """
 A model for storing alias information reported by the 'Alias' cog.
+
+Avatar images are stored once each, keyed by the SHA-256 hash of their
+contents, and the avatar history only refers to them by hash.
 """
 
 # False positive when using SQLAlchemy decorators
 # pylint: disable=no-value-for-parameter
 
 import functools
+import hashlib
 import logging
-from collections import deque
 
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, case, cast, exists, func, or_
 from sqlalchemy import BigInteger, Column, DateTime, LargeBinary, String, Table, Unicode
 from sqlalchemy import CheckConstraint, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import array, insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.sql import select
 
@@ -37,6 +41,8 @@ class AliasHistoryModel:
     __slots__ = (
         "sql",
         "tb_alias_avatars",
+        "tb_alias_avatar_blobs",
+        "tb_alias_avatar_history",
         "tb_alias_usernames",
         "tb_alias_nicknames",
         "tb_alias_possible_alts",
@@ -44,6 +50,9 @@ class AliasHistoryModel:
 
     def __init__(self, sql, meta):
         self.sql = sql
+
+        # Legacy table with a full copy of the image in each row.
+        # Its contents are moved over by migrate_avatars().
         self.tb_alias_avatars = Table(
             "alias_avatars",
             meta,
@@ -52,6 +61,20 @@ class AliasHistoryModel:
             Column("avatar", LargeBinary),
             Column("avatar_ext", String),
         )
+        self.tb_alias_avatar_blobs = Table(
+            "alias_avatar_blobs",
+            meta,
+            Column("avatar_hash", String, primary_key=True),
+            Column("avatar", LargeBinary),
+            Column("avatar_ext", String),
+        )
+        self.tb_alias_avatar_history = Table(
+            "alias_avatar_history",
+            meta,
+            Column("user_id", BigInteger, primary_key=True),
+            Column("timestamp", DateTime, primary_key=True),
+            Column("avatar_hash", String, ForeignKey("alias_avatar_blobs.avatar_hash")),
+        )
         self.tb_alias_usernames = Table(
             "alias_usernames",
             meta,
@@ -83,13 +106,79 @@ class AliasHistoryModel:
             ),
         )
 
-    def add_avatar(self, user, timestamp, avatar, ext):
-        logger.info("Adding user avatar update for '%s' (%d)", user.name, user.id)
-        ins = self.tb_alias_avatars.insert().values(
-            user_id=user.id,
-            timestamp=timestamp,
-            avatar=avatar.getbuffer().tobytes(),
-            avatar_ext=ext,
+    def migrate_avatars(self):
+        """
+        Moves avatars from the legacy table over to the deduplicated one.
+        Hashes are computed by the database, so the images don't need to be
+        transferred, and they match hashlib's hex digests.
+        """
+
+        logger.info("Migrating stored avatars to deduplicated storage")
+        legacy = self.tb_alias_avatars
+        legacy_hash = func.encode(func.sha256(legacy.c.avatar), "hex")
+
+        with self.sql.transaction():
+            sel = select(
+                [legacy_hash.label("avatar_hash"), legacy.c.avatar, legacy.c.avatar_ext]
+            ).distinct(legacy_hash)
+            ins = (
+                insert(self.tb_alias_avatar_blobs)
+                .from_select(["avatar_hash", "avatar", "avatar_ext"], sel)
+                .on_conflict_do_nothing(index_elements=["avatar_hash"])
+            )
+            self.sql.execute(ins)
+
+            sel = select([legacy.c.user_id, legacy.c.timestamp, legacy_hash])
+            ins = (
+                insert(self.tb_alias_avatar_history)
+                .from_select(["user_id", "timestamp", "avatar_hash"], sel)
+                .on_conflict_do_nothing(index_elements=["user_id", "timestamp"])
+            )
+            result = self.sql.execute(ins)
+            self.sql.execute(legacy.delete())
+
+        if result.rowcount:
+            logger.info("Migrated %d avatar history entries", result.rowcount)
+
+    def add_avatars(self, avatars):
+        """
+        Adds avatar updates, given as (user_id, timestamp, data, ext) tuples.
+        Only images that are not stored already are sent to the database.
+        """
+
+        logger.info("Adding %d user avatar updates", len(avatars))
+        blobs = {}
+        history = []
+        for user_id, timestamp, data, ext in avatars:
+            avatar_hash = hashlib.sha256(data).hexdigest()
+            blobs[avatar_hash] = (data, ext)
+            history.append(
+                {"user_id": user_id, "timestamp": timestamp, "avatar_hash": avatar_hash}
+            )
+
+        sel = select([self.tb_alias_avatar_blobs.c.avatar_hash]).where(
+            self.tb_alias_avatar_blobs.c.avatar_hash.in_(list(blobs))
+        )
+        for (avatar_hash,) in self.sql.execute(sel):
+            del blobs[avatar_hash]
+
+        if blobs:
+            ins = (
+                insert(self.tb_alias_avatar_blobs)
+                .values(
+                    [
+                        {"avatar_hash": avatar_hash, "avatar": data, "avatar_ext": ext}
+                        for avatar_hash, (data, ext) in blobs.items()
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=["avatar_hash"])
+            )
+            self.sql.execute(ins)
+
+        ins = (
+            insert(self.tb_alias_avatar_history)
+            .values(history)
+            .on_conflict_do_nothing(index_elements=["user_id", "timestamp"])
         )
         self.sql.execute(ins)
 
@@ -163,13 +252,20 @@ class AliasHistoryModel:
         sel = (
             select(
                 [
-                    self.tb_alias_avatars.c.avatar,
-                    self.tb_alias_avatars.c.avatar_ext,
-                    self.tb_alias_avatars.c.timestamp,
+                    self.tb_alias_avatar_blobs.c.avatar,
+                    self.tb_alias_avatar_blobs.c.avatar_ext,
+                    self.tb_alias_avatar_history.c.timestamp,
                 ]
             )
-            .where(self.tb_alias_avatars.c.user_id == user.id)
-            .order_by(self.tb_alias_avatars.c.timestamp)
+            .select_from(
+                self.tb_alias_avatar_history.join(
+                    self.tb_alias_avatar_blobs,
+                    self.tb_alias_avatar_history.c.avatar_hash
+                    == self.tb_alias_avatar_blobs.c.avatar_hash,
+                )
+            )
+            .where(self.tb_alias_avatar_history.c.user_id == user.id)
+            .order_by(self.tb_alias_avatar_history.c.timestamp)
             .limit(avatar_limit)
         )
         result = self.sql.execute(sel)
@@ -243,34 +339,50 @@ class AliasHistoryModel:
         return usernames, nicknames
 
     def get_alt_user_ids(self, guild, starting_user_ids):
-        logger.info("Iteratively fetching all chained user alt connections.")
+        logger.info("Fetching all chained user alt connections.")
         assert starting_user_ids, "No starting user IDs"
-        to_check = deque(starting_user_ids)
-        alt_user_ids = set()
-        while to_check:
-            user_id = to_check.pop()
-            sel = select(
+
+        # Walk the whole alt graph in one recursive query. UNION (rather
+        # than UNION ALL) discards users already seen, so cycles terminate.
+        alts = self.tb_alias_possible_alts
+        starting_ids = cast(func.unnest(array(list(starting_user_ids))), BigInteger)
+        chain = select([starting_ids.label("user_id")]).cte("alt_chain", recursive=True)
+        edges = alts.alias("edges")
+        chain = chain.union(
+            select(
                 [
-                    self.tb_alias_possible_alts.c.lower_user_id,
-                    self.tb_alias_possible_alts.c.higher_user_id,
+                    case(
+                        [
+                            (
+                                edges.c.lower_user_id == chain.c.user_id,
+                                edges.c.higher_user_id,
+                            )
+                        ],
+                        else_=edges.c.lower_user_id,
+                    )
                 ]
             ).where(
                 and_(
-                    self.tb_alias_possible_alts.c.guild_id == guild.id,
+                    edges.c.guild_id == guild.id,
+                    or_(
+                        edges.c.lower_user_id == chain.c.user_id,
+                        edges.c.higher_user_id == chain.c.user_id,
+                    ),
+                )
+            )
+        )
+
+        # Starting users are only part of the chain if they have any alts
+        sel = select([chain.c.user_id]).where(
+            exists().where(
+                and_(
+                    alts.c.guild_id == guild.id,
                     or_(
-                        self.tb_alias_possible_alts.c.lower_user_id == user_id,
-                        self.tb_alias_possible_alts.c.higher_user_id == user_id,
+                        alts.c.lower_user_id == chain.c.user_id,
+                        alts.c.higher_user_id == chain.c.user_id,
                     ),
                 )
             )
-            result = self.sql.execute(sel)
-            for first_id, second_id in result:
-                if first_id != user_id:
-                    alt_user_id = first_id
-                else:
-                    alt_user_id = second_id
-
-                if alt_user_id not in alt_user_ids:
-                    to_check.append(alt_user_id)
-                    alt_user_ids.add(alt_user_id)
-        return alt_user_ids
+        )
+        result = self.sql.execute(sel)
+        return {user_id for (user_id,) in result}
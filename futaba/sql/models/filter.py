@@ -24,6 +24,7 @@ from collections import defaultdict
 from sqlalchemy import and_
 from sqlalchemy import BigInteger, Boolean, Column, Enum, LargeBinary, Table, Unicode
 from sqlalchemy import CheckConstraint, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.sql import select
 
@@ -44,10 +45,12 @@ class FilterModel:
     __slots__ = (
         "sql",
         "tb_filters",
+        "tb_filter_quarantine",
         "tb_content_filters",
         "tb_filter_immune_users",
         "tb_filter_settings",
         "filter_cache",
+        "quarantine_cache",
         "content_filter_cache",
         "immune_users_cache",
         "settings_cache",
@@ -67,6 +70,16 @@ class FilterModel:
             ),
             UniqueConstraint("location_id", "location_type", "text", name="filter_uq"),
         )
+        self.tb_filter_quarantine = Table(
+            "filter_quarantine",
+            meta,
+            Column("location_id", BigInteger),
+            Column("location_type", Enum(LocationType)),
+            Column("text", Unicode),
+            UniqueConstraint(
+                "location_id", "location_type", "text", name="filter_quarantine_uq"
+            ),
+        )
         self.tb_content_filters = Table(
             "content_filters",
             meta,
@@ -94,12 +107,108 @@ class FilterModel:
             Column("reupload", Boolean),
         )
         self.filter_cache = {}
+        self.quarantine_cache = {}
         self.content_filter_cache = {}
         self.immune_users_cache = defaultdict(set)
         self.settings_cache = {}
 
         register_hook("on_guild_join", self.add_settings)
 
+    def prime_caches(self, bot):
+        """
+        Loads the filters, quarantined filters, content filters, immune users and
+        settings of every guild the bot is in, and the filters of all their text
+        channels, with one query per table.
+        """
+
+        logger.info("Loading filters for all %d guilds", len(bot.guilds))
+        locations = {}
+        for guild in bot.guilds:
+            locations[(LocationType.GUILD, guild.id)] = guild
+            self.filter_cache[guild] = {}
+            self.quarantine_cache[guild] = set()
+            self.content_filter_cache[guild] = {}
+            self.immune_users_cache[guild] = set()
+
+            for channel in guild.text_channels:
+                locations[(LocationType.CHANNEL, channel.id)] = channel
+                self.filter_cache[channel] = {}
+                self.quarantine_cache[channel] = set()
+
+        sel = select(
+            [
+                self.tb_filters.c.location_type,
+                self.tb_filters.c.location_id,
+                self.tb_filters.c.filter_type,
+                self.tb_filters.c.text,
+            ]
+        )
+        for location_type, location_id, filter_type, text in self.sql.execute(
+            sel
+        ).fetchall():
+            location = locations.get((location_type, location_id))
+            if location is not None:
+                self.filter_cache[location][text] = filter_type
+
+        sel = select(
+            [
+                self.tb_filter_quarantine.c.location_type,
+                self.tb_filter_quarantine.c.location_id,
+                self.tb_filter_quarantine.c.text,
+            ]
+        )
+        for location_type, location_id, text in self.sql.execute(sel).fetchall():
+            location = locations.get((location_type, location_id))
+            if location is not None:
+                self.quarantine_cache[location].add(text)
+
+        sel = select(
+            [
+                self.tb_content_filters.c.guild_id,
+                self.tb_content_filters.c.filter_type,
+                self.tb_content_filters.c.hashsum,
+                self.tb_content_filters.c.description,
+            ]
+        )
+        for guild_id, filter_type, hashsum, description in self.sql.execute(
+            sel
+        ).fetchall():
+            guild = locations.get((LocationType.GUILD, guild_id))
+            if guild is not None:
+                self.content_filter_cache[guild][hashsum] = (filter_type, description)
+
+        sel = select(
+            [
+                self.tb_filter_immune_users.c.guild_id,
+                self.tb_filter_immune_users.c.user_id,
+            ]
+        )
+        for guild_id, user_id in self.sql.execute(sel).fetchall():
+            guild = locations.get((LocationType.GUILD, guild_id))
+            if guild is not None:
+                self.immune_users_cache[guild].add(user_id)
+
+        sel = select(
+            [
+                self.tb_filter_settings.c.guild_id,
+                self.tb_filter_settings.c.bot_immune,
+                self.tb_filter_settings.c.manage_messages_immune,
+                self.tb_filter_settings.c.reupload,
+            ]
+        )
+        for guild_id, bot_immune, manage_messages_immune, reupload in self.sql.execute(
+            sel
+        ).fetchall():
+            storage = FilterSettingsData()
+            storage.bot_immune = bot_immune
+            storage.manage_messages_immune = manage_messages_immune
+            storage.reupload = reupload
+            self.settings_cache[guild_id] = storage
+
+        missing = [guild for guild in bot.guilds if guild.id not in self.settings_cache]
+        if missing:
+            self.add_settings(missing)
+
     def get_filters(self, location) -> dict:
         logger.debug(
             "Getting filters for location '%s' (%d)", location.name, location.id
@@ -169,8 +278,65 @@ class FilterModel:
         result = self.sql.execute(delet)
         self.filter_cache[location].pop(text, None)
         assert result.rowcount in (0, 1), "Multiple rows deleted"
+
+        if result.rowcount:
+            self.remove_quarantined_filter(location, text)
+
         return bool(result.rowcount)
 
+    def get_quarantined_filters(self, location) -> set:
+        logger.debug(
+            "Getting quarantined filters for location '%s' (%d)",
+            location.name,
+            location.id,
+        )
+        if location in self.quarantine_cache:
+            return self.quarantine_cache[location]
+
+        sel = select([self.tb_filter_quarantine.c.text]).where(
+            and_(
+                self.tb_filter_quarantine.c.location_id == location.id,
+                self.tb_filter_quarantine.c.location_type == LocationType.of(location),
+            )
+        )
+        result = self.sql.execute(sel)
+
+        texts = {text for (text,) in result.fetchall()}
+        self.quarantine_cache[location] = texts
+        return texts
+
+    def add_quarantined_filter(self, location, text):
+        logger.info("Quarantining filter %r", text)
+
+        text = normalize_caseless(text)
+        ins = (
+            insert(self.tb_filter_quarantine)
+            .values(
+                location_id=location.id,
+                location_type=LocationType.of(location),
+                text=text,
+            )
+            .on_conflict_do_nothing(
+                index_elements=["location_id", "location_type", "text"]
+            )
+        )
+        self.sql.execute(ins)
+        self.get_quarantined_filters(location).add(text)
+
+    def remove_quarantined_filter(self, location, text):
+        logger.info("Releasing filter %r from quarantine", text)
+
+        text = normalize_caseless(text)
+        delet = self.tb_filter_quarantine.delete().where(
+            and_(
+                self.tb_filter_quarantine.c.location_id == location.id,
+                self.tb_filter_quarantine.c.location_type == LocationType.of(location),
+                self.tb_filter_quarantine.c.text == text,
+            )
+        )
+        self.sql.execute(delet)
+        self.get_quarantined_filters(location).discard(text)
+
     def get_content_filters(self, guild):
         logger.debug(
             "Getting content filters for guild '%s' (%d)", guild.name, guild.id
@@ -342,7 +508,7 @@ class FilterModel:
         result = self.sql.execute(sel)
 
         if not result.rowcount:
-            self.add_settings(guild)
+            self.add_settings([guild])
             return self.settings_cache[guild.id]
 
         bot_immune, manage_messages_immune, reupload = result.fetchone()
@@ -361,17 +527,23 @@ class FilterModel:
         )
         return self.settings_cache[guild.id]
 
-    def add_settings(self, guild):
-        logger.info("Adding filter settings for guild '%s' (%d)", guild.name, guild.id)
-        storage = FilterSettingsData()
-        ins = self.tb_filter_settings.insert().values(
-            guild_id=guild.id,
-            bot_immune=storage.bot_immune,
-            manage_messages_immune=storage.manage_messages_immune,
-            reupload=storage.reupload,
-        )
-        self.sql.execute(ins)
-        self.settings_cache[guild.id] = storage
+    def add_settings(self, guilds):
+        logger.info("Adding filter settings for %d guild(s)", len(guilds))
+
+        rows = []
+        for guild in guilds:
+            storage = FilterSettingsData()
+            rows.append(
+                {
+                    "guild_id": guild.id,
+                    "bot_immune": storage.bot_immune,
+                    "manage_messages_immune": storage.manage_messages_immune,
+                    "reupload": storage.reupload,
+                }
+            )
+            self.settings_cache[guild.id] = storage
+
+        self.sql.execute(self.tb_filter_settings.insert().values(rows))
 
     def set_reupload(self, guild, reupload):
         logger.info(
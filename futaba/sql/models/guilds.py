@@ -24,6 +24,7 @@ import logging
 from collections import namedtuple
 
 from sqlalchemy import Boolean, BigInteger, Column, Table
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql import select
 
 from ..hooks import run_hooks
@@ -51,36 +52,47 @@ class GuildsModel:
     # as this is where those hooks are invoked. This method itself is
     # called by the client on an actual guild join or leave event.
 
-    def activate_guild(self, guild):
-        logger.info("Adding guild '%s' (%d) to guilds list", guild.name, guild.id)
+    def activate_guilds(self, guilds):
+        if not guilds:
+            return
 
-        if guild.id in self.get_guild_ids():
-            upd = (
-                self.tb_guilds.update()
-                .values(active=True)
-                .where(self.tb_guilds.c.guild_id == guild.id)
-            )
-            self.sql.execute(upd)
-        else:
-            ins = self.tb_guilds.insert().values(guild_id=guild.id)
-            self.sql.execute(ins)
+        logger.info(
+            "Adding guilds to guilds list: [%s]",
+            ", ".join(f"'{guild.name}' ({guild.id})" for guild in guilds),
+        )
 
-        run_hooks("on_guild_join", guild)
+        ins = insert(self.tb_guilds).values(
+            [{"guild_id": guild.id, "active": True} for guild in guilds]
+        )
+        ups = ins.on_conflict_do_update(
+            index_elements=["guild_id"], set_={"active": True}
+        )
+        self.sql.execute(ups)
 
-    def deactivate_guild(self, guild):
-        logger.info("Removing guild '%s' (%d) from guilds list", guild.name, guild.id)
-        run_hooks("on_guild_leave", guild)
+        run_hooks("on_guild_join", guilds)
 
-        upd = (
-            self.tb_guilds.update()
-            .values(active=False)
-            .where(self.tb_guilds.c.guild_id == guild.id)
+    def deactivate_guilds(self, guilds):
+        if not guilds:
+            return
+
+        logger.info(
+            "Removing guilds from guilds list: [%s]",
+            ", ".join(f"'{guild.name}' ({guild.id})" for guild in guilds),
         )
-        self.sql.execute(upd)
 
-        delet = self.tb_guilds.delete().where(self.tb_guilds.c.guild_id == guild.id)
+        run_hooks("on_guild_leave", guilds)
+
+        delet = self.tb_guilds.delete().where(
+            self.tb_guilds.c.guild_id.in_([guild.id for guild in guilds])
+        )
         self.sql.execute(delet)
 
+    def activate_guild(self, guild):
+        self.activate_guilds([guild])
+
+    def deactivate_guild(self, guild):
+        self.deactivate_guilds([guild])
+
     def get_guild_ids(self):
         logger.info("Fetching guilds currently in database")
         sel = select([self.tb_guilds.c.guild_id])
@@ -105,12 +117,18 @@ class GuildsModel:
         )
         logger.debug("Running insertions...")
         with self.sql.transaction():
-            for guild_id in current_guild_ids - migrated_guild_ids:
-                guild = self._get_guild(bot, guild_id)
-                self.activate_guild(guild)
+            self.activate_guilds(
+                [
+                    self._get_guild(bot, guild_id)
+                    for guild_id in current_guild_ids - migrated_guild_ids
+                ]
+            )
 
         logger.debug("Running deletions...")
         with self.sql.transaction():
-            for guild_id in migrated_guild_ids - current_guild_ids:
-                guild = self._get_guild(bot, guild_id)
-                self.deactivate_guild(guild)
+            self.deactivate_guilds(
+                [
+                    self._get_guild(bot, guild_id)
+                    for guild_id in migrated_guild_ids - current_guild_ids
+                ]
+            )
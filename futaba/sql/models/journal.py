@@ -69,6 +69,57 @@ class JournalModel:
         self.journal_outputs_cache = defaultdict(dict)
         self.journal_guild_cache = set()
 
+    def prime_caches(self, bot):
+        """Loads the journal outputs of every guild the bot is in, in one query."""
+
+        logger.info("Loading journal outputs for all %d guilds", len(bot.guilds))
+        guild_ids = frozenset(guild.id for guild in bot.guilds)
+
+        sel = select(
+            [
+                self.tb_journal_outputs.c.guild_id,
+                self.tb_journal_outputs.c.location_id,
+                self.tb_journal_outputs.c.location_type,
+                self.tb_journal_outputs.c.path,
+                self.tb_journal_outputs.c.recursive,
+            ]
+        )
+        for (
+            guild_id,
+            location_id,
+            location_type,
+            path,
+            recursive,
+        ) in self.sql.execute(sel).fetchall():
+            if guild_id not in guild_ids:
+                continue
+
+            if location_type == LocationType.CHANNEL:
+                location = bot.get_channel(location_id)
+            else:
+                location = bot.get_user(location_id)
+
+            if location is None:
+                logger.info(
+                    "Journal output %s %d no longer exists, skipping",
+                    location_type.value,
+                    location_id,
+                )
+                continue
+
+            self.journal_outputs_cache[location][path] = JournalOutputData(
+                recursive=recursive
+            )
+
+    def get_all_journals(self):
+        """Yields every journal output from the cache."""
+
+        for location, outputs in tuple(self.journal_outputs_cache.items()):
+            for path, settings in outputs.items():
+                yield ConfiguredJournalOutput(
+                    sink=location, path=path, settings=settings
+                )
+
     def add_journal_output(self, guild, location, path, recursive):
         location_type = LocationType.of(location)
         if location_type == LocationType.CHANNEL:
@@ -0,0 +1,134 @@
+#
+# sql/models/messages.py
+#
+# futaba - A Discord Mod bot for the Programming server
+# Copyright (c) 2017-2020 Jake Richardson, Emmie Smith, jackylam5
+#
+# futaba is available free of charge under the terms of the MIT
+# License. You are free to redistribute and/or modify it under those
+# terms. It is distributed in the hopes that it will be useful, but
+# WITHOUT ANY WARRANTY. See the LICENSE file for more details.
+#
+
+"""
+Has the model for remembering which channel messages were sent in, so
+messages can be found from just their ID.
+"""
+
+# False positive when using SQLAlchemy decorators
+# pylint: disable=no-value-for-parameter
+
+import functools
+import logging
+
+from sqlalchemy import BigInteger, Column, Table
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import select
+
+from futaba.lru import LruCache
+
+Column = functools.partial(Column, nullable=False)
+logger = logging.getLogger(__name__)
+
+__all__ = ["MessagesModel"]
+
+# Maximum number of message locations kept in the database
+MAX_LOCATIONS = 250_000
+
+# Maximum number of message locations kept in memory
+MAX_CACHED_LOCATIONS = 10_000
+
+# Number of new locations collected before they are written out
+FLUSH_SIZE = 100
+
+# Number of writes between each time old locations are removed
+PRUNE_INTERVAL = 50
+
+
+class MessagesModel:
+    __slots__ = ("sql", "tb_message_locations", "location_cache", "pending", "writes")
+
+    def __init__(self, sql, meta):
+        self.sql = sql
+        self.tb_message_locations = Table(
+            "message_locations",
+            meta,
+            Column("message_id", BigInteger, primary_key=True),
+            Column("channel_id", BigInteger),
+            Column("guild_id", BigInteger),
+        )
+
+        self.location_cache = LruCache(MAX_CACHED_LOCATIONS)
+        self.pending = {}
+        self.writes = 0
+
+    def remember_location(self, message):
+        """
+        Records the channel the message is in. It is only written to the
+        database on the next flush, returns True once one is due.
+        """
+
+        location = (message.channel.id, message.guild.id)
+        self.location_cache[message.id] = location
+        self.pending[message.id] = location
+        return len(self.pending) >= FLUSH_SIZE
+
+    def take_pending_locations(self):
+        pending, self.pending = self.pending, {}
+        return pending
+
+    def add_locations(self, locations):
+        if not locations:
+            return
+
+        logger.debug("Adding %d message locations", len(locations))
+        ins = (
+            insert(self.tb_message_locations)
+            .values(
+                [
+                    {
+                        "message_id": message_id,
+                        "channel_id": channel_id,
+                        "guild_id": guild_id,
+                    }
+                    for message_id, (channel_id, guild_id) in locations.items()
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["message_id"])
+        )
+        self.sql.execute(ins)
+
+        self.writes += 1
+        if self.writes % PRUNE_INTERVAL == 0:
+            self.prune_locations()
+
+    def prune_locations(self):
+        # Snowflakes increase over time, so the lowest IDs are the oldest messages
+        oldest = (
+            select([self.tb_message_locations.c.message_id])
+            .order_by(self.tb_message_locations.c.message_id.desc())
+            .offset(MAX_LOCATIONS)
+            .limit(1)
+            .as_scalar()
+        )
+        delet = self.tb_message_locations.delete().where(
+            self.tb_message_locations.c.message_id <= oldest
+        )
+        result = self.sql.execute(delet)
+        logger.info("Pruned %d old message locations", result.rowcount)
+
+    def get_cached_location(self, message_id):
+        """Returns the ID of the channel the message is in, if it's in memory."""
+
+        location = self.location_cache.get(message_id) or self.pending.get(message_id)
+        return location and location[0]
+
+    def fetch_location(self, message_id):
+        """Returns the ID of the channel the message is in, or None if unknown."""
+
+        logger.debug("Looking up channel for message %d", message_id)
+        sel = select([self.tb_message_locations.c.channel_id]).where(
+            self.tb_message_locations.c.message_id == message_id
+        )
+        result = self.sql.execute(sel)
+        return result.scalar()
@@ -21,7 +21,7 @@ import functools
 import logging
 from collections import namedtuple
 
-from sqlalchemy import and_, cast, type_coerce
+from sqlalchemy import and_, or_, cast, type_coerce
 from sqlalchemy import (
     BigInteger,
     Column,
@@ -33,7 +33,7 @@ from sqlalchemy import (
     String,
     Table,
 )
-from sqlalchemy import ForeignKey, Sequence
+from sqlalchemy import ForeignKey, Index, Sequence, inspect
 from sqlalchemy.sql import select
 
 from futaba.enums import TaskType
@@ -70,17 +70,51 @@ class NaviModel:
             Column("recurrence", Interval, nullable=True),
             Column("type", Enum(TaskType)),
             Column("parameters", JSON),
+            Index("tasks_timestamp_idx", "timestamp"),
         )
 
         register_hook("on_guild_leave", self.remove_all_tasks)
 
-    def remove_all_tasks(self, guild):
-        logger.info("Removing all tasks in guild '%s' (%d)", guild.name, guild.id)
-        delet = self.tb_tasks.delete().where(self.tb_tasks.c.guild_id == guild.id)
+    def migrate_indexes(self):
+        """
+        Creates indexes on the tasks table which it doesn't have yet.
+        create_all() only creates them along with the table itself.
+        """
+
+        existing = {
+            index["name"] for index in inspect(self.sql.db).get_indexes("tasks")
+        }
+        for index in self.tb_tasks.indexes:
+            if index.name not in existing:
+                logger.info("Creating missing index '%s'", index.name)
+                index.create(self.sql.db)
+
+    def remove_all_tasks(self, guilds):
+        logger.info("Removing all tasks in %d guild(s)", len(guilds))
+        delet = self.tb_tasks.delete().where(
+            self.tb_tasks.c.guild_id.in_([guild.id for guild in guilds])
+        )
         self.sql.execute(delet)
 
-    def get_tasks(self):
-        logger.info("Getting all tasks in the database")
+    def get_tasks(self, until, since=None):
+        """
+        Gets all one-off tasks due before 'until', starting from 'since'.
+        If 'since' is not given, then all recurring tasks are included too.
+        """
+
+        logger.info("Getting tasks in the database due before %s", until)
+        if since is None:
+            condition = or_(
+                self.tb_tasks.c.timestamp < until,
+                self.tb_tasks.c.recurrence.isnot(None),
+            )
+        else:
+            condition = and_(
+                self.tb_tasks.c.timestamp >= since,
+                self.tb_tasks.c.timestamp < until,
+                self.tb_tasks.c.recurrence.is_(None),
+            )
+
         sel = select(
             [
                 self.tb_tasks.c.task_id,
@@ -91,7 +125,7 @@ class NaviModel:
                 self.tb_tasks.c.type,
                 self.tb_tasks.c.parameters,
             ]
-        )
+        ).where(condition)
         result = self.sql.execute(sel)
 
         tasks = {}
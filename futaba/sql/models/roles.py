@@ -24,6 +24,7 @@ import discord
 from sqlalchemy import and_
 from sqlalchemy import ARRAY, BigInteger, Column, Table
 from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql import select
 
 Column = functools.partial(Column, nullable=False)
@@ -31,6 +32,9 @@ logger = logging.getLogger(__name__)
 
 __all__ = ["RolesModel"]
 
+# Number of rows written per statement when syncing saved roles
+SAVED_ROLES_BATCH_SIZE = 1000
+
 
 class RolesModel:
     __slots__ = (
@@ -87,6 +91,39 @@ class RolesModel:
         self.roles_cache = {}
         self.channels_cache = {}
 
+    def prime_caches(self, bot):
+        """
+        Loads the assignable roles and role command channels of every
+        guild the bot is in, with one query per table.
+        """
+
+        logger.info("Loading role settings for all %d guilds", len(bot.guilds))
+        guilds = {guild.id: guild for guild in bot.guilds}
+        for guild in guilds.values():
+            self.roles_cache[guild] = set()
+            self.channels_cache[guild] = set()
+
+        sel = select(
+            [self.tb_assignable_roles.c.guild_id, self.tb_assignable_roles.c.role_id]
+        )
+        for guild_id, role_id in self.sql.execute(sel).fetchall():
+            guild = guilds.get(guild_id)
+            role = guild and guild.get_role(role_id)
+            if role is not None:
+                self.roles_cache[guild].add(role)
+
+        sel = select(
+            [
+                self.tb_role_command_channels.c.guild_id,
+                self.tb_role_command_channels.c.channel_id,
+            ]
+        )
+        for guild_id, channel_id in self.sql.execute(sel).fetchall():
+            guild = guilds.get(guild_id)
+            channel = guild and guild.get_channel(channel_id)
+            if isinstance(channel, discord.TextChannel):
+                self.channels_cache[guild].add(channel)
+
     def get_assignable_roles(self, guild):
         logger.info(
             "Getting all assignable roles for guild '%s' (%d)", guild.name, guild.id
@@ -337,6 +374,19 @@ class RolesModel:
                 roles.append(role)
         return roles
 
+    def _upsert_saved_roles(self, guild_id, saved_roles):
+        ins = insert(self.tb_saved_roles).values(
+            [
+                {"guild_id": guild_id, "user_id": user_id, "role_ids": role_ids}
+                for user_id, role_ids in saved_roles
+            ]
+        )
+        ups = ins.on_conflict_do_update(
+            index_elements=["guild_id", "user_id"],
+            set_={"role_ids": ins.excluded.role_ids},
+        )
+        self.sql.execute(ups)
+
     def update_saved_roles(self, member):
         logger.info(
             "Updating saved roles for '%s' (%d) in guild '%s' (%d): [%s]",
@@ -347,31 +397,37 @@ class RolesModel:
             ", ".join(role.name for role in member.roles),
         )
 
-        sel = select([None]).where(
-            and_(
-                self.tb_saved_roles.c.guild_id == member.guild.id,
-                self.tb_saved_roles.c.user_id == member.id,
-            )
+        role_ids = [role.id for role in member.roles]
+        self._upsert_saved_roles(member.guild.id, [(member.id, role_ids)])
+
+    def sync_saved_roles(self, guild, member_roles):
+        """
+        Brings the guild's saved roles in line with the given mapping of
+        member IDs to role ID lists. The saved roles are read in one query,
+        and only members whose roles differ are written, in batches.
+        """
+
+        logger.info(
+            "Syncing saved roles for %d members in guild '%s' (%d)",
+            len(member_roles),
+            guild.name,
+            guild.id,
         )
+
+        sel = select(
+            [self.tb_saved_roles.c.user_id, self.tb_saved_roles.c.role_ids]
+        ).where(self.tb_saved_roles.c.guild_id == guild.id)
         result = self.sql.execute(sel)
+        saved = {user_id: frozenset(role_ids) for user_id, role_ids in result}
 
-        # Cannot UPDATE, must do first INSERT
-        if not result.rowcount:
-            self.add_saved_roles(member)
-            return
-
-        upd = (
-            self.tb_saved_roles.update()
-            .where(
-                and_(
-                    self.tb_saved_roles.c.guild_id == member.guild.id,
-                    self.tb_saved_roles.c.user_id == member.id,
-                )
-            )
-            .values(
-                guild_id=member.guild.id,
-                user_id=member.id,
-                role_ids=[role.id for role in member.roles],
-            )
-        )
-        self.sql.execute(upd)
+        changed = [
+            (user_id, role_ids)
+            for user_id, role_ids in member_roles.items()
+            if saved.get(user_id) != frozenset(role_ids)
+        ]
+
+        logger.info("Saved roles changed for %d members", len(changed))
+        for i in range(0, len(changed), SAVED_ROLES_BATCH_SIZE):
+            self._upsert_saved_roles(guild.id, changed[i : i + SAVED_ROLES_BATCH_SIZE])
+
+        return len(changed)
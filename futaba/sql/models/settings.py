@@ -191,26 +191,136 @@ class SettingsModel:
         register_hook("on_guild_join", self.add_special_roles)
         register_hook("on_guild_join", self.add_reapply_roles)
 
-    def add_guild_settings(self, guild):
-        logger.info(
-            "Adding guild settings row for new guild '%s' (%d)", guild.name, guild.id
+    def prime_caches(self, bot):
+        """
+        Loads the settings of every guild the bot is in, with one query per
+        table. Guilds missing a row have one added, as the getters would.
+        """
+
+        logger.info("Loading settings for all %d guilds", len(bot.guilds))
+        guilds = {guild.id: guild for guild in bot.guilds}
+
+        sel = select(
+            [
+                self.tb_guild_settings.c.guild_id,
+                self.tb_guild_settings.c.prefix,
+                self.tb_guild_settings.c.max_delete_messages,
+                self.tb_guild_settings.c.warn_manual_mod_action,
+                self.tb_guild_settings.c.remove_other_roles,
+                self.tb_guild_settings.c.mentionable_name_prefix,
+            ]
+        )
+        for (
+            guild_id,
+            prefix,
+            max_delete_messages,
+            warn_manual_mod_action,
+            remove_other_roles,
+            mentionable_name_prefix,
+        ) in self.sql.execute(sel).fetchall():
+            guild = guilds.get(guild_id)
+            if guild is not None:
+                self.guild_settings_cache[guild] = GuildSettingsData(
+                    prefix,
+                    max_delete_messages,
+                    warn_manual_mod_action=warn_manual_mod_action,
+                    remove_other_roles=remove_other_roles,
+                    mentionable_name_prefix=mentionable_name_prefix,
+                )
+
+        sel = select(
+            [
+                self.tb_special_roles.c.guild_id,
+                self.tb_special_roles.c.member_role_id,
+                self.tb_special_roles.c.guest_role_id,
+                self.tb_special_roles.c.mute_role_id,
+                self.tb_special_roles.c.jail_role_id,
+                self.tb_special_roles.c.focus_role_id,
+                self.tb_special_roles.c.nonpurge_role_id,
+            ]
         )
+        for guild_id, *role_ids in self.sql.execute(sel).fetchall():
+            guild = guilds.get(guild_id)
+            if guild is not None:
+                self.special_roles_cache[guild] = SpecialRoleData(guild, *role_ids)
+
+        sel = select(
+            [
+                self.tb_reapply_roles.c.guild_id,
+                self.tb_reapply_roles.c.auto_reapply,
+                self.tb_reapply_roles.c.role_ids,
+            ]
+        )
+        for guild_id, auto_reapply, role_ids in self.sql.execute(sel).fetchall():
+            guild = guilds.get(guild_id)
+            if guild is not None:
+                roles = set(filter(None, map(guild.get_role, role_ids)))
+                self.reapply_roles_cache[guild] = ReapplyRolesData(roles, auto_reapply)
+
+        blacklists = {guild: [] for guild in guilds.values()}
+        sel = select(
+            [
+                self.tb_tracking_blacklists.c.guild_id,
+                self.tb_tracking_blacklists.c.type,
+                self.tb_tracking_blacklists.c.data_id,
+            ]
+        )
+        for guild_id, block_type, data_id in self.sql.execute(sel).fetchall():
+            guild = guilds.get(guild_id)
+            if guild is not None:
+                blacklists[guild].append((block_type, data_id))
+
+        for guild, blacklist in blacklists.items():
+            self.tracking_blacklist_cache[guild] = TrackingBlacklistData(
+                guild, blacklist
+            )
+
+        sel = select(
+            [
+                self.tb_optional_cog_settings.c.guild_id,
+                self.tb_optional_cog_settings.c.cog_name,
+                self.tb_optional_cog_settings.c.settings,
+            ]
+        )
+        for guild_id, cog_name, settings in self.sql.execute(sel).fetchall():
+            guild = guilds.get(guild_id)
+            if guild is not None:
+                self.optional_cog_settings_cache[(guild, cog_name)] = settings
+
+        for cache, add_rows in (
+            (self.guild_settings_cache, self.add_guild_settings),
+            (self.special_roles_cache, self.add_special_roles),
+            (self.reapply_roles_cache, self.add_reapply_roles),
+        ):
+            missing = [guild for guild in guilds.values() if guild not in cache]
+            if missing:
+                add_rows(missing)
+
+    def add_guild_settings(self, guilds):
+        logger.info("Adding guild settings rows for %d new guild(s)", len(guilds))
         ins = self.tb_guild_settings.insert().values(
-            guild_id=guild.id,
-            prefix=None,
-            max_delete_messages=self.sql.max_delete_messages,
-            warn_manual_mod_action=False,
-            remove_other_roles=True,
-            mentionable_name_prefix=0,
+            [
+                {
+                    "guild_id": guild.id,
+                    "prefix": None,
+                    "max_delete_messages": self.sql.max_delete_messages,
+                    "warn_manual_mod_action": False,
+                    "remove_other_roles": True,
+                    "mentionable_name_prefix": 0,
+                }
+                for guild in guilds
+            ]
         )
         self.sql.execute(ins)
-        self.guild_settings_cache[guild] = GuildSettingsData(
-            None,
-            self.sql.max_delete_messages,
-            warn_manual_mod_action=False,
-            remove_other_roles=True,
-            mentionable_name_prefix=0,
-        )
+
+        for guild in guilds:
+            self.guild_settings_cache[guild] = GuildSettingsData(
+                None,
+                self.sql.max_delete_messages,
+                warn_manual_mod_action=False,
+                remove_other_roles=True,
+                mentionable_name_prefix=0,
+            )
 
     def fetch_guild_settings(self, guild):
         logger.info("Getting guild settings for guild '%s' (%d)", guild.name, guild.id)
@@ -227,7 +337,7 @@ class SettingsModel:
         result = self.sql.execute(sel)
 
         if not result.rowcount:
-            self.add_guild_settings(guild)
+            self.add_guild_settings([guild])
 
         (
             prefix,
@@ -353,23 +463,28 @@ class SettingsModel:
         self.sql.execute(upd)
         self.guild_settings_cache[guild].mentionable_name_prefix = prefix
 
-    def add_special_roles(self, guild):
-        logger.info(
-            "Adding special roles row for new guild '%s' (%d)", guild.name, guild.id
-        )
+    def add_special_roles(self, guilds):
+        logger.info("Adding special roles rows for %d new guild(s)", len(guilds))
         ins = self.tb_special_roles.insert().values(
-            guild_id=guild.id,
-            member_role_id=None,
-            guest_role_id=None,
-            mute_role_id=None,
-            jail_role_id=None,
-            focus_role_id=None,
-            nonpurge_role_id=None,
+            [
+                {
+                    "guild_id": guild.id,
+                    "member_role_id": None,
+                    "guest_role_id": None,
+                    "mute_role_id": None,
+                    "jail_role_id": None,
+                    "focus_role_id": None,
+                    "nonpurge_role_id": None,
+                }
+                for guild in guilds
+            ]
         )
         self.sql.execute(ins)
-        self.special_roles_cache[guild] = SpecialRoleData(
-            guild, None, None, None, None, None, None
-        )
+
+        for guild in guilds:
+            self.special_roles_cache[guild] = SpecialRoleData(
+                guild, None, None, None, None, None, None
+            )
 
     def get_special_roles(self, guild):
         if guild in self.special_roles_cache:
@@ -388,7 +503,7 @@ class SettingsModel:
         result = self.sql.execute(sel)
 
         if not result.rowcount:
-            self.add_special_roles(guild)
+            self.add_special_roles([guild])
             return self.special_roles_cache[guild]
 
         (
@@ -435,15 +550,18 @@ class SettingsModel:
         self.sql.execute(upd)
         self.special_roles_cache[guild].update(attrs)
 
-    def add_reapply_roles(self, guild):
-        logger.info(
-            "Adding reappliable roles row for new guild '%s' (%d)", guild.name, guild.id
-        )
+    def add_reapply_roles(self, guilds):
+        logger.info("Adding reappliable roles rows for %d new guild(s)", len(guilds))
         ins = self.tb_reapply_roles.insert().values(
-            guild_id=guild.id, auto_reapply=True, role_ids=[]
+            [
+                {"guild_id": guild.id, "auto_reapply": True, "role_ids": []}
+                for guild in guilds
+            ]
         )
         self.sql.execute(ins)
-        self.reapply_roles_cache[guild] = ReapplyRolesData(set(), True)
+
+        for guild in guilds:
+            self.reapply_roles_cache[guild] = ReapplyRolesData(set(), True)
 
     def fetch_reapply_roles(self, guild):
         logger.info(
@@ -455,7 +573,7 @@ class SettingsModel:
         result = self.sql.execute(sel)
 
         if not result.rowcount:
-            self.add_reapply_roles(guild)
+            self.add_reapply_roles([guild])
             return self.reapply_roles_cache[guild]
 
         roles = set()
@@ -79,20 +79,52 @@ class WelcomeModel:
 
         register_hook("on_guild_join", self.add_welcome)
 
-    def add_welcome(self, guild):
-        logger.info(
-            "Adding welcome message row for guild '%s' (%d)", guild.name, guild.id
-        )
-        storage = WelcomeData(guild)
-        ins = self.tb_welcome.insert().values(
-            guild_id=guild.id,
-            welcome_message=storage.welcome_channel,
-            goodbye_message=storage.goodbye_message,
-            delete_on_agree=storage.delete_on_agree,
-            welcome_channel_id=storage.welcome_channel_id,
+    def prime_caches(self, bot):
+        """Loads the welcome settings of every guild the bot is in, in one query."""
+
+        logger.info("Loading welcome message data for all %d guilds", len(bot.guilds))
+        guilds = {guild.id: guild for guild in bot.guilds}
+
+        sel = select(
+            [
+                self.tb_welcome.c.guild_id,
+                self.tb_welcome.c.welcome_message,
+                self.tb_welcome.c.goodbye_message,
+                self.tb_welcome.c.agreed_message,
+                self.tb_welcome.c.delete_on_agree,
+                self.tb_welcome.c.welcome_channel_id,
+            ]
         )
-        self.sql.execute(ins)
-        self.welcome_cache[guild] = storage
+        for guild_id, *values in self.sql.execute(sel).fetchall():
+            guild = guilds.get(guild_id)
+            if guild is not None:
+                self.welcome_cache[guild] = WelcomeData(guild, *values)
+
+        missing = [
+            guild for guild in guilds.values() if guild not in self.welcome_cache
+        ]
+        if missing:
+            self.add_welcome(missing)
+
+    def add_welcome(self, guilds):
+        logger.info("Adding welcome message rows for %d guild(s)", len(guilds))
+
+        rows = []
+        for guild in guilds:
+            storage = WelcomeData(guild)
+            rows.append(
+                {
+                    "guild_id": guild.id,
+                    "welcome_message": storage.welcome_message,
+                    "goodbye_message": storage.goodbye_message,
+                    "agreed_message": storage.agreed_message,
+                    "delete_on_agree": storage.delete_on_agree,
+                    "welcome_channel_id": storage.welcome_channel_id,
+                }
+            )
+            self.welcome_cache[guild] = storage
+
+        self.sql.execute(self.tb_welcome.insert().values(rows))
 
     def remove_welcome(self, guild):
         logger.info(
@@ -121,7 +153,7 @@ class WelcomeModel:
         result = self.sql.execute(sel)
 
         if not result.rowcount:
-            self.add_welcome(guild)
+            self.add_welcome([guild])
             return self.welcome_cache[guild]
 
         (
@@ -263,3 +295,31 @@ class WelcomeModel:
             value = key.parse_value(raw_value)
             alerts.append((id, key, op, value))
         return alerts
+
+    def get_alerts_by_guild(self, guilds):
+        """
+        Gets the join alerts of all of the given guilds in one query.
+        Returns a dictionary of guild to alert parts, as in get_all_alerts().
+        """
+
+        logger.info("Getting all join alerts for %d guilds", len(guilds))
+        guilds = {guild.id: guild for guild in guilds}
+
+        sel = select(
+            [
+                self.tb_join_alerts.c.guild_id,
+                self.tb_join_alerts.c.alert_id,
+                self.tb_join_alerts.c.alert_key,
+                self.tb_join_alerts.c.op,
+                self.tb_join_alerts.c.value,
+            ]
+        ).order_by(self.tb_join_alerts.c.alert_id)
+        result = self.sql.execute(sel)
+
+        alerts = {guild: [] for guild in guilds.values()}
+        for guild_id, id, key, op, raw_value in result.fetchall():
+            guild = guilds.get(guild_id)
+            if guild is not None:
+                value = key.parse_value(raw_value)
+                alerts[guild].append((id, key, op, value))
+        return alerts
@@ -10,51 +10,129 @@
 # WITHOUT ANY WARRANTY. See the LICENSE file for more details.
 #
 
-__all__ = ["Transaction"]
+"""
+Per-task database transactions.
+
+Each transaction checks out its own connection from the pool, and is
+tracked through a context variable, so concurrent asyncio tasks (and the
+executor threads they dispatch to) never share a transaction. Opening a
+transaction while one is already active in the current task joins it
+instead of starting a new one. Tasks spawned inside a transaction inherit
+the context variable, but not the transaction.
+
+Checking out a connection can block for as long as the pool timeout, so on
+the event loop transactions must be opened with "async with". Plain "with"
+is only for code already running on the database thread pool.
+"""
+
+import asyncio
+from contextvars import ContextVar
+
+__all__ = ["Transaction", "active_transaction", "current_transaction"]
+
+current_transaction = ContextVar("current_transaction", default=None)
+
+
+def _current_task():
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        # Not on an event loop, such as in an executor thread
+        return None
+
+
+def active_transaction():
+    """
+    Gets the transaction open in the current task, if any.
+    Transactions inherited from the task that spawned this one are ignored.
+    """
+
+    trans = current_transaction.get()
+    if trans is None or trans.conn is None:
+        return None
+
+    # Executor threads only see the transaction they were handed by SqlHandler.run()
+    task = _current_task()
+    if task is not None and task is not trans.task:
+        return None
+
+    return trans
 
 
 class Transaction:
-    __slots__ = ("sql", "conn", "logger", "ok")
+    __slots__ = ("sql", "conn", "trans", "logger", "token", "task", "owner", "ok")
 
-    def __init__(self, sql, conn, logger):
+    def __init__(self, sql, logger):
         self.sql = sql
-        self.conn = conn
+        self.conn = None
+        self.trans = None
         self.logger = logger
+        self.token = None
+        self.task = None
+        self.owner = False
         self.ok = True
 
-    def __enter__(self):
-        self.logger.debug("Starting transaction.")
+    def _begin(self):
+        parent = active_transaction()
+        if parent is None:
+            self.logger.debug("Starting transaction.")
+            self.conn = self.sql.db.connect()
+            self.owner = True
+        else:
+            self.logger.debug("Joining transaction already open in this task.")
+            self.conn = parent.conn
+            self.owner = False
+
         self.trans = self.conn.begin()
-        return self
 
-    def __exit__(self, type, value, traceback):
-        if (type, value, traceback) == (None, None, None):
-            self.logger.debug("Committing transaction.")
-            self.trans.commit()
+    def _end(self, type, value, traceback):
+        try:
+            if (type, value, traceback) == (None, None, None):
+                self.logger.debug("Committing transaction.")
+                self.trans.commit()
+            else:
+                self.logger.error("Exception occurred in 'with' scope!", exc_info=value)
+                self.logger.debug("Rolling back transaction.")
+                self.ok = False
+                self.trans.rollback()
+        finally:
+            if self.owner:
+                self.conn.close()
+
+            self.trans = None
+            self.conn = None
+
+    def __enter__(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
         else:
-            self.logger.error("Exception occurred in 'with' scope!", exc_info=1)
-            self.logger.debug("Rolling back transaction.")
-            self.ok = False
-            self.trans.rollback()
+            raise RuntimeError("Transactions on the event loop must use 'async with'")
 
-        self.trans = None
+        self._begin()
+        self.token = current_transaction.set(self)
+        return self
+
+    def __exit__(self, type, value, traceback):
+        current_transaction.reset(self.token)
+        self.token = None
+        self._end(type, value, traceback)
 
     async def __aenter__(self):
-        self.__enter__()
+        # Checking out a connection may block if the pool is exhausted
+        self.task = _current_task()
+        await self.sql.run(self._begin)
+        self.token = current_transaction.set(self)
+        return self
 
     async def __aexit__(self, type, value, traceback):
-        self.__exit__(type, value, traceback)
+        current_transaction.reset(self.token)
+        self.token = None
+        await self.sql.run(self._end, type, value, traceback)
 
     def __bool__(self):
         return True
 
-    @property
-    def trans(self):
-        return self.sql.trans
-
-    @trans.setter
-    def trans(self, value):
-        self.sql.trans = value
-
     def execute(self, *args, **kwargs):
         return self.conn.execute(*args, **kwargs)
@@ -15,55 +15,54 @@ import os
 import re
 import string
 import unicodedata
-from bisect import bisect
-from urllib.request import urlretrieve
-
-from futaba.str_builder import StringBuilder
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
 __all__ = [
     "READABLE_CHAR_SET",
-    "UNICODE_BLOCKS",
     "UNICODE_BLOCKS_FILENAME",
     "UNICODE_CATEGORY_NAME",
     "normalize_caseless",
     "unicode_block",
+    "unicode_blocks",
     "unicode_repr",
 ]
 
 READABLE_CHAR_SET = frozenset(string.printable) - frozenset("\t\n\r\x0b\x0c")
 
+# Most characters unicode_repr() remembers how to escape
+MAX_REPR_CACHE = 2048
+
+# Generated from the Unicode Character Database by misc/generate_unicode_blocks.py
+UNICODE_BLOCKS_FILENAME = os.path.join(os.path.dirname(__file__), "unicode_blocks.txt")
 
-# Adapted from https://gist.github.com/acdha/49a610089c2798db6fe2
-def _load_unicode_blocks():
-    if not os.path.exists(UNICODE_BLOCKS_FILENAME):
-        logger.info(
-            "Unicode blocks file '%s' does not exist, downloading...",
-            UNICODE_BLOCKS_FILENAME,
-        )
-        urlretrieve(
-            "https://unicode.org/Public/UNIDATA/Blocks.txt",
-            filename=UNICODE_BLOCKS_FILENAME,
-        )
-
-    blocks = []
-    with open(UNICODE_BLOCKS_FILENAME) as fh:
+
+@lru_cache(maxsize=None)
+def unicode_blocks():
+    """
+    Loads the bundled Unicode block table on first use.
+    Returns parallel sequences of block starts, ends and names, sorted by start.
+    """
+
+    logger.debug("Loading Unicode blocks from '%s'", UNICODE_BLOCKS_FILENAME)
+    with open(UNICODE_BLOCKS_FILENAME, encoding="utf-8") as fh:
         content = fh.read()
 
+    starts = array("L")
+    ends = array("L")
+    names = []
     for start, end, block_name in re.findall(
-        r"([0-9A-F]+)\.\.([0-9A-F]+);\ (\S.*\S)", content
+        r"^([0-9A-F]+)\.\.([0-9A-F]+);\ (\S.*\S)", content, re.MULTILINE
     ):
-        if block_name == "No_Block":
-            continue
-
-        blocks.append((int(start, 16), int(end, 16), block_name))
-    return blocks
+        starts.append(int(start, 16))
+        ends.append(int(end, 16))
+        names.append(block_name)
 
+    return starts, ends, tuple(names)
 
-UNICODE_BLOCKS_FILENAME = "unidata-blocks.txt"
-UNICODE_BLOCKS = _load_unicode_blocks()
-UNICODE_BLOCK_STARTS = [block[0] for block in UNICODE_BLOCKS]
 
 UNICODE_CATEGORY_NAME = {
     "Lu": "Letter, uppercase",
@@ -112,41 +111,63 @@ def normalize_caseless(s):
 def unicode_block(s):
     """Gets the name of the Unicode block that contains the given character."""
 
+    starts, ends, names = unicode_blocks()
     codepoint = ord(s)
-    index = bisect(UNICODE_BLOCK_STARTS, codepoint)
-    try:
-        _, stop, block = UNICODE_BLOCKS[index]
-    except IndexError:
+
+    # Last block starting at or before the codepoint
+    index = bisect_right(starts, codepoint) - 1
+    if index < 0 or codepoint > ends[index]:
         return None
 
-    return block if codepoint <= stop else None
+    return names[index]
 
 
-def unicode_repr(s):
+class _ReprTable(dict):
     """
-    Similar to repr(), but always escapes characters that aren't "readable".
-    That is, any characters not in READABLE_CHAR_SET.
+    Translation table for unicode_repr(), which fills itself in as
+    characters are seen, so each one is only ever escaped once.
+    Once it is full, new characters are escaped without being kept.
     """
 
-    result = StringBuilder('"')
-    for ch in s:
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__()
+
+        # ASCII is always kept, however many other characters have been seen
+        for num in range(0x80):
+            self.__missing__(num)
+
+    def __missing__(self, num):
+        ch = chr(num)
         if ch == "\n":
-            result.write("\\n")
+            escaped = "\\n"
         elif ch == "\t":
-            result.write("\\t")
+            escaped = "\\t"
         elif ch == '"':
-            result.write('\\"')
+            escaped = '\\"'
         elif ch in READABLE_CHAR_SET:
-            result.write(ch)
+            escaped = ch
+        elif num < 0x100:
+            escaped = f"\\x{num:02x}"
+        elif num < 0x10000:
+            escaped = f"\\u{num:04x}"
         else:
-            num = ord(ch)
-            if num < 0x100:
-                result.write(f"\\x{num:02x}")
-            elif num < 0x10000:
-                result.write(f"\\u{num:04x}")
-            elif num < 0x100000000:
-                result.write(f"\\U{num:08x}")
-            else:
-                raise ValueError(f"Character {ch!r} (ord {num:x}) too big for escaping")
-    result.write('"')
-    return str(result)
+            escaped = f"\\U{num:08x}"
+
+        if len(self) < MAX_REPR_CACHE:
+            self[num] = escaped
+
+        return escaped
+
+
+_REPR_TABLE = _ReprTable()
+
+
+def unicode_repr(s):
+    """
+    Similar to repr(), but always escapes characters that aren't "readable".
+    That is, any characters not in READABLE_CHAR_SET.
+    """
+
+    return f'"{s.translate(_REPR_TABLE)}"'
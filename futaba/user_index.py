@@ -0,0 +1,177 @@
+#
+# user_index.py
+#
+# futaba - A Discord Mod bot for the Programming server
+# Copyright (c) 2017-2020 Jake Richardson, Emmie Smith, jackylam5
+#
+# futaba is available free of charge under the terms of the MIT
+# License. You are free to redistribute and/or modify it under those
+# terms. It is distributed in the hopes that it will be useful, but
+# WITHOUT ANY WARRANTY. See the LICENSE file for more details.
+#
+
+"""
+Trigram index of usernames and nicknames, used to narrow down fuzzy
+user searches to a handful of candidates before they are scored.
+"""
+
+import heapq
+import logging
+from collections import Counter, defaultdict
+
+from .unicode import normalize_caseless
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["UserIndex"]
+
+# Length of the substrings that are indexed
+GRAM_SIZE = 3
+
+# Maximum number of candidates returned by a search
+CANDIDATE_LIMIT = 200
+
+
+def _grams(text):
+    if len(text) <= GRAM_SIZE:
+        return {text}
+
+    return {text[i : i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class UserIndex:
+    __slots__ = ("names", "postings")
+
+    def __init__(self):
+        # User ID -> normalized name -> number of members using it
+        self.names = defaultdict(Counter)
+
+        # Trigram -> user IDs with a name containing it
+        self.postings = defaultdict(set)
+
+    def _user_grams(self, user_id):
+        grams = set()
+        for name in self.names.get(user_id, ()):
+            grams.update(_grams(name))
+        return grams
+
+    def _update(self, user_id, change):
+        # Only the trigrams that were added or removed need updating
+        old_grams = self._user_grams(user_id)
+        change(self.names[user_id])
+        if not self.names[user_id]:
+            del self.names[user_id]
+        new_grams = self._user_grams(user_id)
+
+        for gram in old_grams - new_grams:
+            self.postings[gram].discard(user_id)
+            if not self.postings[gram]:
+                del self.postings[gram]
+
+        for gram in new_grams - old_grams:
+            self.postings[gram].add(user_id)
+
+    @staticmethod
+    def _member_names(member):
+        names = [member.name]
+        if getattr(member, "nick", None) is not None:
+            names.append(member.nick)
+        return Counter(map(normalize_caseless, names))
+
+    def build(self, guilds):
+        """Rebuilds the index from the members of the given guilds."""
+
+        self.names.clear()
+        self.postings.clear()
+
+        for guild in guilds:
+            for member in guild.members:
+                self.names[member.id].update(self._member_names(member))
+
+        for user_id, names in self.names.items():
+            for name in names:
+                for gram in _grams(name):
+                    self.postings[gram].add(user_id)
+
+        logger.info(
+            "Indexed %d users by %d trigrams", len(self.names), len(self.postings)
+        )
+
+    def add_member(self, member):
+        names = self._member_names(member)
+        self._update(member.id, lambda counter: counter.update(names))
+
+    def remove_member(self, member):
+        names = self._member_names(member)
+
+        def remove(counter):
+            counter.subtract(names)
+            for name, count in tuple(counter.items()):
+                if count <= 0:
+                    del counter[name]
+
+        self._update(member.id, remove)
+
+    def add_guild(self, guild):
+        for member in guild.members:
+            self.add_member(member)
+
+    def remove_guild(self, guild):
+        for member in guild.members:
+            self.remove_member(member)
+
+    def update_member(self, before, after):
+        if before.nick == after.nick:
+            return
+
+        def renick(counter):
+            if before.nick is not None:
+                old_nick = normalize_caseless(before.nick)
+                counter[old_nick] -= 1
+                if counter[old_nick] <= 0:
+                    del counter[old_nick]
+
+            if after.nick is not None:
+                counter[normalize_caseless(after.nick)] += 1
+
+        self._update(after.id, renick)
+
+    def update_user(self, before, after):
+        old_name = normalize_caseless(before.name)
+        new_name = normalize_caseless(after.name)
+        if old_name == new_name or after.id not in self.names:
+            return
+
+        def rename(counter):
+            count = counter.pop(old_name, 0)
+            if count:
+                counter[new_name] += count
+
+        self._update(after.id, rename)
+
+    def get_names(self, user_id):
+        """Returns the normalized usernames and nicknames of the user."""
+
+        return tuple(self.names.get(user_id, ()))
+
+    def search(self, argument):
+        """
+        Returns the IDs of users whose names share the most trigrams with
+        the given (already normalized) argument, best candidates first.
+        """
+
+        grams = _grams(argument)
+        if len(argument) < GRAM_SIZE:
+            # Too short to have trigrams of its own, check which ones contain it
+            grams = [gram for gram in self.postings if argument in gram]
+
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        return [
+            user_id
+            for user_id, _ in heapq.nlargest(
+                CANDIDATE_LIMIT, shared.items(), key=lambda item: item[1]
+            )
+        ]
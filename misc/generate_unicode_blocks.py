@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+#
+# misc/generate_unicode_blocks.py
+#
+# futaba - A Discord Mod bot for the Programming server
+# Copyright (c) 2017-2020 Jake Richardson, Emmie Smith, jackylam5
+#
+# futaba is available free of charge under the terms of the MIT
+# License. You are free to redistribute and/or modify it under those
+# terms. It is distributed in the hopes that it will be useful, but
+# WITHOUT ANY WARRANTY. See the LICENSE file for more details.
+#
+
+"""
+Regenerates the Unicode block table bundled with futaba, from the
+Unicode Character Database's Blocks.txt. Either a local copy or a URL
+can be given, the latest published version is used by default.
+"""
+
+import os
+import re
+import sys
+from urllib.request import urlopen
+
+BLOCKS_URL = "https://unicode.org/Public/UNIDATA/Blocks.txt"
+OUTPUT_FILENAME = os.path.join(
+    os.path.dirname(__file__), "..", "futaba", "unicode_blocks.txt"
+)
+
+
+def read_source(source):
+    if re.match(r"https?://", source):
+        with urlopen(source) as response:
+            return response.read().decode("utf-8")
+
+    with open(source, encoding="utf-8") as fh:
+        return fh.read()
+
+
+def generate(content):
+    version = re.search(r"^# (Blocks-\S+\.txt)", content, re.MULTILINE)
+    lines = [
+        "# Generated by misc/generate_unicode_blocks.py, do not edit.",
+        f"# Source: {version[1] if version else 'Blocks.txt'}, (c) Unicode, Inc.",
+        "# Format: start..end; block name",
+    ]
+
+    blocks = []
+    for start, end, block_name in re.findall(
+        r"^([0-9A-F]+)\.\.([0-9A-F]+);\ (\S.*\S)", content, re.MULTILINE
+    ):
+        if block_name != "No_Block":
+            blocks.append((int(start, 16), int(end, 16), block_name))
+
+    # The lookup relies on the blocks being sorted
+    blocks.sort()
+    for start, end, block_name in blocks:
+        lines.append(f"{start:04X}..{end:04X}; {block_name}")
+
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(f"Usage: {sys.argv[0]} [Blocks.txt path or URL]", file=sys.stderr)
+        sys.exit(1)
+
+    source = sys.argv[1] if len(sys.argv) == 2 else BLOCKS_URL
+    with open(OUTPUT_FILENAME, "w", encoding="utf-8") as fh:
+        fh.write(generate(read_source(source)))
+
+    print(f"Wrote {os.path.normpath(OUTPUT_FILENAME)}")
@@ -0,0 +1,101 @@
+#
+# tests/test_filter.py
+#
+# futaba - A Discord Mod bot for the Programming server
+# Copyright (c) 2017-2020 Jake Richardson, Emmie Smith, jackylam5
+#
+# futaba is available free of charge under the terms of the MIT
+# License. You are free to redistribute and/or modify it under those
+# terms. It is distributed in the hopes that it will be useful, but
+# WITHOUT ANY WARRANTY. See the LICENSE file for more details.
+#
+
+import asyncio
+
+import pytest
+
+from futaba.cogs.filter.filter import Filter
+from futaba.cogs.filter.matcher import FilterMatcher
+from futaba.cogs.filter.sandbox import UNKNOWN
+from futaba.enums import FilterType
+
+# Results from before filters were matched against skeletons,
+# where each filter character was expanded into its homoglyphs
+ASCII_CASES = [
+    ("regex:\\d{3}", "hello", False),
+    ("regex:\\d{3}", "123", True),
+    ("regex:\\d{3}", "12a", False),
+    ("regex:\\d{3}", "lll", False),
+    ("regex:[a-z]+", "123", False),
+    ("regex:[a-z]+", "abc", True),
+    ("regex:[a-z]+", "|", False),
+    ("regex:[^a-z]", "1", True),
+    ("regex:[^a-z]", "abc", False),
+    ("regex:[^a-z]", "A", False),
+    ("regex:[^a-z]", " ", True),
+    ("regex:x[^o]y", "x0y", True),
+    ("regex:x[^o]y", "xoy", False),
+    ("regex:x[^o]y", "xay", True),
+    ("regex:\\bfoo\\b", "foo|bar", True),
+    ("regex:\\bfoo\\b", "foobar", False),
+    ("regex:\\bfoo\\b", "a foo b", True),
+    ("regex:\\bfoo\\b", "foo1", False),
+    ("regex:\\w+", "|", False),
+    ("regex:\\w+", "..", False),
+    ("regex:\\w+", "_", True),
+    ("hi", "hl", False),
+    ("hi", "hi", True),
+    ("hi", "HI", True),
+    ("hi", "h1", False),
+    ("mod", "rnod", True),
+    ("mod", "nod", True),
+    ("mod", "mod", True),
+    ("mod", "m0d", False),
+    ("hello", "he11o", True),
+    ("hello", "HE|LO", True),
+    ("hello", "hel1o", True),
+    ("hello", "heiio", True),
+]
+
+HOMOGLYPH_CASES = [
+    ("hello", "Hеllo"),
+    ("hello", "h e l l o"),
+    ("regex:sp[a4]m", "ѕраm"),
+    ("regex:[^x]ello", "Hеllo"),
+]
+
+
+@pytest.mark.parametrize("text, content, expected", ASCII_CASES)
+def test_ascii_matches(text, content, expected):
+    assert Filter(text).matches(content) == expected
+
+
+@pytest.mark.parametrize("text, content", HOMOGLYPH_CASES)
+def test_homoglyph_matches(text, content):
+    assert Filter(text).matches(content)
+
+
+@pytest.mark.parametrize(
+    "text, content, expected",
+    ASCII_CASES + [(text, content, True) for text, content in HOMOGLYPH_CASES],
+)
+def test_matcher_agrees(text, content, expected):
+    matcher = FilterMatcher({text: (Filter(text), FilterType.FLAG)})
+    assert (text in matcher.findall(content)) == expected
+
+
+class FakeSandbox:
+    def __init__(self, results):
+        self.results = list(results)
+
+    async def matches(self, filter, content):
+        return self.results.pop(0)
+
+
+def test_unknown_verdict_not_cached():
+    text = "raw-regex:(a+)+$"
+    matcher = FilterMatcher({text: (Filter(text), FilterType.FLAG)})
+    sandbox = FakeSandbox([UNKNOWN, True])
+    assert asyncio.run(matcher.search("aaaa", sandbox)) is None
+    assert asyncio.run(matcher.search("aaaa", sandbox)) == (text, FilterType.FLAG)
+    assert asyncio.run(matcher.search("aaaa", sandbox)) == (text, FilterType.FLAG)